@@ -0,0 +1,70 @@
+"""
+Benchmark the conversion of surfaces between napari and vedo.
+
+Compares the previous conversion (vedo.Mesh([vertices, faces]) and
+np.asarray(mesh.cells)) with the buffer-sharing conversion in
+`napari_vedo_bridge.utils`.
+
+Usage:
+    python benchmarks/benchmark_conversion.py --subdivisions 7
+"""
+import argparse
+import time
+
+import numpy as np
+import vedo
+from napari.layers import Surface
+
+from napari_vedo_bridge.utils import napari_to_vedo_mesh, vedo_mesh_to_napari
+
+
+def legacy_napari_to_vedo_mesh(surface):
+    return vedo.Mesh([surface.data[0], surface.data[1]])
+
+
+def legacy_vedo_mesh_to_napari(mesh):
+    return Surface((mesh.vertices, np.asarray(mesh.cells, dtype=int)))
+
+
+def timeit(function, *args, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--subdivisions', type=int, default=6,
+        help='Subdivisions of the test icosphere (faces = 20 * 4^n)')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    sphere = vedo.IcoSphere(subdivisions=args.subdivisions)
+    surface = Surface((
+        np.asarray(sphere.vertices, dtype=float),
+        np.asarray(sphere.cells, dtype=int)))
+    mesh = napari_to_vedo_mesh(surface)
+    print(f'Mesh with {len(surface.data[0])} vertices '
+          f'and {len(surface.data[1])} faces')
+
+    rows = [
+        ('napari -> vedo', legacy_napari_to_vedo_mesh, napari_to_vedo_mesh,
+         surface),
+        ('vedo -> napari', legacy_vedo_mesh_to_napari, vedo_mesh_to_napari,
+         mesh),
+    ]
+    print(f'{"conversion":<16}{"before [s]":>12}{"after [s]":>12}'
+          f'{"speedup":>10}')
+    for name, before, after, data in rows:
+        t_before = timeit(before, data, repeat=args.repeat)
+        t_after = timeit(after, data, repeat=args.repeat)
+        print(f'{name:<16}{t_before:>12.4f}{t_after:>12.4f}'
+              f'{t_before / t_after:>9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark the encoding options of the surface writer.
+
+Writes every mesh with each encoding and reports write throughput (MB of
+vertex and face data per second) and file size. By default, the sample
+meshes of the plugin are fetched into the sample cache; local files can be passed instead.
+
+Usage:
+    python benchmarks/benchmark_writer.py --format vtp
+    python benchmarks/benchmark_writer.py meshes/*.ply --format vtkhdf
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import vedo
+
+from napari_vedo_bridge._sample_cache import fetch_sample
+from napari_vedo_bridge._writer import Encoding, write_surfaces
+
+
+_sample_meshes = [
+    'beethoven.ply', 'apple.ply', 'bunny.obj', 'cow.vtk', 'panther.stl']
+
+_encodings = {
+    'ascii': Encoding(data_mode='ascii', compression=None),
+    'binary': Encoding(data_mode='binary', compression=None),
+    'appended': Encoding(compression=None),
+    'zlib-1': Encoding(compression='zlib', compression_level=1),
+    'zlib-5': Encoding(compression='zlib', compression_level=5),
+    'zlib-9': Encoding(compression='zlib', compression_level=9),
+    'lz4': Encoding(compression='lz4'),
+    'lzma': Encoding(compression='lzma'),
+    'zlib-5-float32': Encoding(float32=True),
+}
+
+
+def timeit(function, *args, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        'files', nargs='*',
+        help='Meshes to write. Defaults to the plugin sample meshes.')
+    parser.add_argument('--format', default='vtp')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    sources = args.files or [
+        str(fetch_sample(name)) for name in _sample_meshes]
+
+    print(f'{"mesh":<16}{"encoding":<16}{"size [MB]":>12}'
+          f'{"time [s]":>10}{"MB/s":>10}')
+    with tempfile.TemporaryDirectory() as directory:
+        for source in sources:
+            mesh = vedo.load(source)
+            data = (
+                np.asarray(mesh.vertices, dtype=np.float64),
+                np.asarray(mesh.cells, dtype=int))
+            n_bytes = data[0].nbytes + data[1].nbytes
+            name = os.path.basename(source)
+
+            for encoding_name, encoding in _encodings.items():
+                path = os.path.join(directory, f'mesh.{args.format}')
+                duration = timeit(
+                    write_surfaces, path, data, {}, 1, encoding,
+                    repeat=args.repeat)
+                size = os.path.getsize(path) / 1e6
+                print(f'{name:<16}{encoding_name:<16}{size:>12.2f}'
+                      f'{duration:>10.4f}{n_bytes / 1e6 / duration:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -17,6 +17,8 @@ from ._points import (
     remove_outliers,
 )
 
+from ._pipeline import MeshPipeline
+
 from . import _widgets as widgets
 
 __all__ = [
@@ -34,5 +36,6 @@ __all__ = [
     "smooth_points",
     "remove_outliers"
     "smooth_mls_1d",
+    "MeshPipeline",
     "widgets",
 ]
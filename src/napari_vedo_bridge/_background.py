@@ -0,0 +1,303 @@
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
+
+from magicgui import widgets
+from magicgui.widgets import FunctionGui
+
+
+class Cancelled(Exception):
+    """Raised in a background task after it was cancelled."""
+
+
+class Task:
+    """
+    Progress and cancellation state of an operation running in a worker.
+
+    While a task is active in a thread (see `activate`), every VTK filter
+    that is run with `run_filter` in this thread reports its progress to the
+    task, and `cancel` aborts the filters that are currently running.
+    Operations that process several frames or steps additionally call
+    `check` between them.
+    """
+
+    def __init__(self):
+        self.cancelled = False
+        self.n_steps = 1
+        self.steps_done = 0
+        self._step_progress = 0.0
+        self._filters = []
+        self._lock = threading.Lock()
+
+    @property
+    def progress(self) -> float:
+        """Progress of the task between 0 and 1."""
+        return min(1.0, (self.steps_done + self._step_progress) / self.n_steps)
+
+    def cancel(self):
+        """Abort the running VTK filters and stop before the next step."""
+        with self._lock:
+            self.cancelled = True
+            filters = list(self._filters)
+        for algorithm in filters:
+            _abort(algorithm)
+
+    def check(self):
+        """Raise `Cancelled` if the task was cancelled."""
+        if self.cancelled:
+            raise Cancelled()
+
+    def set_steps(self, n_steps: int):
+        self.n_steps = max(1, n_steps)
+        self.steps_done = 0
+        self._step_progress = 0.0
+
+    def set_step_progress(self, progress: float):
+        """Report the progress of the current step between 0 and 1."""
+        self._step_progress = progress
+
+    def step_done(self):
+        with self._lock:
+            self.steps_done += 1
+            self._step_progress = 0.0
+
+    @contextmanager
+    def activate(self):
+        """Attach this task to the VTK filters run in the current thread."""
+        previous = getattr(_local, 'task', None)
+        _local.task = self
+        try:
+            yield self
+        finally:
+            _local.task = previous
+
+    @contextmanager
+    def watch(self, algorithm: "vtkAlgorithm"):
+        """
+        Observe the progress of a VTK filter while it runs in this context
+        and abort it on `cancel`.
+        """
+        def _on_progress(caller, event):
+            self.set_step_progress(caller.GetProgress())
+
+        observer = algorithm.AddObserver('ProgressEvent', _on_progress)
+        with self._lock:
+            self._filters.append(algorithm)
+            cancelled = self.cancelled
+        if cancelled:
+            _abort(algorithm)
+        try:
+            yield algorithm
+        finally:
+            algorithm.RemoveObserver(observer)
+            with self._lock:
+                self._filters.remove(algorithm)
+
+
+_local = threading.local()
+
+
+def current_task() -> Optional[Task]:
+    """Task that is active in the current thread, if any."""
+    return getattr(_local, 'task', None)
+
+
+def run_with_task(task: Optional[Task], function: Callable) -> Callable:
+    """
+    Wrap a function to run with `task` active, e.g. in a thread pool.
+    """
+    if task is None:
+        return function
+
+    def _run(*args, **kwargs):
+        task.check()
+        with task.activate():
+            result = function(*args, **kwargs)
+        task.check()
+        task.step_done()
+        return result
+    return _run
+
+
+def run_filter(
+        algorithm: "vtkAlgorithm",
+        data: "vtkDataObject") -> "vtkDataObject":
+    """
+    Run a VTK filter on a dataset and return its output.
+
+    If a task is active in the calling thread, the filter reports its
+    progress to the task and is aborted when the task is cancelled.
+    """
+    algorithm.SetInputData(data)
+    task = current_task()
+    if task is None:
+        algorithm.Update()
+    else:
+        with task.watch(algorithm):
+            algorithm.Update()
+    return algorithm.GetOutput()
+
+
+def _abort(algorithm):
+    # VTK >= 9.3 also propagates the abort to downstream filters
+    if hasattr(algorithm, 'SetAbortExecuteAndUpdateTime'):
+        algorithm.SetAbortExecuteAndUpdateTime()
+    else:
+        algorithm.SetAbortExecute(1)
+
+
+class TaskRunner:
+    """
+    Run functions of a widget in a background thread.
+
+    Adds a progress bar and a cancel button after the button that starts
+    the function, which are shown while it runs. The button is disabled
+    meanwhile, so only one function runs at a time.
+
+    Parameters
+    ----------
+    widget : widgets.Container
+        The widget that contains `button`.
+    button : widgets.PushButton
+        The button that starts the function.
+    """
+
+    def __init__(self, widget: widgets.Container, button: widgets.PushButton):
+        from qtpy.QtCore import QTimer
+
+        self.widget = widget
+        self.button = button
+        self.task = None
+        self.worker = None
+
+        self.progress_bar = widgets.ProgressBar(
+            value=0, min=0, max=100, label='Progress', visible=False,
+            gui_only=True)
+        self.cancel_button = widgets.PushButton(
+            text='Cancel', visible=False, gui_only=True)
+        self.cancel_button.clicked.connect(self.cancel)
+
+        position = self.widget.index(button) + 1
+        self.widget.insert(position, self.cancel_button)
+        self.widget.insert(position, self.progress_bar)
+
+        self._timer = QTimer()
+        self._timer.setInterval(100)
+        self._timer.timeout.connect(self._update_progress)
+
+    @property
+    def running(self) -> bool:
+        return self.worker is not None
+
+    def run(
+            self,
+            function: Callable[[], Any],
+            on_returned: Callable[[Any], None],
+            label: str = ''):
+        """
+        Run `function` in a worker with a new task active.
+
+        `on_returned` is called with the result in the GUI thread once the
+        function has finished. Errors and cancellation are shown as napari
+        notifications, prefixed with `label`.
+        """
+        from napari.qt.threading import create_worker
+
+        if self.running:
+            return
+
+        self.task = task = Task()
+
+        def _run():
+            try:
+                with task.activate():
+                    result = function()
+            except Exception:
+                # aborted VTK filters return empty data, which may fail later
+                task.check()
+                raise
+            task.check()
+            return result
+
+        self.worker = create_worker(
+            _run, _start_thread=False, _ignore_errors=True)
+        self.worker.returned.connect(on_returned)
+        self.worker.errored.connect(
+            lambda error: self._on_errored(error, label))
+        self.worker.finished.connect(self._on_finished)
+
+        self.button.enabled = False
+        self.progress_bar.value = 0
+        self.progress_bar.visible = True
+        self.cancel_button.visible = True
+        self.cancel_button.enabled = True
+        self._timer.start()
+        self.worker.start()
+
+    def cancel(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.cancel_button.enabled = False
+
+    def _update_progress(self):
+        if self.task is not None:
+            self.progress_bar.value = int(100 * self.task.progress)
+
+    def _on_errored(self, error: Exception, label: str):
+        from napari.utils.notifications import show_error, show_info
+
+        if isinstance(error, Cancelled):
+            show_info(f'{label} was cancelled')
+        else:
+            show_error(f'{label} failed: {error}')
+
+    def _on_finished(self):
+        self._timer.stop()
+        self.worker = None
+        self.task = None
+        self.button.enabled = True
+        self.progress_bar.visible = False
+        self.cancel_button.visible = False
+
+
+class BackgroundRunner(TaskRunner):
+    """
+    Run the function of a widget in a background thread.
+
+    The call button of the widget starts the function in a napari thread
+    worker instead of the GUI thread and shows a progress bar and a cancel
+    button while it runs. The result is passed to napari (and thus added
+    as layer) only once the function has finished. Calling the widget
+    directly, e.g. `widget()` in scripts, still runs synchronously.
+
+    Parameters
+    ----------
+    widget : FunctionGui
+        The widget to run in the background.
+    """
+
+    def __init__(self, widget: FunctionGui):
+        super().__init__(widget, widget.call_button)
+
+        # replace the synchronous call of the call button
+        self.widget.call_button.changed.disconnect()
+        self.widget.call_button.changed.connect(self.start)
+
+    def start(self):
+        """Run the function with the current parameters in a worker."""
+        bound = self.widget.__signature__.bind()
+        bound.apply_defaults()
+        kwargs = dict(bound.arguments)
+        function = self.widget.__wrapped__
+        self.run(lambda: function(**kwargs), self._on_returned,
+                 self.widget.label)
+
+    def _on_returned(self, value):
+        from magicgui.type_map import type2callback
+
+        # same as FunctionGui.__call__ after the function returned
+        return_type = self.widget.__signature__.return_annotation
+        if return_type:
+            for callback in type2callback(return_type):
+                callback(self.widget, value, return_type)
+        self.widget.called.emit(value)
@@ -0,0 +1,192 @@
+import hashlib
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+from ._background import current_task
+
+
+_default_max_memory = 1024 ** 3  # 1 GB
+
+
+def fingerprint(data: Any) -> str:
+    """
+    Content hash of layer data, e.g. napari surface data.
+
+    Tuples and lists of arrays (vertices, faces[, values]) are hashed element
+    by element. Shape and dtype are part of the hash, so arrays with the same
+    bytes but different layout have different fingerprints.
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    for array in data if isinstance(data, (tuple, list)) else [data]:
+        array = np.ascontiguousarray(array)
+        hasher.update(f'{array.dtype.str}{array.shape}'.encode())
+        hasher.update(array.data)
+    return hasher.hexdigest()
+
+
+def _nbytes(value: Any) -> int:
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sum(_nbytes(v) for v in value)
+    if hasattr(value, 'dataset'):  # vedo objects
+        return value.dataset.GetActualMemorySize() * 1024
+    return 0
+
+
+class MeshCache:
+    """
+    Size-bounded LRU cache for results of mesh operations.
+
+    Two kinds of entries are stored:
+
+    - results of operations, keyed on the fingerprint of the input data, the
+      name of the operation and its parameters, so that repeating or
+      reverting a parameter change returns immediately.
+    - vedo meshes converted from napari surface data, keyed on the
+      fingerprint of the data, so that different operations on an unchanged
+      layer skip the conversion.
+
+    Cached arrays never share memory with layer data: they are read-only
+    copies, and results are returned as copies. Editing a layer in place
+    thus neither changes the cache nor other layers created from it.
+
+    Parameters
+    ----------
+    max_memory : int, optional
+        Maximal size of the cached arrays in bytes, by default 1 GB. The most
+        recently used entry is always kept.
+    """
+
+    def __init__(self, max_memory: int = _default_max_memory):
+        self.max_memory = max_memory
+        self.hits = 0
+        self.misses = 0
+
+        self._cache = OrderedDict()
+        self._sizes = {}
+        self._cache_size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._cache
+
+    @property
+    def cache_size(self) -> int:
+        """Size of the currently cached arrays in bytes."""
+        return self._cache_size
+
+    def get(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Get the cached value for `key` or compute and cache it.
+
+        `compute` is called without holding the lock, so that several threads
+        can compute different entries at the same time.
+        """
+        with self._lock:
+            if key in self._cache:
+                self.hits += 1
+                self._cache.move_to_end(key)
+                return self._cache[key]
+            self.misses += 1
+
+        value = compute()
+
+        # results of aborted VTK filters must not be cached
+        task = current_task()
+        if task is not None:
+            task.check()
+
+        self._put(key, value, _nbytes(value))
+        return value
+
+    def result(
+            self,
+            data: "napari.types.SurfaceData",
+            operation: str,
+            parameters: dict,
+            compute: Callable[[], Any]) -> Any:
+        """
+        Get the cached result of `operation` with `parameters` on `data`.
+        """
+        key = ('result', fingerprint(data), operation, _freeze(parameters))
+        return _copy(self.get(key, lambda: _detach(compute(), data)))
+
+    def vedo_mesh(self, data: "napari.types.SurfaceData") -> "vedo.Mesh":
+        """
+        Get a vedo mesh for napari surface data, reusing earlier conversions.
+
+        The cached mesh holds a copy of the data. A shallow copy of it is
+        returned, so that operations on it do not alter the cached mesh.
+        """
+        from .utils import surface_data_to_vedo_mesh
+
+        mesh = self.get(
+            ('mesh', fingerprint(data)),
+            lambda: surface_data_to_vedo_mesh(
+                (np.array(data[0]), np.array(data[1]))))
+        return mesh.clone(deep=False)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._sizes.clear()
+            self._cache_size = 0
+
+    def _put(self, key: Hashable, value: Any, size: int):
+        with self._lock:
+            if key in self._cache:
+                self._cache_size -= self._sizes[key]
+            self._cache[key] = value
+            self._sizes[key] = size
+            self._cache_size += size
+            while self._cache_size > self.max_memory and len(self._cache) > 1:
+                old_key, _ = self._cache.popitem(last=False)
+                self._cache_size -= self._sizes.pop(old_key)
+
+
+def _detach(value: Any, data: Any) -> Any:
+    """
+    Make the arrays of a result read-only, copying those that share memory
+    with the input data.
+    """
+    if isinstance(value, (tuple, list)):
+        return type(value)(_detach(v, data) for v in value)
+    if not isinstance(value, np.ndarray):
+        return value
+    inputs = data if isinstance(data, (tuple, list)) else [data]
+    if any(np.may_share_memory(value, array) for array in inputs
+           if isinstance(array, np.ndarray)):
+        value = value.copy()
+    value.flags.writeable = False
+    return value
+
+
+def _copy(value: Any) -> Any:
+    """Writeable copy of the arrays of a cached result."""
+    if isinstance(value, (tuple, list)):
+        return type(value)(_copy(v) for v in value)
+    if isinstance(value, np.ndarray):
+        return value.copy()
+    return value
+
+
+def _freeze(value: Any) -> Hashable:
+    """Turn (nested) parameters into a hashable key."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, np.ndarray):
+        return (value.dtype.str, value.shape, value.tobytes())
+    return value
+
+
+# Cache shared by the mesh operations of this plugin
+mesh_cache = MeshCache()
+
@@ -0,0 +1,338 @@
+"""
+Command line interface to run mesh and point cloud operations headless.
+
+Example:
+    napari-vedo-bridge process meshes/ -o processed/ \
+        --step fill_holes --step smooth:n_iterations=30 \
+        --step decimate_pro:fraction=0.5 --workers 8
+    napari-vedo-bridge fetch-samples --mirror /shared/vedo-data
+"""
+import argparse
+import ast
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='napari-vedo-bridge',
+        description='Process meshes and point clouds without a viewer.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    process = subparsers.add_parser(
+        'process',
+        help='Apply a chain of operations to a directory of files.',
+        description='Apply a chain of operations to every file in a '
+                    'directory or matching a glob pattern.')
+    process.add_argument(
+        'input', help='Input directory or glob pattern, e.g. "data/*.ply".')
+    process.add_argument(
+        '-o', '--output', required=True, help='Output directory.')
+    process.add_argument(
+        '-s', '--step', action='append', default=[], dest='steps',
+        metavar='OPERATION[:KEY=VALUE,...]',
+        help='Operation to apply, e.g. "smooth:n_iterations=30". '
+             'Can be given several times; steps run in the given order.')
+    process.add_argument(
+        '-p', '--pipeline',
+        help='Pipeline json file (see MeshPipeline.save). Steps given with '
+             '--step are appended to it.')
+    process.add_argument(
+        '-c', '--cut',
+        help='Recorded cuts json file (see CutRecord.save), applied before '
+             'the steps.')
+    process.add_argument(
+        '-f', '--format',
+        help='Output file format (e.g. vtp). Defaults to the input format; '
+             'compressed inputs (.gz) are written uncompressed.')
+    process.add_argument(
+        '--data-mode', choices=['appended', 'binary', 'ascii'],
+        default='appended', help='Data layout of written files.')
+    process.add_argument(
+        '--compression', choices=['zlib', 'lz4', 'lzma', 'none'],
+        default='zlib', help='Compression of written .vtp/.vtkhdf files.')
+    process.add_argument(
+        '--compression-level', type=int, default=5,
+        help='Compression level from 1 (fastest) to 9 (smallest).')
+    process.add_argument(
+        '--float32', action='store_true',
+        help='Store coordinates and features in single precision.')
+    process.add_argument(
+        '-w', '--workers', type=int, default=None,
+        help='Number of worker processes. Defaults to the number of cores.')
+    process.set_defaults(function=_process)
+
+    fetch = subparsers.add_parser(
+        'fetch-samples',
+        help='Download the sample meshes into the local cache.',
+        description='Download the sample meshes into the local cache, so '
+                    'they can be opened without network access.')
+    fetch.add_argument(
+        'samples', nargs='*',
+        help='Names of the samples to fetch, e.g. "bunny". Defaults to all.')
+    fetch.add_argument(
+        '--mirror',
+        help='Local directory or URL to fetch from instead of the vedo '
+             'example data.')
+    fetch.add_argument(
+        '--cache-dir', help='Cache directory. Defaults to '
+                            'NAPARI_VEDO_BRIDGE_SAMPLE_DIR or '
+                            '~/.cache/napari-vedo-bridge/samples.')
+    fetch.add_argument(
+        '--force', action='store_true',
+        help='Fetch the samples again even if they are cached.')
+    fetch.set_defaults(function=_fetch_samples)
+
+    args = parser.parse_args(argv)
+    return args.function(args)
+
+
+def _process(args) -> int:
+    import os
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    from ._cut import CutRecord
+    from ._pipeline import MeshPipeline
+    from ._writer import Encoding, _check_encoding
+
+    encoding = _check_encoding(Encoding(
+        data_mode=args.data_mode,
+        compression=None if args.compression == 'none' else args.compression,
+        compression_level=args.compression_level,
+        float32=args.float32))
+
+    pipeline = MeshPipeline.load(args.pipeline) if args.pipeline else MeshPipeline()
+    for step in args.steps:
+        operation, parameters = _parse_step(step)
+        pipeline.add(operation, **parameters)
+    cut = CutRecord.load(args.cut).to_dict() if args.cut else None
+
+    files = _find_files(args.input)
+    if not files:
+        print(f'No supported files found in {args.input}', file=sys.stderr)
+        return 1
+
+    output_paths = _output_paths(files, args.output, args.format)
+    collisions = _collisions(files, output_paths)
+    if collisions:
+        for output_path, inputs in collisions.items():
+            print(f'{", ".join(inputs)} would all be written to '
+                  f'{output_path}', file=sys.stderr)
+        return 1
+
+    n_workers = args.workers or os.cpu_count() or 1
+    print(f'Processing {len(files)} files with {n_workers} workers: {pipeline}')
+
+    n_failed = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        futures = {
+            executor.submit(
+                _process_file, path, pipeline.to_dict(),
+                output_path, encoding, cut): path
+            for path, output_path in zip(files, output_paths)
+        }
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                output_path, duration = future.result()
+                print(f'{path} -> {output_path} ({duration:.2f} s)')
+            except Exception as error:  # noqa: BLE001 - report and continue
+                n_failed += 1
+                print(f'{path} failed: {error}', file=sys.stderr)
+
+    print(f'Processed {len(files) - n_failed}/{len(files)} files '
+          f'in {time.perf_counter() - start:.2f} s')
+    return 1 if n_failed else 0
+
+
+def _fetch_samples(args) -> int:
+    from ._sample_cache import _sha256, fetch_sample, samples
+
+    unknown = [name for name in args.samples if name not in samples]
+    if unknown:
+        print(f'Unknown samples: {", ".join(unknown)}. '
+              f'Available: {", ".join(samples)}', file=sys.stderr)
+        return 1
+
+    n_failed = 0
+    for name in args.samples or samples:
+        try:
+            path = fetch_sample(
+                samples[name], mirror=args.mirror, directory=args.cache_dir,
+                force=args.force)
+            print(f'{name} -> {path} (sha256 {_sha256(path)})')
+        except (OSError, ValueError) as error:
+            n_failed += 1
+            print(f'{name} failed: {error}', file=sys.stderr)
+    return 1 if n_failed else 0
+
+
+def _process_file(
+        path: str,
+        pipeline: dict,
+        output_path: str,
+        encoding: Optional["Encoding"] = None,
+        cut: Optional[dict] = None) -> Tuple[str, float]:
+    """
+    Read a file, apply the cuts and the pipeline and write the result.
+
+    Runs in a worker process, so the pipeline and cuts are passed as
+    dictionaries. The point data of the file is passed through the
+    operations (which interpolate it where they create new points) and
+    written as features.
+
+    Returns
+    -------
+    Tuple[str, float]
+        Path of the written file and the processing time in seconds.
+    """
+    import os
+    import vedo
+    from importlib.metadata import version
+    from packaging.version import Version
+    from ._cut import CutRecord
+    from ._features import features_table
+    from ._pipeline import MeshPipeline
+    from ._reader import _guess_layer_type, _load_points_data, _load_surface_data
+    from ._writer import write_points, write_surfaces
+    from .utils import surface_data_to_vedo_mesh, vedo_mesh_to_surface_data
+
+    start = time.perf_counter()
+    pipeline = MeshPipeline.from_dict(pipeline)
+    cuts = CutRecord.from_dict(cut) if cut else CutRecord()
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+
+    if _guess_layer_type(path) == 'surface':
+        vertices, faces, pointdata = _load_surface_data(path)
+        mesh = surface_data_to_vedo_mesh((vertices, faces))
+        _set_pointdata(mesh, pointdata)
+        mesh = pipeline.run(cuts.run(mesh))
+        attributes = {}
+        # surface_layer.features only available in napari 0.5.0 or higher
+        if Version(version('napari')) >= Version('0.5.0'):
+            attributes['features'] = features_table(_get_pointdata(mesh))
+        write_surfaces(
+            output_path, vedo_mesh_to_surface_data(mesh), attributes,
+            encoding=encoding)
+    else:
+        vertices, _, pointdata = _load_points_data(path)
+        points = vedo.Points(vertices)
+        _set_pointdata(points, pointdata)
+        points = pipeline.run(cuts.run(points))
+        write_points(
+            output_path, points.vertices,
+            {'features': features_table(_get_pointdata(points))},
+            encoding=encoding)
+
+    return output_path, time.perf_counter() - start
+
+
+def _set_pointdata(mesh: "vedo.Points", pointdata: dict):
+    for key, values in pointdata.items():
+        mesh.pointdata[key] = values
+
+
+def _get_pointdata(mesh: "vedo.Points") -> dict:
+    """Numeric point data arrays with one value (or vector) per point."""
+    import numpy as np
+
+    pointdata = {}
+    for key in mesh.pointdata.keys():
+        values = mesh.pointdata[key]
+        if values is not None and len(values) == mesh.npoints and \
+                np.issubdtype(values.dtype, np.number):
+            pointdata[key] = values
+    return pointdata
+
+
+def _output_paths(
+        files: List[str],
+        output_dir: str,
+        file_format: Optional[str] = None) -> List[str]:
+    """
+    Output path of every input file.
+
+    Files keep their path relative to the common parent directory of all
+    inputs, so that files with the same name in different directories do
+    not overwrite each other. Compressed inputs (`.gz`) are written
+    uncompressed in their inner format unless another format is given.
+    """
+    import os
+    from ._formats import _gzip_suffix, mesh_extension
+
+    directories = [os.path.dirname(os.path.abspath(f)) for f in files]
+    base = os.path.commonpath(directories)
+    output_paths = []
+    for path, directory in zip(files, directories):
+        name = os.path.basename(path)
+        if name.lower().endswith(_gzip_suffix):
+            name = name[:-len(_gzip_suffix)]
+        name = f'{Path(name).stem}.{file_format or mesh_extension(path)}'
+        output_paths.append(os.path.normpath(os.path.join(
+            output_dir, os.path.relpath(directory, base), name)))
+    return output_paths
+
+
+def _collisions(files: List[str], output_paths: List[str]) -> dict:
+    """Output paths to which more than one input file would be written."""
+    inputs = {}
+    for path, output_path in zip(files, output_paths):
+        inputs.setdefault(output_path, []).append(path)
+    return {
+        output_path: paths for output_path, paths in inputs.items()
+        if len(paths) > 1}
+
+
+def _find_files(pattern: str) -> List[str]:
+    """
+    Get the supported files in a directory or matching a glob pattern.
+    """
+    import glob
+    import os
+    from ._reader import _is_supported, _list_files
+
+    if os.path.isdir(pattern):
+        return _list_files(pattern)
+    return sorted(f for f in glob.glob(pattern) if _is_supported(f))
+
+
+def _parse_step(step: str) -> Tuple[str, dict]:
+    """
+    Parse a step of the form "operation:key=value,key=value".
+
+    Values are interpreted as Python literals where possible,
+    e.g. "divisions=(10,10,10)".
+    """
+    operation, _, arguments = step.partition(':')
+    parameters = {}
+    for argument in _split_arguments(arguments):
+        key, _, value = argument.partition('=')
+        try:
+            parameters[key.strip()] = ast.literal_eval(value.strip())
+        except (ValueError, SyntaxError):
+            parameters[key.strip()] = value.strip()
+    return operation.strip(), parameters
+
+
+def _split_arguments(arguments: str) -> List[str]:
+    """Split at commas that are not enclosed in brackets."""
+    parts, depth, current = [], 0, ''
+    for character in arguments:
+        if character in '([':
+            depth += 1
+        elif character in ')]':
+            depth -= 1
+        if character == ',' and depth == 0:
+            parts.append(current)
+            current = ''
+        else:
+            current += character
+    if current.strip():
+        parts.append(current)
+    return parts
+
+
+if __name__ == '__main__':
+    sys.exit(main())
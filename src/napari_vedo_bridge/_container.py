@@ -0,0 +1,198 @@
+"""
+Single-file timelapse container based on the VTKHDF format.
+
+All frames of a points or surface timelapse are stored in one `.vtkhdf`
+file. Vertices, cells and point data of all frames are concatenated, and
+the `Steps` group of the file holds the offsets of every frame, so any
+frame can be read without touching the others. The files can also be
+opened in ParaView.
+"""
+import threading
+import numpy as np
+from typing import Iterator, Optional, Tuple
+
+from vtkmodules.util.vtkAlgorithm import VTKPythonAlgorithmBase
+from vtkmodules.vtkCommonDataModel import vtkPolyData
+from vtkmodules.vtkCommonExecutionModel import (
+    vtkStreamingDemandDrivenPipeline,
+)
+
+
+_extension = 'vtkhdf'
+
+
+def is_container(path) -> bool:
+    """Whether a path points to a single-file timelapse container."""
+    return str(path).split('.')[-1].lower() == _extension
+
+
+def write_container(
+        path: str,
+        frames: Iterator[tuple],
+        n_frames: Optional[int] = None,
+        compression_level: int = 0,
+        float32: bool = False):
+    """
+    Write frames to a VTKHDF file.
+
+    Parameters
+    ----------
+    path : str
+        Output file.
+    frames : Iterator[tuple]
+        `(vertices, faces, pointdata)` of every frame. `faces` is None for
+        points. Frames are consumed one by one while writing.
+    n_frames : int, optional
+        Number of frames. If None, a single frame without time information
+        is written (3D data).
+    compression_level : int, optional
+        gzip compression level of the datasets (0-9), by default 0.
+    float32 : bool, optional
+        Store coordinates and float features in single precision.
+    """
+    from vtkmodules.vtkIOHDF import vtkHDFWriter
+
+    writer = vtkHDFWriter()
+    writer.SetFileName(str(path))
+    writer.SetCompressionLevel(compression_level)
+
+    if n_frames is None:
+        writer.SetInputData(_to_polydata(*next(iter(frames)), float32))
+    else:
+        source = _FrameSource(frames, n_frames, float32)
+        writer.SetInputConnection(source.GetOutputPort())
+        writer.SetWriteAllTimeSteps(True)
+
+    if not writer.Write():
+        raise OSError(f'Could not write {path}')
+
+
+class ContainerReader:
+    """
+    Random access to the frames of a VTKHDF timelapse file.
+
+    Parameters
+    ----------
+    path : str
+        Path to the `.vtkhdf` file.
+    """
+
+    def __init__(self, path: str):
+        from vtkmodules.vtkIOHDF import vtkHDFReader
+
+        self.path = str(path)
+        self._reader = vtkHDFReader()
+        self._reader.SetFileName(self.path)
+        self._reader.UpdateInformation()
+        self._lock = threading.Lock()
+
+        information = self._reader.GetOutputInformation(0)
+        self.is_timelapse = information.Has(
+            vtkStreamingDemandDrivenPipeline.TIME_STEPS())
+
+    def __len__(self) -> int:
+        if not self.is_timelapse:
+            return 1
+        return self._reader.GetNumberOfSteps()
+
+    def __getitem__(self, t: int) -> Tuple[np.ndarray, np.ndarray, dict]:
+        """
+        Read frame `t`.
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray, dict]
+            Vertices, faces (empty for points) and point data of the frame.
+        """
+        import vedo
+        from .utils import vedo_mesh_faces
+
+        if not 0 <= t < len(self):
+            raise IndexError(f'Frame {t} out of range for {len(self)} frames')
+
+        # HDF5 is not thread-safe, so frames are read one at a time
+        with self._lock:
+            if self.is_timelapse:
+                self._reader.SetStep(int(t))
+            self._reader.Update()
+            polydata = vtkPolyData()
+            polydata.ShallowCopy(self._reader.GetOutput())
+
+        mesh = vedo.Mesh(polydata)
+        faces = vedo_mesh_faces(mesh) if polydata.GetNumberOfPolys() else \
+            np.zeros((0, 3), dtype=int)
+        return mesh.vertices, np.asarray(faces, dtype=int), dict(mesh.pointdata)
+
+    @property
+    def layer_type(self) -> str:
+        """`'surface'` if the first frame has faces, else `'points'`."""
+        return 'surface' if len(self[0][1]) else 'points'
+
+
+class _FrameSource(VTKPythonAlgorithmBase):
+    """
+    Temporal VTK source that takes its frames from an iterator.
+
+    The HDF writer requests the time steps in ascending order, so every frame
+    is converted right before it is written and released afterwards.
+    """
+
+    def __init__(
+            self, frames: Iterator[tuple], n_frames: int, float32: bool):
+        super().__init__(
+            nInputPorts=0, nOutputPorts=1, outputType='vtkPolyData')
+        self._frames = iter(frames)
+        self._n_frames = n_frames
+        self._float32 = float32
+        self._current = (-1, None)
+
+    def RequestInformation(self, request, in_info, out_info):
+        info = out_info.GetInformationObject(0)
+        steps = [float(t) for t in range(self._n_frames)]
+        info.Set(
+            vtkStreamingDemandDrivenPipeline.TIME_STEPS(), steps, len(steps))
+        info.Set(
+            vtkStreamingDemandDrivenPipeline.TIME_RANGE(),
+            [steps[0], steps[-1]], 2)
+        return 1
+
+    def RequestData(self, request, in_info, out_info):
+        info = out_info.GetInformationObject(0)
+        t = 0
+        if info.Has(vtkStreamingDemandDrivenPipeline.UPDATE_TIME_STEP()):
+            t = int(round(info.Get(
+                vtkStreamingDemandDrivenPipeline.UPDATE_TIME_STEP())))
+
+        index, polydata = self._current
+        if t != index:
+            if t != index + 1:
+                raise RuntimeError('Frames must be requested in order')
+            polydata = _to_polydata(*next(self._frames), self._float32)
+            self._current = (t, polydata)
+
+        vtkPolyData.GetData(out_info).ShallowCopy(polydata)
+        return 1
+
+
+def _to_polydata(
+        vertices: np.ndarray,
+        faces: Optional[np.ndarray],
+        features: dict,
+        float32: bool = False) -> vtkPolyData:
+    import vedo
+    from .utils import _numpy_to_vtk_points, surface_data_to_vedo_mesh
+
+    if float32:
+        vertices = np.asarray(vertices, dtype=np.float32)
+    if faces is None:
+        mesh = vedo.Points(np.asarray(vertices))
+        if float32:
+            # vedo stores points in double precision
+            mesh.dataset.SetPoints(_numpy_to_vtk_points(vertices))
+    else:
+        mesh = surface_data_to_vedo_mesh((vertices, faces))
+    for key, values in features.items():
+        if float32 and values.dtype == np.float64:
+            values = values.astype(np.float32)
+        mesh.pointdata[key] = values
+    return mesh.dataset
@@ -0,0 +1,245 @@
+"""
+Recorded cuts of the mesh cutter.
+
+The cutter widgets of `VedoCutter` clip the mesh in the plotter with an
+implicit function: a box (six planes), a plane or a sphere. A `Cut` stores
+the parameters of this function, and a `CutRecord` an ordered list of cuts,
+so that they can be applied again without the interactive plotter, e.g. to
+the full resolution data, to every frame of a 4D surface or to a directory
+of files (`napari-vedo-bridge process --cut cuts.json`).
+"""
+import json
+import vedo
+import numpy as np
+from napari.layers import Surface
+from napari.types import LayerDataTuple
+from typing import List, NamedTuple, Optional
+
+
+class Cut(NamedTuple):
+    """
+    Implicit function of a cutter.
+
+    Parameters
+    ----------
+    kind : str
+        `'box'`, `'plane'` or `'sphere'`.
+    parameters : dict
+        `origins` and `normals` of the six planes of a box (normals pointing
+        outwards), `origin` and `normal` of a plane or `center` and `radius`
+        of a sphere.
+    inside_out : bool
+        If True, the part of the mesh where the function is negative (inside
+        the box or sphere, behind the plane) is kept, otherwise the other
+        part.
+    """
+    kind: str
+    parameters: dict
+    inside_out: bool = True
+
+    @classmethod
+    def from_cutter(cls, cutter) -> "Cut":
+        """Record the current state of a vedo BoxCutter, PlaneCutter or SphereCutter."""
+        from vtkmodules.util.numpy_support import vtk_to_numpy
+        from vtkmodules.vtkCommonDataModel import vtkPlane, vtkPlanes, vtkSphere
+
+        function = cutter.clipper.GetClipFunction()
+        inside_out = bool(cutter.clipper.GetInsideOut())
+        if isinstance(function, vtkPlanes):
+            parameters = {
+                'origins': vtk_to_numpy(function.GetPoints().GetData()).tolist(),
+                'normals': vtk_to_numpy(function.GetNormals()).tolist(),
+            }
+            return cls('box', parameters, inside_out)
+        if isinstance(function, vtkPlane):
+            parameters = {
+                'origin': list(function.GetOrigin()),
+                'normal': list(function.GetNormal()),
+            }
+            return cls('plane', parameters, inside_out)
+        if isinstance(function, vtkSphere):
+            parameters = {
+                'center': list(function.GetCenter()),
+                'radius': function.GetRadius(),
+            }
+            return cls('sphere', parameters, inside_out)
+        raise ValueError(f'Unsupported cut function {type(function).__name__}')
+
+    def implicit_function(self) -> "vtkImplicitFunction":
+        from vtkmodules.util.numpy_support import numpy_to_vtk
+        from vtkmodules.vtkCommonCore import vtkPoints
+        from vtkmodules.vtkCommonDataModel import vtkPlane, vtkPlanes, vtkSphere
+
+        if self.kind == 'box':
+            points = vtkPoints()
+            points.SetData(numpy_to_vtk(
+                np.asarray(self.parameters['origins'], dtype=float), deep=True))
+            function = vtkPlanes()
+            function.SetPoints(points)
+            function.SetNormals(numpy_to_vtk(
+                np.asarray(self.parameters['normals'], dtype=float), deep=True))
+        elif self.kind == 'plane':
+            function = vtkPlane()
+            function.SetOrigin(self.parameters['origin'])
+            function.SetNormal(self.parameters['normal'])
+        elif self.kind == 'sphere':
+            function = vtkSphere()
+            function.SetCenter(self.parameters['center'])
+            function.SetRadius(self.parameters['radius'])
+        else:
+            raise ValueError(f'Unknown cut {self.kind}')
+        return function
+
+    def evaluate(self, points: np.ndarray) -> np.ndarray:
+        """
+        Evaluate the implicit function at (N, 3) points.
+
+        Matches `vtkImplicitFunction.EvaluateFunction`, but vectorized.
+        """
+        points = np.asarray(points, dtype=float)
+        if self.kind == 'box':
+            origins = np.asarray(self.parameters['origins'], dtype=float)
+            normals = np.asarray(self.parameters['normals'], dtype=float)
+            values = points @ normals.T - np.einsum('ij,ij->i', origins, normals)
+            return values.max(axis=1)
+        if self.kind == 'plane':
+            normal = np.asarray(self.parameters['normal'], dtype=float)
+            normal = normal / np.linalg.norm(normal)
+            return (points - self.parameters['origin']) @ normal
+        if self.kind == 'sphere':
+            offset = points - np.asarray(self.parameters['center'], dtype=float)
+            return np.einsum('ij,ij->i', offset, offset) - \
+                self.parameters['radius'] ** 2
+        raise ValueError(f'Unknown cut {self.kind}')
+
+    def keep(self, points: np.ndarray) -> np.ndarray:
+        """Boolean mask of the points that are kept by the cut."""
+        values = self.evaluate(points)
+        return values <= 0 if self.inside_out else values >= 0
+
+    def clip(self, mesh: vedo.Points) -> vedo.Points:
+        """
+        Cut a mesh like the cutter widget does.
+
+        Meshes that lie completely on one side of the cut are returned
+        unchanged or empty without running the clip filter. Point clouds
+        and their point data are filtered with the point mask.
+        """
+        values = self.evaluate(mesh.vertices)
+        if self.inside_out:
+            values = -values
+        if not isinstance(mesh, vedo.Mesh) or mesh.ncells == 0:
+            kept = values >= 0
+            points = vedo.Points(mesh.vertices[kept])
+            for key in mesh.pointdata.keys():
+                if mesh.pointdata[key] is not None:
+                    points.pointdata[key] = mesh.pointdata[key][kept]
+            return points
+        if np.all(values > 0):
+            return mesh
+        if np.all(values < 0):
+            return vedo.Mesh([np.empty((0, 3)), np.empty((0, 3), dtype=int)])
+
+        from vtkmodules.util.numpy_support import vtk_to_numpy
+        from vtkmodules.vtkFiltersCore import vtkClipPolyData
+
+        clipper = vtkClipPolyData()
+        clipper.GenerateClipScalarsOff()
+        clipper.SetInputData(mesh.dataset)
+        clipper.SetClipFunction(self.implicit_function())
+        clipper.SetInsideOut(self.inside_out)
+        clipper.Update()
+        result = vedo.Mesh(clipper.GetOutput())
+        offsets = vtk_to_numpy(result.dataset.GetPolys().GetOffsetsArray())
+        if not np.all(np.diff(offsets) == 3):
+            result.triangulate()
+        return result
+
+
+class CutRecord:
+    """
+    An ordered list of cuts that can be replayed on surfaces and files.
+
+    Parameters
+    ----------
+    cuts : List[Cut], optional
+        Cuts in the order in which they are applied.
+
+    Examples
+    --------
+    >>> record = CutRecord().add(Cut.from_cutter(cutter))
+    >>> record.save('cuts.json')
+    >>> layers = CutRecord.load('cuts.json')(surface)
+    """
+
+    def __init__(self, cuts: Optional[List[Cut]] = None):
+        self.cuts = list(cuts or [])
+
+    def __len__(self) -> int:
+        return len(self.cuts)
+
+    def __repr__(self) -> str:
+        return f'CutRecord({self.cuts})'
+
+    def add(self, cut: Cut) -> "CutRecord":
+        self.cuts.append(cut)
+        return self
+
+    def run(self, mesh: vedo.Points) -> vedo.Points:
+        """Apply all cuts to a vedo mesh or point cloud."""
+        for cut in self.cuts:
+            mesh = cut.clip(mesh)
+        return mesh
+
+    def __call__(
+            self,
+            surface: Surface,
+            n_workers: Optional[int] = None) -> List[LayerDataTuple]:
+        """
+        Apply the cuts to a 3D surface or every frame of a 4D surface.
+
+        Frames are cut in parallel (see `_mesh._map_frames_parallel`).
+        """
+        from napari_vedo_bridge._mesh import (
+            _is_timelapse,
+            _map_frames_parallel,
+            _stack_frames,
+            _unstack,
+        )
+        from napari_vedo_bridge.utils import (
+            surface_data_to_vedo_mesh,
+            vedo_mesh_to_surface_data,
+        )
+
+        def _process(data):
+            mesh = self.run(surface_data_to_vedo_mesh(data))
+            vertices, faces = vedo_mesh_to_surface_data(mesh)
+            # copied, a mesh that was not cut still uses the surface's arrays
+            return (np.array(vertices).reshape(-1, 3),
+                    np.array(faces, dtype=int).reshape(-1, 3))
+
+        if _is_timelapse(surface):
+            frames = _map_frames_parallel(
+                _process, _unstack(surface), n_workers)
+            data = _stack_frames(list(enumerate(frames)))
+        else:
+            data = _process(surface.data[:2])
+        return [(data, {'name': f'{surface.name} (cut)'}, 'surface')]
+
+    def to_dict(self) -> dict:
+        return {'cuts': [cut._asdict() for cut in self.cuts]}
+
+    @classmethod
+    def from_dict(cls, record: dict) -> "CutRecord":
+        return cls([Cut(**cut) for cut in record['cuts']])
+
+    def save(self, path: str):
+        """Save the cuts to a json file."""
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> "CutRecord":
+        """Load cuts from a json file."""
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
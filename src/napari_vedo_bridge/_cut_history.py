@@ -0,0 +1,148 @@
+"""
+Undo/redo history of the cuts in the mesh cutter.
+
+Instead of copies of the cut mesh, every state of the history is stored as
+bit-packed mask of the cells of the original mesh that are left, i.e. one
+bit per face: 1.25 MB per state for a mesh with 10 million faces, together
+with the cuts that led to it (see `_cut.Cut`).
+
+A mask keeps the original faces with a vertex on the kept side of each cut.
+Stepping through the history clips these faces with the cuts of the state
+again, so undo and redo show the same cut edge as the cutter widget did, and
+the clip only runs on the faces that are left.
+"""
+import numpy as np
+from typing import List, NamedTuple, Optional, Tuple
+
+
+class CutState(NamedTuple):
+    """A state of the history: packed face mask and the cuts applied."""
+    mask: np.ndarray
+    cuts: Tuple["Cut", ...] = ()
+
+
+class CutHistory:
+    """
+    Undo/redo history of cuts of a mesh.
+
+    Parameters
+    ----------
+    vertices : np.ndarray
+        (N, 3) vertices of the original mesh.
+    faces : np.ndarray
+        (M, 3) triangles of the original mesh.
+    max_states : int, optional
+        Number of states that are kept, by default 100. The oldest states
+        are dropped first.
+    """
+
+    def __init__(
+            self,
+            vertices: np.ndarray,
+            faces: np.ndarray,
+            max_states: int = 100):
+        self.vertices = vertices
+        self.faces = faces
+        self.max_states = max_states
+        self._states: List[CutState] = [
+            CutState(np.packbits(np.ones(len(faces), dtype=bool)))]
+        self._index = 0
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    @property
+    def index(self) -> int:
+        """Index of the current state, 0 is the uncut mesh."""
+        return self._index
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the stored masks."""
+        return sum(state.mask.nbytes for state in self._states)
+
+    @property
+    def can_undo(self) -> bool:
+        return self._index > 0
+
+    @property
+    def can_redo(self) -> bool:
+        return self._index < len(self._states) - 1
+
+    def state(self) -> CutState:
+        """The current state."""
+        return self._states[self._index]
+
+    def mask(self, state: Optional[CutState] = None) -> np.ndarray:
+        """Boolean face mask of a state, by default of the current one."""
+        if state is None:
+            state = self.state()
+        return np.unpackbits(state.mask, count=len(self.faces)).view(bool)
+
+    def push(self, mask: np.ndarray, cuts: Tuple["Cut", ...] = ()):
+        """Add a state after the current one, discarding the redo states."""
+        del self._states[self._index + 1:]
+        self._states.append(CutState(np.packbits(mask), tuple(cuts)))
+        if len(self._states) > self.max_states:
+            del self._states[:len(self._states) - self.max_states]
+        self._index = len(self._states) - 1
+
+    def cut(self, cut: "Cut", base: Optional[CutState] = None) -> np.ndarray:
+        """
+        Add the state after a cut.
+
+        Parameters
+        ----------
+        cut : Cut
+            The cut, see `_cut.Cut`.
+        base : CutState, optional
+            State that was cut, by default the current one. An adjusted
+            cutter cuts the state it was created on again.
+
+        Returns
+        -------
+        np.ndarray
+            Mask of the faces that are clipped to get the remaining mesh.
+        """
+        if base is None:
+            base = self.state()
+        kept_vertices = cut.keep(self.vertices)
+        mask = self.mask(base) & kept_vertices[self.faces].any(axis=1)
+        self.push(mask, base.cuts + (cut,))
+        return mask
+
+    def undo(self) -> np.ndarray:
+        """Go back one state and return its mask."""
+        if self.can_undo:
+            self._index -= 1
+        return self.mask()
+
+    def redo(self) -> np.ndarray:
+        """Go forward one state and return its mask."""
+        if self.can_redo:
+            self._index += 1
+        return self.mask()
+
+    def mesh(self) -> "vedo.Mesh":
+        """The masked faces of the current state clipped with its cuts."""
+        from ._cut import CutRecord
+        from .utils import surface_data_to_vedo_mesh
+
+        faces = self.faces[self.mask()]
+        used = np.zeros(len(self.vertices), dtype=bool)
+        used[faces] = True
+        new_index = np.cumsum(used) - 1
+        mesh = surface_data_to_vedo_mesh(
+            (self.vertices[used], new_index[faces].astype(faces.dtype)))
+        return CutRecord(list(self.state().cuts)).run(mesh)
+
+    def surface_data(self) -> "napari.types.SurfaceData":
+        """
+        Vertices and faces of the current state.
+
+        Like the clipped meshes of the cutters, only the vertices used by the
+        remaining faces are kept.
+        """
+        from .utils import vedo_mesh_to_surface_data
+
+        return vedo_mesh_to_surface_data(self.mesh())
@@ -10,7 +10,15 @@ from vtkmodules.qt.QVTKRenderWindowInteractor import QVTKRenderWindowInteractor
 from vedo import __version__ as _vedo_version
 from vedo import Plotter, Text2D, Mesh, Axes, dataurl
 from vedo import BoxCutter, PlaneCutter, SphereCutter
-from vedo.utils import is_ragged
+
+from ._cut import Cut, CutRecord
+from ._cut_history import CutHistory
+from ._formats import load_mesh_file
+from ._lod import LevelOfDetail
+from .utils import (
+    is_triangle_mesh,
+    vedo_mesh_faces,
+)
 
 
 class VedoCutter(QWidget):
@@ -19,8 +27,12 @@ class VedoCutter(QWidget):
         super().__init__()
 
         self.mesh = None
+        self.lod = None
+        self.cut_record = CutRecord()
+        self.history = None
 
         self.cutter_widget = None
+        self._cutter_base = None
 
         self.mesh_color = "yellow6"
         self.mesh_backcolor = "purple7"
@@ -43,6 +55,13 @@ class VedoCutter(QWidget):
         self.pushButton_plane_cutter.clicked.connect(self.plane_cutter_tool)
         self.pushButton_load_mesh.clicked.connect(self._load_mesh)
 
+        self.pushButton_record_cut.clicked.connect(self.record_cut)
+        self.pushButton_apply_cuts.clicked.connect(self.apply_cuts)
+        self.pushButton_save_cuts.clicked.connect(self._save_cuts)
+
+        self.pushButton_undo_cut.clicked.connect(self.undo_cut)
+        self.pushButton_redo_cut.clicked.connect(self.redo_cut)
+
         self.plt = Plotter(qt_widget=self.vtkWidget, bg='bb', interactive=False)
         self.plt += self.vedo_message
         self.plt += Text2D(
@@ -60,7 +79,9 @@ class VedoCutter(QWidget):
         """
         if self.cutter_widget:
             self.plt.remove(self.cutter_widget)
+        self._remove_lod()
         self.plt.remove(self.mesh, self.vedo_axes)
+        self.cut_record = CutRecord()
 
         self.currently_selected_layer = self.napari_viewer.layers.selection.active
         if self.currently_selected_layer:
@@ -91,21 +112,21 @@ class VedoCutter(QWidget):
 
         self.vedo_axes = Axes(self.mesh, c='white')
         self.plt.add(self.vedo_axes, self.mesh)
+        self.lod = LevelOfDetail(self.plt, self.mesh)
+        self._reset_history()
         self.plt.reset_camera().render()
 
     def send_to_napari(self):
         """
         Send the currently displayed mesh in vedo to napari
         """
-        points = self.mesh.vertices
-        faces = self.mesh.cells
-        if len(faces):
-            if is_ragged(faces) or len(faces[0]):
-                tri_mesh = self.mesh.clone().triangulate()
-                faces = tri_mesh.cells
-                self.vedo_message.text("Mesh has been forced triangular!")
-                self.plt.render()
-        faces = np.asarray(faces, dtype=int)
+        if not is_triangle_mesh(self.mesh):
+            self.vedo_message.text("Mesh has been forced triangular!")
+            self.plt.render()
+        # copy both, they are views on the VTK arrays of the mesh, which the
+        # cutters and the undo/redo history keep replacing
+        points = np.array(self.mesh.vertices)
+        faces = np.array(vedo_mesh_faces(self.mesh), dtype=int)
         mesh_tuple = (points, faces)
 
         if len(mesh_tuple[0]) == 0:
@@ -134,6 +155,7 @@ class VedoCutter(QWidget):
         if self.pushButton_box_cutter.isChecked():
             self.cutter_widget = BoxCutter(self.mesh)
             self.plt.add(self.cutter_widget)
+            self._watch_cutter()
             self.vedo_message.text(
                 "Press r to reset the cutter\n"
                 'Press i to toggle it on/off\n'
@@ -155,6 +177,7 @@ class VedoCutter(QWidget):
         if self.pushButton_plane_cutter.isChecked():
             self.cutter_widget = PlaneCutter(self.mesh)
             self.plt.add(self.cutter_widget)
+            self._watch_cutter()
             self.vedo_message.text(
                 "Press r to reset the cutter\n"
                 'Press i to toggle it on/off\n'
@@ -177,6 +200,7 @@ class VedoCutter(QWidget):
         if self.pushButton_sphere_cutter.isChecked():
             self.cutter_widget = SphereCutter(self.mesh)
             self.plt.add(self.cutter_widget)
+            self._watch_cutter()
             self.vedo_message.text(
                 "Press r to reset the cutter\n"
                 'Press i to toggle it on/off\n'
@@ -184,12 +208,107 @@ class VedoCutter(QWidget):
             )
         self.plt.render()
 
+    def record_cut(self):
+        """
+        Record the implicit function of the current cutter (see `CutRecord`)
+        """
+        if not self.cutter_widget:
+            self.vedo_message.text("Please select a cutter first")
+            self.plt.render()
+            return
+
+        cut = Cut.from_cutter(self.cutter_widget)
+        self.cut_record.add(cut)
+        self.vedo_message.text(
+            f"Recorded {cut.kind} cut ({len(self.cut_record)} in total)")
+        self.plt.render()
+
+    def apply_cuts(self):
+        """
+        Apply the recorded cuts to the full data of the selected surface layer
+        """
+        from napari.layers import Layer, Surface
+
+        layer = self.napari_viewer.layers.selection.active
+        if not isinstance(layer, Surface) or not len(self.cut_record):
+            self.vedo_message.text(
+                "Record a cut and select a surface layer first")
+            self.plt.render()
+            return
+
+        for layer_data in self.cut_record(layer):
+            self.napari_viewer.add_layer(Layer.create(*layer_data))
+
+    def _save_cuts(self):
+        filename, _ = QFileDialog.getSaveFileName(
+            caption='Save recorded cuts', filter='Cuts (*.json)')
+        if filename:
+            self.cut_record.save(filename)
+
+    def undo_cut(self):
+        """
+        Go back to the mesh before the last cut
+        """
+        if self.history is not None and self.history.can_undo:
+            self.history.undo()
+            self._show_history_state()
+
+    def redo_cut(self):
+        """
+        Repeat the last undone cut
+        """
+        if self.history is not None and self.history.can_redo:
+            self.history.redo()
+            self._show_history_state()
+
+    def _reset_history(self):
+        # one copy of the original mesh, the states are face masks over it
+        # and the cuts that are applied to them
+        self.history = CutHistory(
+            np.array(self.mesh.vertices),
+            np.array(vedo_mesh_faces(self.mesh), dtype=int))
+        self._update_history_buttons()
+
+    def _watch_cutter(self):
+        """Add a history state whenever the cutter was adjusted."""
+        self._cutter_base = self.history.state()
+        self.cutter_widget.add_observer('EndInteraction', self._on_cutter_adjusted)
+
+    def _on_cutter_adjusted(self, obj=None, event=None):
+        self.history.cut(
+            Cut.from_cutter(self.cutter_widget), base=self._cutter_base)
+        self._update_history_buttons()
+
+    def _show_history_state(self):
+        # the cutter was created on another state, remove it
+        self.buttonGroup.setExclusive(False)
+        self.pushButton_box_cutter.setChecked(False)
+        self.pushButton_sphere_cutter.setChecked(False)
+        self.pushButton_plane_cutter.setChecked(False)
+        self.buttonGroup.setExclusive(True)
+        self._remove_cutter()
+
+        self.mesh._update(self.history.mesh().dataset)
+        self.vedo_message.text(
+            f"Cut {self.history.index} of {len(self.history) - 1}")
+        self._update_history_buttons()
+        self.plt.render()
+
+    def _update_history_buttons(self):
+        self.pushButton_undo_cut.setEnabled(self.history.can_undo)
+        self.pushButton_redo_cut.setEnabled(self.history.can_redo)
+
     def _remove_cutter(self):
         if self.cutter_widget:
             self.plt.remove(self.cutter_widget)
             self.cutter_widget = None
         self.plt.render()
 
+    def _remove_lod(self):
+        if self.lod is not None:
+            self.lod.remove()
+            self.lod = None
+
     def _load_mesh(self):
         """
         Opens a file dialog to load a mesh file.
@@ -206,9 +325,12 @@ class VedoCutter(QWidget):
         self.pushButton_plane_cutter.setChecked(False)
 
         self._remove_cutter()
+        self._remove_lod()
         self.plt.remove(self.mesh, self.vedo_axes)
+        self.cut_record = CutRecord()
 
-        self.mesh = Mesh(filename[0])
+        # read like the napari reader, e.g. .gz, .off and Dolfin .xml files
+        self.mesh = Mesh(load_mesh_file(filename[0]).dataset)
 
         self.mesh.c(self.mesh_color)
         self.mesh.backcolor(self.mesh_backcolor)
@@ -219,4 +341,6 @@ class VedoCutter(QWidget):
         self.vedo_message.text(f"Loaded Mesh: {name}")
 
         self.plt += [self.mesh, self.vedo_axes]
+        self.lod = LevelOfDetail(self.plt, self.mesh)
+        self._reset_history()
         self.plt.reset_camera().render()
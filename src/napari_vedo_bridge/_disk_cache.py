@@ -0,0 +1,162 @@
+"""
+Opt-in on-disk cache of parsed mesh files.
+
+After a surface file has been parsed once, its vertices, faces and point
+data are stored as raw `.npy` arrays. Later opens of the unchanged file
+memory-map these arrays instead of parsing the file again.
+
+The cache is disabled by default. Enable it with `configure_disk_cache` or
+with the environment variables
+
+- `NAPARI_VEDO_BRIDGE_CACHE_DIR`: cache directory; setting it enables the
+  cache.
+- `NAPARI_VEDO_BRIDGE_CACHE_SIZE`: size cap in bytes, by default 10 GB.
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+import numpy as np
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+
+_default_max_size = 10 * 1024 ** 3  # 10 GB
+
+
+class DiskCache:
+    """
+    Cache of parsed surface files as memory-mapped `.npy` arrays.
+
+    Entries are keyed on the absolute path, modification time and size of
+    the source file, so a modified file is parsed again. If the cache grows
+    beyond `max_size`, the least recently used entries are removed.
+
+    Parameters
+    ----------
+    directory : str
+        Directory in which the cached arrays are stored.
+    max_size : int, optional
+        Maximal size of the cache in bytes, by default 10 GB.
+    """
+
+    def __init__(self, directory: str, max_size: int = _default_max_size):
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def key(self, path: str) -> str:
+        stat = os.stat(path)
+        source = f'{os.path.abspath(path)}:{stat.st_mtime_ns}:{stat.st_size}'
+        return hashlib.blake2b(source.encode(), digest_size=16).hexdigest()
+
+    def load(
+            self,
+            path: str,
+            parse: Callable[[str], Tuple[np.ndarray, np.ndarray, dict]]
+            ) -> Tuple[np.ndarray, np.ndarray, dict]:
+        """
+        Get vertices, faces and point data of a file from the cache.
+
+        If the file is not cached yet, it is parsed with `parse` and the
+        result is added to the cache. Cached arrays are returned as read-only
+        memory maps.
+        """
+        entry = self.directory / self.key(path)
+        if (entry / 'index.json').exists():
+            os.utime(entry)  # mark as recently used
+            return self._read(entry)
+
+        vertices, faces, pointdata = parse(path)
+        self._write(entry, vertices, faces, pointdata)
+        self._evict(keep=entry)
+        return vertices, faces, pointdata
+
+    @property
+    def size(self) -> int:
+        """Size of all cached arrays in bytes."""
+        return sum(_entry_size(entry) for entry in self._entries())
+
+    def clear(self):
+        with self._lock:
+            for entry in self._entries():
+                shutil.rmtree(entry, ignore_errors=True)
+
+    def _entries(self) -> list:
+        return [entry for entry in self.directory.iterdir() if entry.is_dir()]
+
+    def _read(self, entry: Path) -> Tuple[np.ndarray, np.ndarray, dict]:
+        with open(entry / 'index.json') as f:
+            index = json.load(f)
+        vertices = np.load(entry / 'vertices.npy', mmap_mode='r')
+        faces = np.load(entry / 'faces.npy', mmap_mode='r')
+        pointdata = {
+            name: np.load(entry / filename, mmap_mode='r')
+            for name, filename in index['pointdata'].items()
+        }
+        return vertices, faces, pointdata
+
+    def _write(self, entry: Path, vertices, faces, pointdata: dict):
+        # write to a temporary directory first, so that concurrent readers
+        # never see a partially written entry
+        temporary = entry.with_name(f'.{entry.name}.{threading.get_ident()}')
+        temporary.mkdir(parents=True, exist_ok=True)
+        np.save(temporary / 'vertices.npy', np.asarray(vertices))
+        np.save(temporary / 'faces.npy', np.asarray(faces))
+
+        index = {'pointdata': {}}
+        for i, (name, values) in enumerate(pointdata.items()):
+            filename = f'pointdata_{i}.npy'
+            np.save(temporary / filename, np.asarray(values))
+            index['pointdata'][name] = filename
+        with open(temporary / 'index.json', 'w') as f:
+            json.dump(index, f)
+
+        try:
+            temporary.rename(entry)
+        except OSError:
+            # another process cached the same file in the meantime
+            shutil.rmtree(temporary, ignore_errors=True)
+
+    def _evict(self, keep: Path):
+        with self._lock:
+            entries = sorted(
+                self._entries(), key=lambda entry: entry.stat().st_mtime)
+            sizes = {entry: _entry_size(entry) for entry in entries}
+            total = sum(sizes.values())
+            for entry in entries:
+                if total <= self.max_size:
+                    break
+                if entry == keep or entry.name.startswith('.'):
+                    continue
+                shutil.rmtree(entry, ignore_errors=True)
+                total -= sizes[entry]
+
+
+def _entry_size(entry: Path) -> int:
+    return sum(f.stat().st_size for f in entry.iterdir() if f.is_file())
+
+
+def configure_disk_cache(
+        directory: Optional[str] = None,
+        max_size: int = _default_max_size) -> Optional[DiskCache]:
+    """
+    Enable the disk cache in `directory` or disable it if None.
+
+    Returns
+    -------
+    DiskCache or None
+        The active cache.
+    """
+    global disk_cache
+    disk_cache = DiskCache(directory, max_size) if directory else None
+    return disk_cache
+
+
+disk_cache: Optional[DiskCache] = None
+if os.environ.get('NAPARI_VEDO_BRIDGE_CACHE_DIR'):
+    configure_disk_cache(
+        os.environ['NAPARI_VEDO_BRIDGE_CACHE_DIR'],
+        int(os.environ.get('NAPARI_VEDO_BRIDGE_CACHE_SIZE', _default_max_size)))
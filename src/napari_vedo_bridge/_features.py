@@ -0,0 +1,241 @@
+"""
+Columnar transfer of per-point features between napari and vedo.
+
+napari stores features as a DataFrame with one 1D column per feature,
+whereas VTK point data may hold vector-valued (N, k) arrays, e.g. normals or
+colors. Vector features are split into the columns `name[0]`, ...,
+`name[k-1]` when reading and joined again when writing.
+
+Timelapses are stacked by preallocating one array per feature for all
+frames and copying every frame into it, instead of creating and
+concatenating a DataFrame per frame.
+"""
+import re
+import numpy as np
+from typing import Dict, Optional, Sequence, Tuple
+
+
+_component = re.compile(r'^(.*)\[(\d+)\]$')
+
+
+def split_vector_features(pointdata: dict) -> Dict[str, np.ndarray]:
+    """
+    Split (N, k) point data arrays into k columns named `name[i]`.
+    """
+    columns = {}
+    for key, values in pointdata.items():
+        values = np.asarray(values)
+        if values.ndim == 1:
+            columns[key] = values
+        else:
+            values = values.reshape(
+                len(values), int(np.prod(values.shape[1:])))
+            for i in range(values.shape[1]):
+                columns[f'{key}[{i}]'] = values[:, i]
+    return columns
+
+
+def join_vector_features(features: "pd.DataFrame") -> Dict[str, np.ndarray]:
+    """
+    Get the columns of a features table as contiguous point data arrays.
+
+    Columns `name[0]`, ..., `name[k-1]` are joined into one (N, k) array.
+    """
+    groups = {}
+    for column in features.columns:
+        match = _component.match(str(column))
+        if match:
+            groups.setdefault(match.group(1), []).append(
+                (int(match.group(2)), column))
+        else:
+            groups[column] = None
+
+    pointdata = {}
+    for key, components in groups.items():
+        if components is None:
+            pointdata[key] = np.ascontiguousarray(features[key].to_numpy())
+            continue
+
+        components.sort()
+        indices = [index for index, _ in components]
+        if indices != list(range(len(indices))) or key in features.columns:
+            # not a complete vector, keep the columns as they are
+            for _, column in components:
+                pointdata[column] = np.ascontiguousarray(
+                    features[column].to_numpy())
+            continue
+        pointdata[key] = np.ascontiguousarray(
+            features[[column for _, column in components]].to_numpy())
+    return pointdata
+
+
+def slice_features(
+        pointdata: Dict[str, np.ndarray],
+        start: int,
+        end: int,
+        order: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """
+    Get the rows `start:end` of all point data arrays.
+
+    If `order` is given, rows are taken in this order first.
+    """
+    if order is not None:
+        return {key: values[order[start:end]]
+                for key, values in pointdata.items()}
+    return {key: values[start:end] for key, values in pointdata.items()}
+
+
+def features_table(pointdata: dict) -> "pd.DataFrame":
+    """Create a features table from point data, keeping vector features."""
+    import pandas as pd
+
+    return pd.DataFrame(split_vector_features(pointdata))
+
+
+class FrameStack:
+    """
+    Preallocated 4D arrays into which the frames of a timelapse are copied.
+
+    The arrays for all frames are allocated once from the vertex and face
+    counts, and every frame is copied into its slice as soon as it was read,
+    so frames can be released right away. A frame with a wider dtype than
+    the stack (e.g. float64 vertices in a float32 stack) widens the stacked
+    array, so that no values are cast down.
+
+    Parameters
+    ----------
+    n_vertices : Sequence[int]
+        Number of vertices of every frame.
+    n_faces : Sequence[int], optional
+        Number of faces of every frame, None for points.
+    dtype : np.dtype, optional
+        dtype of the stacked vertices, by default float32.
+    features : Dict[str, np.dtype], optional
+        Expected feature columns and their dtypes. Columns that turn up only
+        while adding frames are allocated then.
+    """
+
+    def __init__(
+            self,
+            n_vertices: Sequence[int],
+            n_faces: Optional[Sequence[int]] = None,
+            dtype: np.dtype = np.float32,
+            features: Optional[Dict[str, np.dtype]] = None):
+        self._offsets = _offsets(n_vertices)
+        self.vertices = np.empty((self._offsets[-1], 4), dtype=dtype)
+
+        self.faces = None
+        if n_faces is not None:
+            self._face_offsets = _offsets(n_faces)
+            self.faces = np.empty((self._face_offsets[-1], 3), dtype=int)
+
+        self._features = {}
+        self._filled = {}
+        for key, feature_dtype in (features or {}).items():
+            self._allocate(key, np.dtype(feature_dtype))
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def add(self, t: int, frame: tuple):
+        """
+        Copy vertices, faces and point data of frame `t` into the stack.
+
+        Raises
+        ------
+        ValueError
+            If the frame size differs from the preallocated size.
+        """
+        vertices, faces, pointdata = frame
+        start, end = self._offsets[t], self._offsets[t + 1]
+        if len(vertices) != end - start:
+            raise ValueError(
+                f'Frame {t} has {len(vertices)} vertices, '
+                f'expected {end - start}')
+        self.vertices = _widen(self.vertices, vertices)
+        self.vertices[start:end, 0] = t
+        self.vertices[start:end, 1:] = vertices
+
+        if self.faces is not None:
+            face_start = self._face_offsets[t]
+            face_end = self._face_offsets[t + 1]
+            if len(faces) != face_end - face_start:
+                raise ValueError(
+                    f'Frame {t} has {len(faces)} faces, '
+                    f'expected {face_end - face_start}')
+            np.add(faces, start, out=self.faces[face_start:face_end],
+                   casting='unsafe')
+
+        for key, values in split_vector_features(pointdata).items():
+            if key not in self._features:
+                self._allocate(key, values.dtype)
+            self._features[key] = _widen(self._features[key], values)
+            self._features[key][start:end] = values
+            self._filled[key][t] = True
+
+    def result(
+            self) -> Tuple[np.ndarray, Optional[np.ndarray], "pd.DataFrame"]:
+        """
+        Get the stacked vertices, faces and features.
+
+        Features that are missing in a frame are NaN for its points, and
+        expected features that are missing in all frames are left out.
+        """
+        import pandas as pd
+
+        features = {}
+        for key, values in self._features.items():
+            filled = self._filled[key]
+            if not filled.any():
+                continue
+            if not filled.all():
+                values = values.astype(
+                    np.result_type(values.dtype, np.float64))
+                for t in np.flatnonzero(~filled):
+                    values[self._offsets[t]:self._offsets[t + 1]] = np.nan
+            features[key] = values
+        return self.vertices, self.faces, pd.DataFrame(features)
+
+    def _allocate(self, key: str, dtype: np.dtype):
+        self._features[key] = np.empty(len(self.vertices), dtype=dtype)
+        self._filled[key] = np.zeros(len(self), dtype=bool)
+
+
+def _widen(array: np.ndarray, values) -> np.ndarray:
+    """`array`, or a copy of it with a dtype that also holds `values`."""
+    dtype = np.result_type(array.dtype, np.asarray(values).dtype)
+    return array if dtype == array.dtype else array.astype(dtype)
+
+
+def _offsets(counts: Sequence[int]) -> np.ndarray:
+    return np.concatenate([[0], np.cumsum(counts, dtype=int)]).astype(int)
+
+
+def stack_frames(
+        frames: Sequence[Tuple[np.ndarray, Optional[np.ndarray], dict]]
+        ) -> Tuple[np.ndarray, Optional[np.ndarray], "pd.DataFrame"]:
+    """
+    Stack the frames of a timelapse into 4D napari data.
+
+    Parameters
+    ----------
+    frames : Sequence[Tuple[np.ndarray, Optional[np.ndarray], dict]]
+        Vertices, faces (None for points) and point data of every frame.
+
+    Returns
+    -------
+    Tuple[np.ndarray, Optional[np.ndarray], pd.DataFrame]
+        Vertices with the frame index as first column, faces with indices
+        into the stacked vertices (None for points) and the stacked features.
+        Features that are missing in a frame are NaN for its points.
+    """
+    n_faces = None
+    if frames and frames[0][1] is not None:
+        n_faces = [len(faces) for _, faces, _ in frames]
+    stack = FrameStack(
+        [len(vertices) for vertices, _, _ in frames], n_faces,
+        dtype=np.result_type(
+            *[np.asarray(v).dtype for v, _, _ in frames], np.float32))
+    for t, frame in enumerate(frames):
+        stack.add(t, frame)
+    return stack.result()
@@ -0,0 +1,294 @@
+"""
+Loading of mesh files that vedo cannot read directly.
+
+- gzip-compressed meshes (e.g. `mesh.vtp.gz`) are decompressed chunk by
+  chunk into a single buffer and handed to the VTK reader of the inner
+  format as a memory stream, so no temporary file is written.
+- OFF files are parsed with numpy while they are read (and decompressed).
+- `.xml` files are read as Dolfin (FEniCS) meshes if their root element is
+  `<dolfin>` and as VTK XML PolyData otherwise.
+
+All other files are loaded with `vedo.load`.
+"""
+import numpy as np
+from pathlib import Path
+from typing import Union
+
+
+_gzip_suffix = '.gz'
+_chunk_size = 1 << 20
+_rows_per_block = 1 << 16
+
+
+def mesh_extension(path) -> str:
+    """Lower-case extension of a mesh file, ignoring a `.gz` suffix."""
+    name = str(path).lower()
+    if name.endswith(_gzip_suffix):
+        name = name[:-len(_gzip_suffix)]
+    return Path(name).suffix[1:]
+
+
+def open_mesh_file(path):
+    """
+    Open a mesh file for reading bytes, decompressing gzip files on the fly.
+    """
+    import gzip
+
+    if str(path).lower().endswith(_gzip_suffix):
+        return gzip.open(path, 'rb')
+    return open(path, 'rb')
+
+
+def load_mesh_file(path) -> "vedo.Points":
+    """
+    Load a mesh or point cloud file as vedo object.
+
+    Parameters
+    ----------
+    path : str
+        Path to the file. Supports the formats of `vedo.load`, gzip
+        compressed files of these formats, `.off` and `.xml` (VTK XML
+        PolyData or Dolfin mesh).
+    """
+    import vedo
+
+    path = str(path)
+    extension = mesh_extension(path)
+    if not path.lower().endswith(_gzip_suffix) and \
+            extension not in ('off', 'xml'):
+        return vedo.load(path)
+
+    if extension == 'off':
+        return _load_off(path)
+    data = _read_bytes(path)
+    if extension == 'xml' and is_dolfin_xml(data):
+        return _load_dolfin_xml(data)
+    return vedo.Mesh(_read_polydata_from_memory(data, extension))
+
+
+def is_dolfin_xml(header: Union[bytes, bytearray]) -> bool:
+    """Whether the start of an `.xml` file is the root of a Dolfin mesh."""
+    import re
+
+    return re.search(rb'<dolfin[\s>]', header[:4096]) is not None
+
+
+def _read_bytes(path) -> Union[bytes, bytearray]:
+    """
+    Read a file into a single buffer, decompressing gzip files.
+
+    For gzip files, the buffer is allocated upfront with the uncompressed
+    size from the gzip trailer and filled chunk by chunk, so the
+    decompressed data is held in memory only once.
+    """
+    import gzip
+    import os
+
+    if not str(path).lower().endswith(_gzip_suffix):
+        with open(path, 'rb') as f:
+            return f.read()
+
+    with open(path, 'rb') as f:
+        f.seek(-4, os.SEEK_END)
+        size = int.from_bytes(f.read(4), 'little')
+
+    buffer = bytearray(size)
+    n = 0
+    with gzip.open(path, 'rb') as f:
+        with memoryview(buffer) as view:
+            while n < size:
+                with view[n:] as rest:
+                    read = f.readinto(rest)
+                if not read:
+                    break
+                n += read
+        del buffer[n:]
+        # the trailer holds the size modulo 4 GB, append anything left
+        for chunk in iter(lambda: f.read(_chunk_size), b''):
+            buffer += chunk
+    return buffer
+
+
+def _read_polydata_from_memory(
+        data: Union[bytes, bytearray], extension: str):
+    """Parse the content of a mesh file with the VTK reader of its format."""
+    from vtkmodules.vtkIOCore import vtkMemoryResourceStream
+    from vtkmodules.vtkIOGeometry import vtkOBJReader, vtkSTLReader
+    from vtkmodules.vtkIOLegacy import vtkPolyDataReader
+    from vtkmodules.vtkIOPLY import vtkPLYReader
+    from vtkmodules.vtkIOXML import vtkXMLPolyDataReader
+
+    readers = {
+        'vtk': vtkPolyDataReader,
+        'vtp': vtkXMLPolyDataReader,
+        'xml': vtkXMLPolyDataReader,
+        'ply': vtkPLYReader,
+        'stl': vtkSTLReader,
+        'obj': vtkOBJReader,
+    }
+    if extension not in readers:
+        raise ValueError(f'Cannot read compressed .{extension} files')
+
+    # the stream does not copy the buffer, which outlives the reader here
+    stream = vtkMemoryResourceStream()
+    stream.SetBuffer(data, len(data), False)
+
+    reader = readers[extension]()
+    if extension == 'vtk':
+        reader.ReadAllScalarsOn()
+        reader.ReadAllVectorsOn()
+        reader.ReadAllNormalsOn()
+        reader.ReadAllColorScalarsOn()
+        reader.ReadAllFieldsOn()
+    reader.SetStream(stream)
+    if hasattr(reader, 'ReadFromInputStreamOn'):
+        reader.ReadFromInputStreamOn()
+    reader.Update()
+
+    output = reader.GetOutput()
+    if output is None or output.GetNumberOfPoints() == 0:
+        raise ValueError(f'Could not read .{extension} data')
+    return output
+
+
+def _load_dolfin_xml(data: Union[bytes, bytearray]) -> "vedo.Mesh":
+    """
+    Parse a Dolfin XML mesh of triangles or tetrahedra.
+
+    Of tetrahedral meshes, the boundary surface is returned, i.e. the
+    triangles that belong to a single tetrahedron.
+    """
+    import io
+    import xml.etree.ElementTree as ElementTree
+    from .utils import surface_data_to_vedo_mesh
+
+    corners = {'triangle': 3, 'tetrahedron': 4}
+    indices, coordinates, cells = [], [], []
+    for _, element in ElementTree.iterparse(io.BytesIO(data)):
+        tag = element.tag.rsplit('}', 1)[-1]
+        if tag == 'vertex':
+            indices.append(int(element.get('index')))
+            coordinates.append(
+                [float(element.get(axis, 0)) for axis in 'xyz'])
+        elif tag in corners:
+            cells.append(
+                [int(element.get(f'v{i}')) for i in range(corners[tag])])
+        element.clear()
+    if not coordinates or not cells:
+        raise ValueError('Dolfin mesh without vertices or surface cells')
+
+    vertices = np.empty((len(coordinates), 3))
+    vertices[indices] = coordinates
+    cells = np.array(cells, dtype=np.int64)
+    if cells.shape[1] == 3:
+        return surface_data_to_vedo_mesh((vertices, cells))
+
+    faces = cells[:, [[0, 2, 1], [0, 1, 3], [0, 3, 2], [1, 2, 3]]]
+    faces = faces.reshape(-1, 3)
+    _, inverse, counts = np.unique(
+        np.sort(faces, axis=1), axis=0,
+        return_inverse=True, return_counts=True)
+    return surface_data_to_vedo_mesh(
+        (vertices, faces[counts[inverse.ravel()] == 1]))
+
+
+def _load_off(path) -> "vedo.Points":
+    """
+    Parse an OFF file while reading it.
+
+    Polygons with more than three vertices are split into triangle fans.
+    Colors and other values after the coordinates or indices are ignored.
+    """
+    import io
+    import vedo
+    from .utils import _fan_triangulate, surface_data_to_vedo_mesh
+
+    with io.TextIOWrapper(
+            open_mesh_file(path), encoding='utf-8', errors='replace') as f:
+        # the header keyword may be followed by the counts on the same line
+        header = _next_tokens(f)
+        if not header or not header[0].endswith('OFF'):
+            raise ValueError('Not an OFF file')
+        counts = header[1:] if len(header) > 1 else _next_tokens(f)
+        n_vertices, n_faces = int(counts[0]), int(counts[1])
+
+        vertices = _read_vertices(f, n_vertices)
+        if n_faces == 0:
+            return vedo.Points(vertices)
+        offsets, connectivity = _read_polygons(f, n_faces)
+
+    faces = _fan_triangulate(offsets, connectivity)
+    return surface_data_to_vedo_mesh((vertices, faces))
+
+
+def _next_tokens(f) -> list:
+    """Tokens of the next line that is not empty or a comment."""
+    for line in f:
+        tokens = line.split('#', 1)[0].split()
+        if tokens:
+            return tokens
+    return []
+
+
+def _read_vertices(f, n_vertices: int) -> np.ndarray:
+    """Read the coordinates of the next `n_vertices` vertex lines."""
+    blocks, n = [np.empty((0, 3))], 0
+    while n < n_vertices:
+        block = _loadtxt(_next_lines(f, n_vertices - n), usecols=(0, 1, 2))
+        blocks.append(block)
+        n += len(block)
+    return np.concatenate(blocks) if len(blocks) > 2 else blocks[-1]
+
+
+def _read_polygons(f, n_faces: int) -> tuple:
+    """
+    Read the face block of an OFF file as offsets and connectivity.
+
+    Lines with the same number of values are parsed by numpy a block at a
+    time, blocks with mixed polygon sizes line by line.
+    """
+    sizes, connectivity, n = [], [], 0
+    while n < n_faces:
+        lines = _next_lines(f, n_faces - n)
+        try:
+            rows = _loadtxt(lines).astype(np.int64)
+        except ValueError:
+            # the number of values changes between lines
+            polygons = [
+                np.array(tokens[1:int(tokens[0]) + 1], dtype=np.int64)
+                for tokens in (line.split('#', 1)[0].split() for line in lines)
+                if tokens]
+        else:
+            size = rows[0, 0] if len(rows) else 0
+            if np.all(rows[:, 0] == size) and rows.shape[1] > size:
+                sizes.append(rows[:, 0])
+                connectivity.append(rows[:, 1:size + 1].ravel())
+                n += len(rows)
+                continue
+            polygons = [row[1:row[0] + 1] for row in rows]
+        sizes.append(np.array([len(p) for p in polygons], dtype=np.int64))
+        connectivity.append(
+            np.concatenate(polygons) if polygons
+            else np.empty(0, dtype=np.int64))
+        n += len(polygons)
+
+    offsets = np.concatenate([[0], np.cumsum(np.concatenate(sizes))])
+    return offsets, np.concatenate(connectivity)
+
+
+def _next_lines(f, n_lines: int) -> list:
+    import itertools
+
+    lines = list(itertools.islice(f, min(n_lines, _rows_per_block)))
+    if not lines:
+        raise ValueError('Unexpected end of file')
+    return lines
+
+
+def _loadtxt(lines: list, **kwargs) -> np.ndarray:
+    import warnings
+
+    with warnings.catch_warnings():
+        # blocks of comments only are empty
+        warnings.simplefilter('ignore', UserWarning)
+        return np.loadtxt(lines, comments='#', ndmin=2, **kwargs)
@@ -0,0 +1,142 @@
+"""
+Index sidecar of timelapse directories.
+
+The writers store an `index.json` next to the frame files of a timelapse
+directory. It lists the frame files in temporal order together with their
+vertex and face counts, file size, modification time and the feature
+columns, so the readers can open the directory without listing or sorting
+it and preallocate the stacked 4D arrays before parsing any file.
+
+The modification time of the index file is set to the one of the directory
+after writing it. Adding, removing or renaming files changes the directory's
+modification time, so the index is known to be stale without listing the
+directory. Frame files that were modified in place are found by their size
+and modification time.
+
+Byte offsets are not stored: every frame is a file of its own, and the row
+offsets of the frames in the stacked arrays follow from the counts.
+"""
+import json
+import os
+import numpy as np
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+
+_index_name = 'index.json'
+_index_version = 1
+
+
+class FrameIndex(NamedTuple):
+    """
+    Content of the index of a timelapse directory.
+
+    `n_faces` is None for points. `features` maps the feature columns as
+    read by napari (vector features split into `name[i]`) to their dtype.
+    """
+    layer_type: str
+    paths: List[str]
+    n_vertices: List[int]
+    n_faces: Optional[List[int]]
+    dtype: str
+    features: Dict[str, str]
+
+
+def write_frame_index(
+        directory: str,
+        paths: Sequence[str],
+        frames: Sequence[tuple],
+        layer_type: str,
+        dtype: np.dtype,
+        features: Dict[str, np.ndarray]):
+    """
+    Write the index of a timelapse directory.
+
+    Parameters
+    ----------
+    directory : str
+        Timelapse directory.
+    paths : Sequence[str]
+        Frame files in temporal order.
+    frames : Sequence[tuple]
+        `(n_vertices, n_faces)` of every frame, `n_faces` is None for points.
+    layer_type : str
+        `'points'` or `'surface'`.
+    dtype : np.dtype
+        dtype of the vertices.
+    features : Dict[str, np.ndarray]
+        Point data of the written layer.
+    """
+    from ._features import split_vector_features
+
+    index = {
+        'version': _index_version,
+        'layer_type': layer_type,
+        'dtype': np.dtype(dtype).str,
+        'features': {
+            key: values.dtype.str
+            for key, values in split_vector_features(
+                {key: values[:0] for key, values in features.items()}
+            ).items()
+        },
+        'frames': [],
+    }
+    for path, (n_vertices, n_faces) in zip(paths, frames):
+        stat = os.stat(path)
+        index['frames'].append({
+            'file': os.path.basename(path),
+            'n_vertices': int(n_vertices),
+            'n_faces': None if n_faces is None else int(n_faces),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+        })
+
+    temporary = Path(directory) / f'.{_index_name}'
+    with open(temporary, 'w') as f:
+        json.dump(index, f)
+    os.replace(temporary, Path(directory) / _index_name)
+    # setting the time of a file does not change the one of its directory
+    mtime_ns = os.stat(directory).st_mtime_ns
+    os.utime(Path(directory) / _index_name, ns=(mtime_ns, mtime_ns))
+
+
+def read_frame_index(directory: str) -> Optional[FrameIndex]:
+    """
+    Read the index of a timelapse directory.
+
+    Returns None if the directory has no index, or if it is stale, i.e. a
+    file was added to or removed from the directory or a frame file was
+    modified after the index was written.
+    """
+    path = Path(directory) / _index_name
+    try:
+        if os.stat(directory).st_mtime_ns != os.stat(path).st_mtime_ns:
+            return None
+        with open(path) as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if index.get('version') != _index_version:
+        return None
+
+    paths = []
+    for frame in index['frames']:
+        frame_path = os.path.join(directory, frame['file'])
+        try:
+            stat = os.stat(frame_path)
+        except OSError:
+            return None
+        if (stat.st_size, stat.st_mtime_ns) != (
+                frame['size'], frame['mtime_ns']):
+            return None
+        paths.append(frame_path)
+
+    n_faces = [frame['n_faces'] for frame in index['frames']]
+    return FrameIndex(
+        layer_type=index['layer_type'],
+        paths=paths,
+        n_vertices=[frame['n_vertices'] for frame in index['frames']],
+        n_faces=None if index['layer_type'] == 'points' else n_faces,
+        dtype=index['dtype'],
+        features=index['features'],
+    )
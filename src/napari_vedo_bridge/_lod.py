@@ -0,0 +1,111 @@
+"""
+Level of detail rendering of large meshes in the embedded vedo plotters.
+
+While the camera is moved, a decimated proxy of a large mesh is rendered in
+its place, and the full resolution mesh is shown again when the interaction
+ends. The proxy is only used for display: cutters and exports keep working
+on the full mesh.
+"""
+import numpy as np
+
+from vedo import Mesh, Plotter
+from vtkmodules.vtkCommonCore import vtkCommand
+
+
+_default_max_faces = 500_000
+
+
+class LevelOfDetail:
+    """
+    Render a decimated proxy of a mesh while the camera is moved.
+
+    Meshes with at most `max_faces` faces are always rendered at full
+    resolution. The proxy is created with binned decimation, which takes
+    about a second for 20 million faces. It is created on the first
+    interaction and again whenever the mesh was modified, e.g. by a cutter.
+
+    Parameters
+    ----------
+    plotter : vedo.Plotter
+        Plotter in which the mesh is shown.
+    mesh : vedo.Mesh
+        Full resolution mesh, already added to the plotter.
+    max_faces : int, optional
+        Approximate number of faces of the proxy, by default 500 000.
+    """
+
+    def __init__(
+            self,
+            plotter: Plotter,
+            mesh: Mesh,
+            max_faces: int = _default_max_faces):
+        self.plotter = plotter
+        self.mesh = mesh
+        self.max_faces = max_faces
+        self.proxy = None
+        self._proxy_time = -1
+        self._observers = []
+
+        interactor = plotter.interactor
+        if interactor is None:
+            return
+        for event, callback in (
+                (vtkCommand.StartInteractionEvent, self._on_start),
+                (vtkCommand.EndInteractionEvent, self._on_end)):
+            self._observers.append(interactor.AddObserver(event, callback))
+
+    @property
+    def enabled(self) -> bool:
+        return self.mesh.ncells > self.max_faces
+
+    def remove(self):
+        """Remove the proxy and stop swapping."""
+        interactor = self.plotter.interactor
+        for observer in self._observers:
+            if interactor is not None:
+                interactor.RemoveObserver(observer)
+        self._observers = []
+        if self.proxy is not None:
+            self.plotter.remove(self.proxy)
+            self.proxy = None
+        self.mesh.on()
+
+    def update_proxy(self) -> Mesh:
+        """Get the proxy, decimating the mesh again if it was modified."""
+        modified = self.mesh.dataset.GetMTime()
+        if self.proxy is not None and self._proxy_time == modified:
+            return self.proxy
+
+        from vtkmodules.vtkFiltersCore import vtkBinnedDecimation
+
+        # the number of faces grows with the square of the divisions
+        divisions = int(np.clip(np.sqrt(self.max_faces / 8), 16, 1024))
+        decimation = vtkBinnedDecimation()
+        decimation.SetInputData(self.mesh.dataset)
+        decimation.SetAutoAdjustNumberOfDivisions(0)
+        decimation.SetNumberOfDivisions(divisions, divisions, divisions)
+        decimation.Update()
+
+        if self.proxy is None:
+            self.proxy = Mesh(decimation.GetOutput())
+            self.proxy.actor.SetProperty(self.mesh.actor.GetProperty())
+            self.proxy.pickable(False).off()
+            self.plotter.add(self.proxy)
+        else:
+            self.proxy._update(decimation.GetOutput())
+        self.proxy.actor.SetUserMatrix(self.mesh.actor.GetMatrix())
+        self._proxy_time = modified
+        return self.proxy
+
+    def _on_start(self, obj=None, event=None):
+        if not self.enabled or not self.mesh.actor.GetVisibility():
+            return
+        self.update_proxy().on()
+        self.mesh.off()
+
+    def _on_end(self, obj=None, event=None):
+        if self.proxy is None or self.proxy.actor.GetVisibility() == 0:
+            return
+        self.proxy.off()
+        self.mesh.on()
+        self.plotter.render()
@@ -1,9 +1,19 @@
 import vedo
 import numpy as np
-from napari_vedo_bridge.utils import napari_to_vedo_mesh, vedo_mesh_to_napari
+from napari_vedo_bridge._background import (
+    BackgroundRunner,
+    current_task,
+    run_filter,
+    run_with_task,
+)
+from napari_vedo_bridge._cache import mesh_cache
+from napari_vedo_bridge.utils import (
+    surface_data_to_vedo_mesh,
+    vedo_mesh_to_surface_data,
+)
 from napari.layers import Surface, Vectors, Points, Image, Labels
 from napari.types import LayerDataTuple
-from typing import Tuple, List, Union
+from typing import Callable, Tuple, List, Optional, Union
 
 from magicgui import widgets, magic_factory
 from qtpy.QtCore import Qt
@@ -17,6 +27,18 @@ def _on_init(widget):
     label_widget.native.setTextInteractionFlags(Qt.TextBrowserInteraction)
     label_widget.native.setOpenExternalLinks(True)
     widget.extend([label_widget])
+    widget._background_runner = BackgroundRunner(widget)
+
+
+def _on_init_preview(widget):
+    """
+    Initialize a mesh widget with a live preview on a decimated proxy.
+    """
+    from napari_vedo_bridge._preview import LivePreview
+
+    _on_init(widget)
+    widget._live_preview = LivePreview(
+        widget, _preview_operations[widget.name])
 
 
 @magic_factory(
@@ -38,21 +60,17 @@ def compute_normals(
     Vectors
         The mesh with computed normals.
     """
-    vedo_mesh = napari_to_vedo_mesh(surface)
-    vedo_mesh.compute_normals()
-
-    vedo_mesh.compute_normals()
-    points = vedo_mesh.vertices
-    directions = vedo_mesh.vertex_normals
-
-    napari_vectors = np.stack([points, directions], axis=1)
+    napari_vectors = mesh_cache.result(
+        surface.data, '_normals_to_vectors', {},
+        lambda: _map_frames(
+            surface, _normals_to_vectors, 'napari.types.VectorsData'))
     return Vectors(napari_vectors)
 
 
 @magic_factory(
     surface={'label': 'Surface'},
     fraction={'label': 'Fraction', 'widget_type': 'FloatSlider', 'min': 0.1, 'max': 1.0, 'step': 0.1},
-    widget_init=_on_init
+    widget_init=_on_init_preview
 )
 def shrink(
         surface: Surface,
@@ -72,9 +90,7 @@ def shrink(
     Surface
         The shrunk surface.
     """
-    vedo_mesh = napari_to_vedo_mesh(surface)
-    vedo_mesh.shrink(fraction=fraction)
-    return vedo_mesh_to_napari(vedo_mesh)
+    return Surface(_apply(surface, _shrink, fraction=fraction))
 
 
 @magic_factory(
@@ -99,16 +115,14 @@ def subdivide(
     Surface
         The subdivided mesh.
     """
-    vedo_mesh = napari_to_vedo_mesh(surface)
-    vedo_mesh.subdivide(n=n_iterations)
-    return vedo_mesh_to_napari(vedo_mesh)
+    return Surface(_apply(surface, _subdivide, n_iterations=n_iterations))
 
 
 @magic_factory(
     surface={'label': 'Surface'},
     fraction={'label': 'Fraction', 'min': 0.1, 'max': 1.0, 'step': 0.01},
     n_vertices={'label': 'Number of Vertices', 'min': 0, 'max': 100000, 'step': 100, 'nullable': True},
-    widget_init=_on_init
+    widget_init=_on_init_preview
 )
 def decimate(
         surface: Surface,
@@ -131,16 +145,15 @@ def decimate(
     Surface
         The decimated mesh.
     """
-    vedo_mesh = napari_to_vedo_mesh(surface)
-    vedo_mesh.decimate(fraction=fraction, n=n_vertices)
-    return vedo_mesh_to_napari(vedo_mesh)
+    return Surface(_apply(
+        surface, _decimate, fraction=fraction, n_vertices=n_vertices))
 
 
 @magic_factory(
     surface={'label': 'Surface'},
     fraction={'label': 'Fraction', 'min': 0.1, 'max': 1.0, 'step': 0.01},
     n_vertices={'label': 'Number of Vertices', 'min': 0, 'max': 65535, 'step': 1, 'nullable': True},
-    widget_init=_on_init
+    widget_init=_on_init_preview
 )
 def decimate_pro(
         surface: Surface,
@@ -163,9 +176,8 @@ def decimate_pro(
     Surface
         The decimated mesh.
     """
-    vedo_mesh = napari_to_vedo_mesh(surface)
-    vedo_mesh.decimate_pro(fraction=fraction, n=n_vertices)
-    return vedo_mesh_to_napari(vedo_mesh)
+    return Surface(_apply(
+        surface, _decimate_pro, fraction=fraction, n_vertices=n_vertices))
 
 
 @magic_factory(
@@ -191,14 +203,12 @@ def decimate_binned(
     Surface
         The decimated mesh.
     """
-    vedo_mesh = napari_to_vedo_mesh(surface)
-    vedo_mesh.decimate_binned(divisions=divisions)
-    return vedo_mesh_to_napari(vedo_mesh)
+    return Surface(_apply(surface, _decimate_binned, divisions=divisions))
 
 
 @magic_factory(
     surface={'label': 'Surface'},
-    widget_init=_on_init
+    widget_init=_on_init_preview
 )
 def smooth(
         surface: Surface,
@@ -230,14 +240,13 @@ def smooth(
     Surface
         The smoothed mesh.
     """
-    vedo_mesh = napari_to_vedo_mesh(surface)
-    vedo_mesh.smooth(
-        niter=n_iterations,
+    return Surface(_apply(
+        surface, _smooth,
+        n_iterations=n_iterations,
         pass_band=pass_band,
         edge_angle=edge_angle,
         feature_angle=feature_angle,
-        boundary=boundary)
-    return vedo_mesh_to_napari(vedo_mesh)
+        boundary=boundary))
 
 
 @magic_factory(
@@ -263,9 +272,7 @@ def fill_holes(
     Surface
         The mesh with filled holes.
     """
-    vedo_mesh = napari_to_vedo_mesh(surface)
-    vedo_mesh.fill_holes(size=size)
-    return vedo_mesh_to_napari(vedo_mesh)
+    return Surface(_apply(surface, _fill_holes, size=size))
 
 
 @magic_factory(
@@ -286,12 +293,27 @@ def split(surface: Surface) -> List[LayerDataTuple]:
     List[Surface]
         The connected components of the mesh
     """
-    vedo_mesh = napari_to_vedo_mesh(surface)
-    split_meshes_v = list(vedo_mesh.split())
-    split_meshes = [
-        (vedo_mesh_to_napari(m), {}, 'surface')
-        for m in split_meshes_v
+    if not _is_timelapse(surface):
+        return [
+            (vedo_mesh_to_surface_data(m), {}, 'surface')
+            for m in _split(surface_data_to_vedo_mesh(surface.data))
+        ]
+
+    # Components are sorted by size in every frame. The n-th largest
+    # components of all frames form one output layer.
+    components = _map_frames_parallel(
+        lambda data: [
+            vedo_mesh_to_surface_data(m)
+            for m in _split(surface_data_to_vedo_mesh(data))
+        ],
+        _unstack(surface))
+
+    split_meshes = []
+    for i in range(max(len(c) for c in components)):
+        frames = [
+            (t, c[i]) for t, c in enumerate(components) if len(c) > i
         ]
+        split_meshes.append((_stack_frames(frames), {}, 'surface'))
     return split_meshes
 
 
@@ -315,9 +337,7 @@ def extract_largest_region(
     Surface
         The largest region of the surface.
     """
-    vedo_mesh = napari_to_vedo_mesh(surface)
-    largest_region = vedo_mesh.extract_largest_region()
-    return vedo_mesh_to_napari(largest_region)
+    return Surface(_apply(surface, _extract_largest_region))
 
 
 @magic_factory(
@@ -348,8 +368,292 @@ def binarize(
     if reference_image is None:
         target_dimensions = None
     else:
-        target_dimensions = reference_image.data.shape
-
-    vedo_mesh = napari_to_vedo_mesh(surface)
-    binarized = vedo_mesh.binarize(dims=target_dimensions).tonumpy()
+        target_dimensions = reference_image.data.shape[-3:]
+
+    if not _is_timelapse(surface):
+        vedo_mesh = surface_data_to_vedo_mesh(surface.data)
+        binarized = vedo_mesh.binarize(dims=target_dimensions).tonumpy()
+        return Labels(binarized)
+
+    # all frames are binarized on the same grid so that they can be stacked
+    vertices = surface.data[0][:, 1:]
+    bounds = np.stack([vertices.min(axis=0), vertices.max(axis=0)], axis=1)
+    spacing = [np.linalg.norm(bounds[:, 1] - bounds[:, 0]) / 250.0] * 3
+    if target_dimensions is None:
+        target_dimensions = [
+            int(np.ceil((bounds[i, 1] - bounds[i, 0]) / spacing[i]))
+            for i in range(3)
+        ]
+    origin = bounds[:, 0] + spacing
+
+    binarized = _map_frames(
+        surface,
+        lambda mesh: mesh.binarize(
+            dims=target_dimensions, spacing=spacing, origin=origin
+        ).tonumpy(),
+        'napari.types.LabelsData')
     return Labels(binarized)
+
+
+
+# Operations on vedo meshes. These are applied to every frame of a surface.
+# They run the VTK filters of the corresponding vedo methods with the same
+# settings through `run_filter`, so that background tasks can report their
+# progress and cancel them (see `_background.py`).
+def _compute_normals(mesh: vedo.Mesh) -> vedo.Mesh:
+    from vtkmodules.vtkFiltersCore import vtkPolyDataNormals
+
+    normals = vtkPolyDataNormals()
+    normals.ComputePointNormalsOn()
+    normals.ComputeCellNormalsOn()
+    normals.ConsistencyOn()
+    normals.FlipNormalsOff()
+    normals.SplittingOff()
+    return vedo.Mesh(run_filter(normals, mesh.dataset))
+
+
+def _normals_to_vectors(mesh: vedo.Mesh) -> np.ndarray:
+    mesh = _compute_normals(mesh)
+    return np.stack([mesh.vertices, mesh.vertex_normals], axis=1)
+
+
+def _shrink(mesh: vedo.Mesh, fraction: float = 0.9) -> vedo.Mesh:
+    from vtkmodules.vtkFiltersGeneral import vtkShrinkPolyData
+
+    shrink = vtkShrinkPolyData()
+    shrink.SetShrinkFactor(fraction)
+    return vedo.Mesh(run_filter(shrink, mesh.dataset))
+
+
+def _subdivide(mesh: vedo.Mesh, n_iterations: int = 1) -> vedo.Mesh:
+    from vtkmodules.vtkFiltersCore import vtkTriangleFilter
+    from vtkmodules.vtkFiltersModeling import vtkLoopSubdivisionFilter
+
+    triangles = run_filter(vtkTriangleFilter(), mesh.dataset)
+    subdivision = vtkLoopSubdivisionFilter()
+    subdivision.SetNumberOfSubdivisions(n_iterations)
+    return vedo.Mesh(run_filter(subdivision, triangles))
+
+
+def _decimate(
+        mesh: vedo.Mesh,
+        fraction: float = 0.5,
+        n_vertices: int = 0) -> vedo.Mesh:
+    from vtkmodules.vtkFiltersCore import vtkQuadricDecimation
+
+    if n_vertices:
+        fraction = n_vertices / mesh.npoints
+        if fraction >= 1:
+            return mesh
+
+    decimation = vtkQuadricDecimation()
+    decimation.VolumePreservationOn()
+    decimation.MapPointDataOn()
+    decimation.SetTargetReduction(1 - fraction)
+    return vedo.Mesh(run_filter(decimation, mesh.dataset))
+
+
+def _decimate_pro(
+        mesh: vedo.Mesh,
+        fraction: float = 0.5,
+        n_vertices: int = 0) -> vedo.Mesh:
+    from vtkmodules.vtkFiltersCore import vtkDecimatePro
+
+    if n_vertices:
+        fraction = n_vertices / mesh.npoints
+        if fraction >= 1:
+            return mesh
+
+    decimation = vtkDecimatePro()
+    decimation.PreserveTopologyOn()
+    decimation.BoundaryVertexDeletionOn()
+    decimation.SplittingOff()
+    decimation.SetSplitAngle(75)
+    decimation.SetInflectionPointRatio(10)
+    decimation.SetTargetReduction(1 - fraction)
+    return vedo.Mesh(run_filter(decimation, mesh.dataset))
+
+
+def _decimate_binned(
+        mesh: vedo.Mesh,
+        divisions: Tuple[int, int, int] = ()) -> vedo.Mesh:
+    from vtkmodules.vtkFiltersCore import vtkBinnedDecimation
+
+    decimation = vtkBinnedDecimation()
+    decimation.ProducePointDataOn()
+    decimation.ProduceCellDataOn()
+    if len(divisions) == 0:
+        decimation.AutoAdjustNumberOfDivisionsOn()
+    else:
+        decimation.AutoAdjustNumberOfDivisionsOff()
+        decimation.SetNumberOfDivisions(*divisions)
+    return vedo.Mesh(run_filter(decimation, mesh.dataset))
+
+
+def _smooth(
+        mesh: vedo.Mesh,
+        n_iterations: int = 15,
+        pass_band: float = 0.1,
+        edge_angle: int = 15,
+        feature_angle: int = 60,
+        boundary: bool = False) -> vedo.Mesh:
+    from vtkmodules.vtkFiltersCore import (
+        vtkCleanPolyData,
+        vtkWindowedSincPolyDataFilter,
+    )
+
+    cleaned = run_filter(vtkCleanPolyData(), mesh.dataset)
+    smoothing = vtkWindowedSincPolyDataFilter()
+    smoothing.SetNumberOfIterations(n_iterations)
+    smoothing.SetEdgeAngle(edge_angle)
+    smoothing.SetFeatureAngle(feature_angle)
+    smoothing.SetPassBand(pass_band)
+    smoothing.NormalizeCoordinatesOn()
+    smoothing.NonManifoldSmoothingOn()
+    smoothing.FeatureEdgeSmoothingOn()
+    smoothing.SetBoundarySmoothing(boundary)
+    return vedo.Mesh(run_filter(smoothing, cleaned))
+
+
+def _fill_holes(mesh: vedo.Mesh, size: float = 1000) -> vedo.Mesh:
+    from vtkmodules.vtkFiltersModeling import vtkFillHolesFilter
+
+    fill = vtkFillHolesFilter()
+    fill.SetHoleSize(size or mesh.diagonal_size() / 10)
+    return vedo.Mesh(run_filter(fill, mesh.dataset))
+
+
+def _split(mesh: vedo.Mesh) -> List[vedo.Mesh]:
+    return list(mesh.split())
+
+
+def _extract_largest_region(mesh: vedo.Mesh) -> vedo.Mesh:
+    from vtkmodules.vtkFiltersCore import vtkPolyDataConnectivityFilter
+
+    connectivity = vtkPolyDataConnectivityFilter()
+    connectivity.SetExtractionModeToLargestRegion()
+    connectivity.ScalarConnectivityOff()
+    return vedo.Mesh(run_filter(connectivity, mesh.dataset))
+
+
+# Operations of the widgets with live preview
+_preview_operations = {
+    'shrink': _shrink,
+    'decimate': _decimate,
+    'decimate_pro': _decimate_pro,
+    'smooth': _smooth,
+}
+
+
+# Frame-wise execution
+def _is_timelapse(surface: Surface) -> bool:
+    return surface.data[0].shape[1] == 4
+
+
+def _apply(
+        surface: Surface,
+        operation: Callable[..., vedo.Mesh],
+        **kwargs) -> "napari.types.SurfaceData":
+    """
+    Apply a mesh operation to a 3D surface or to every frame of a 4D surface.
+
+    Results are cached on the content of the surface data, the operation and
+    its parameters (see `_cache.MeshCache`), so repeated calls with the same
+    parameters return immediately.
+
+    Parameters
+    ----------
+    surface : Surface
+        The input surface.
+    operation : Callable[..., vedo.Mesh]
+        Function that takes a vedo mesh and the keyword arguments and returns
+        the processed vedo mesh.
+
+    Returns
+    -------
+    napari.types.SurfaceData
+        The processed surface data, stacked to 4D if the input was 4D.
+    """
+    return mesh_cache.result(
+        surface.data, operation.__name__, kwargs,
+        lambda: _map_frames(
+            surface,
+            lambda mesh: vedo_mesh_to_surface_data(operation(mesh, **kwargs)),
+            'napari.types.SurfaceData'))
+
+
+def _map_frames(
+        surface: Surface,
+        function: Callable[[vedo.Mesh], "napari.types.LayerData"],
+        layertype: str) -> "napari.types.LayerData":
+    """
+    Apply a function to every frame of a surface and stack the results.
+
+    Frames of 4D surfaces are split with the TimelapseConverter, processed
+    in parallel and stacked again to data of type `layertype`.
+    """
+    from napari_timelapse_processor import TimelapseConverter
+
+    if not _is_timelapse(surface):
+        return function(mesh_cache.vedo_mesh(surface.data))
+
+    results = _map_frames_parallel(
+        lambda data: function(surface_data_to_vedo_mesh(data)),
+        _unstack(surface))
+    return TimelapseConverter().stack_data(results, layertype)
+
+
+def _unstack(surface: Surface) -> List["napari.types.SurfaceData"]:
+    from napari_timelapse_processor import TimelapseConverter
+
+    frames = TimelapseConverter().unstack_data(
+        surface.data, 'napari.types.SurfaceData')
+    return [(vertices, faces) for vertices, faces, _ in frames]
+
+
+def _map_frames_parallel(
+        function: Callable,
+        frames: list,
+        n_workers: Optional[int] = None) -> list:
+    """
+    Apply a function to a list of frames using a thread pool.
+
+    VTK filters release the GIL, so frames are processed on all cores.
+    The order of the frames is preserved. If the call runs in a background
+    task (see `_background.py`), progress is reported per frame and the
+    task can be cancelled between frames.
+    """
+    import os
+    from concurrent.futures import ThreadPoolExecutor
+
+    task = current_task()
+    if task is not None:
+        task.set_steps(len(frames))
+        function = run_with_task(task, function)
+
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    n_workers = max(1, min(n_workers, len(frames)))
+
+    if n_workers == 1:
+        return [function(frame) for frame in frames]
+
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        return list(executor.map(function, frames))
+
+
+def _stack_frames(
+        frames: List[Tuple[int, "napari.types.SurfaceData"]]
+        ) -> "napari.types.SurfaceData":
+    """
+    Stack surfaces of individual (not necessarily consecutive) frames.
+    """
+    vertices = np.concatenate([
+        np.column_stack([np.full(len(data[0]), t), data[0]])
+        for t, data in frames
+    ])
+    offsets = np.cumsum([0] + [len(data[0]) for _, data in frames[:-1]])
+    faces = np.concatenate([
+        data[1] + offset for offset, (_, data) in zip(offsets, frames)
+    ])
+    return (vertices, faces)
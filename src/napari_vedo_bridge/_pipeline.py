@@ -0,0 +1,271 @@
+import json
+import inspect
+import vedo
+import numpy as np
+from napari.layers import Layer, Surface
+from napari.types import LayerDataTuple
+from typing import Callable, Dict, List, Optional, Tuple
+
+from magicgui import widgets
+
+from napari_vedo_bridge import _mesh, _points
+from napari_vedo_bridge._background import TaskRunner, current_task
+from napari_vedo_bridge.utils import (
+    surface_data_to_vedo_mesh,
+    vedo_mesh_to_surface_data,
+)
+
+
+# Operations that take a mesh and return a mesh and can thus be chained
+_operations: Dict[str, Callable[..., vedo.Mesh]] = {
+    'fill_holes': _mesh._fill_holes,
+    'smooth': _mesh._smooth,
+    'decimate': _mesh._decimate,
+    'decimate_pro': _mesh._decimate_pro,
+    'decimate_binned': _mesh._decimate_binned,
+    'subdivide': _mesh._subdivide,
+    'shrink': _mesh._shrink,
+    'extract_largest_region': _mesh._extract_largest_region,
+    'compute_normals': _mesh._compute_normals,
+}
+
+# Operations on point clouds, which can be used in pipelines for points
+_point_operations: Dict[str, Callable[..., vedo.Points]] = {
+    'smooth_mls_1d': _points._smooth_mls_1d,
+    'smooth_mls_2d': _points._smooth_mls_2d,
+    'remove_outliers': _points._remove_outliers,
+}
+
+
+class MeshPipeline:
+    """
+    An ordered list of mesh operations that are applied to one vedo mesh.
+
+    The mesh is converted from napari once before the first step and back
+    to napari once after the last step. Pipelines can be saved to and loaded
+    from json files to replay them on other data. The point cloud operations
+    of `_points.py` can be used as well when running the pipeline on vedo
+    points with `run`.
+
+    Parameters
+    ----------
+    steps : List[Tuple[str, dict]], optional
+        Operation names and their parameters, e.g.
+        `[('smooth', {'n_iterations': 20}), ('decimate_pro', {})]`.
+        Missing parameters take the default value of the operation.
+
+    Examples
+    --------
+    >>> pipeline = MeshPipeline().add('fill_holes').add('smooth', n_iterations=30)
+    >>> pipeline.save('pipeline.json')
+    >>> layers = MeshPipeline.load('pipeline.json')(surface)
+    """
+
+    def __init__(self, steps: Optional[List[Tuple[str, dict]]] = None):
+        self.steps = []
+        for operation, parameters in steps or []:
+            self.add(operation, **parameters)
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+    def __repr__(self) -> str:
+        return f'MeshPipeline({self.steps})'
+
+    def add(self, operation: str, **parameters) -> "MeshPipeline":
+        """
+        Append an operation to the pipeline.
+
+        Raises
+        ------
+        ValueError
+            If the operation does not exist.
+        TypeError
+            If the operation does not accept the given parameters.
+        """
+        operations = {**_operations, **_point_operations}
+        if operation not in operations:
+            raise ValueError(
+                f'Unknown operation {operation}. '
+                f'Available operations: {list(operations.keys())}')
+
+        # fail early on unknown parameters
+        inspect.signature(operations[operation]).bind(None, **parameters)
+        self.steps.append((operation, dict(parameters)))
+        return self
+
+    def run(self, mesh: vedo.Points) -> vedo.Points:
+        """
+        Apply all steps to a vedo mesh or point cloud.
+        """
+        operations = {**_operations, **_point_operations}
+        task = current_task()
+        for operation, parameters in self.steps:
+            if task is not None:
+                task.check()
+            mesh = operations[operation](mesh, **parameters)
+        return mesh
+
+    def __call__(self, surface: Surface) -> List[LayerDataTuple]:
+        """
+        Apply the pipeline to a 3D surface or every frame of a 4D surface.
+
+        Returns
+        -------
+        List[LayerDataTuple]
+            The processed surface. If the last step is `compute_normals`, the
+            normals are returned as additional vectors layer.
+        """
+        from napari_timelapse_processor import TimelapseConverter
+
+        with_normals = len(self) > 0 and self.steps[-1][0] == 'compute_normals'
+
+        def _process(data):
+            mesh = self.run(surface_data_to_vedo_mesh(data))
+            vectors = None
+            if with_normals:
+                vectors = np.stack([mesh.vertices, mesh.vertex_normals], axis=1)
+            return vedo_mesh_to_surface_data(mesh), vectors
+
+        if _mesh._is_timelapse(surface):
+            results = _mesh._map_frames_parallel(
+                _process, _mesh._unstack(surface))
+            converter = TimelapseConverter()
+            surface_data = converter.stack_data(
+                [r[0] for r in results], 'napari.types.SurfaceData')
+            vectors = converter.stack_data(
+                [r[1] for r in results], 'napari.types.VectorsData'
+                ) if with_normals else None
+        else:
+            surface_data, vectors = _process(surface.data)
+
+        layers = [(surface_data, {'name': f'{surface.name} (pipeline)'}, 'surface')]
+        if with_normals:
+            layers.append((vectors, {'name': f'{surface.name} normals'}, 'vectors'))
+        return layers
+
+    def to_dict(self) -> dict:
+        return {
+            'steps': [
+                {'operation': operation, 'parameters': parameters}
+                for operation, parameters in self.steps
+            ]
+        }
+
+    @classmethod
+    def from_dict(cls, pipeline: dict) -> "MeshPipeline":
+        return cls([
+            (step['operation'], step.get('parameters', {}))
+            for step in pipeline['steps']
+        ])
+
+    def save(self, path: str):
+        """Save the pipeline to a json file."""
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> "MeshPipeline":
+        """Load a pipeline from a json file."""
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+class MeshPipelineWidget(widgets.Container):
+    """
+    Widget to assemble, save, load and run a mesh processing pipeline.
+
+    The pipeline runs in a background thread (see `_background.TaskRunner`).
+    """
+
+    def __init__(self, napari_viewer: "napari.Viewer"):
+        super().__init__()
+        self.viewer = napari_viewer
+        self.pipeline = MeshPipeline()
+
+        self._surface = widgets.create_widget(
+            annotation=Surface, label='Surface')
+        self._operation = widgets.ComboBox(
+            label='Operation', choices=list(_operations.keys()))
+        self._parameters = widgets.Container(labels=True)
+        self._add_step = widgets.PushButton(text='Add step')
+        self._remove_step = widgets.PushButton(text='Remove last step')
+        self._steps = widgets.TextEdit(label='Steps')
+        self._steps.native.setReadOnly(True)
+        self._file = widgets.FileEdit(
+            label='Pipeline file', mode='w', filter='*.json')
+        self._save = widgets.PushButton(text='Save')
+        self._load = widgets.PushButton(text='Load')
+        self._run = widgets.PushButton(text='Run')
+
+        self.extend([
+            self._surface,
+            self._operation,
+            self._parameters,
+            widgets.Container(
+                widgets=[self._add_step, self._remove_step],
+                layout='horizontal', labels=False),
+            self._steps,
+            self._file,
+            widgets.Container(
+                widgets=[self._save, self._load],
+                layout='horizontal', labels=False),
+            self._run,
+        ])
+
+        self._operation.changed.connect(self._update_parameters)
+        self._add_step.clicked.connect(self._on_add_step)
+        self._remove_step.clicked.connect(self._on_remove_step)
+        self._save.clicked.connect(lambda: self.pipeline.save(self._file.value))
+        self._load.clicked.connect(self._on_load)
+        self._run.clicked.connect(self._on_run)
+        # the pipeline runs in a worker, with progress and cancel button
+        self._runner = TaskRunner(self, self._run)
+
+        # keep the surface choices in sync with the layer list
+        self.viewer.layers.events.inserted.connect(self._surface.reset_choices)
+        self.viewer.layers.events.removed.connect(self._surface.reset_choices)
+        self._surface.reset_choices()
+        self._update_parameters()
+
+    def _update_parameters(self):
+        """Show one input widget per parameter of the selected operation."""
+        self._parameters.clear()
+        signature = inspect.signature(_operations[self._operation.value])
+        for name, parameter in list(signature.parameters.items())[1:]:
+            self._parameters.append(widgets.create_widget(
+                value=parameter.default,
+                annotation=parameter.annotation,
+                name=name))
+
+    def _on_add_step(self):
+        parameters = {w.name: w.value for w in self._parameters}
+        self.pipeline.add(self._operation.value, **parameters)
+        self._update_steps()
+
+    def _on_remove_step(self):
+        if self.pipeline.steps:
+            self.pipeline.steps.pop()
+        self._update_steps()
+
+    def _on_load(self):
+        self.pipeline = MeshPipeline.load(self._file.value)
+        self._update_steps()
+
+    def _update_steps(self):
+        self._steps.value = '\n'.join(
+            f'{i + 1}. {operation} {parameters}'
+            for i, (operation, parameters) in enumerate(self.pipeline.steps)
+        )
+
+    def _on_run(self):
+        surface = self._surface.value
+        if surface is None:
+            return
+        pipeline = MeshPipeline(self.pipeline.steps)
+        self._runner.run(
+            lambda: pipeline(surface), self._add_layers, 'Pipeline')
+
+    def _add_layers(self, layers: List[LayerDataTuple]):
+        for layer_data in layers:
+            self.viewer.add_layer(Layer.create(*layer_data))
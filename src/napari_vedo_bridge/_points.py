@@ -1,5 +1,12 @@
+import itertools
 import vedo
 import numpy as np
+from contextlib import contextmanager
+from napari_vedo_bridge._background import (
+    BackgroundRunner,
+    current_task,
+    run_filter,
+)
 from napari_vedo_bridge.utils import napari_to_vedo_points, vedo_points_to_napari
 from napari.layers import Points
 from magicgui import widgets, magic_factory
@@ -15,6 +22,7 @@ def _on_init(widget):
     label_widget.native.setTextInteractionFlags(Qt.TextBrowserInteraction)
     label_widget.native.setOpenExternalLinks(True)
     widget.extend([label_widget])
+    widget._background_runner = BackgroundRunner(widget)
 
 
 @magic_factory(
@@ -42,10 +50,8 @@ def smooth_mls_1d(
     Points
         The smoothed points.
     """
-    vedo_points = napari_to_vedo_points(points)
-    vedo_points.smooth_mls_1d(
-        f=factor,
-        radius=radius)
+    vedo_points = _smooth_mls_1d(
+        napari_to_vedo_points(points), factor=factor, radius=radius)
     new_points = vedo_points_to_napari(vedo_points)
     new_points.scale = points.scale
     new_points.size = points.size
@@ -77,10 +83,8 @@ def smooth_mls_2d(
     Points
         The smoothed points.
     """
-    vedo_points = napari_to_vedo_points(points)
-    vedo_points.smooth_mls_2d(
-        f=factor,
-        radius=radius)
+    vedo_points = _smooth_mls_2d(
+        napari_to_vedo_points(points), factor=factor, radius=radius)
     new_points = vedo_points_to_napari(vedo_points)
     new_points.scale = points.scale
     new_points.size = points.size
@@ -114,8 +118,68 @@ def remove_outliers(
     Points
         The points with outliers removed.
     """
-    vedo_points = napari_to_vedo_points(points)
-    filtered_points = vedo_points.remove_outliers(
-        radius=radius,
-        neighbors=n_neighbors)
+    filtered_points = _remove_outliers(
+        napari_to_vedo_points(points), radius=radius, n_neighbors=n_neighbors)
     return vedo_points_to_napari(filtered_points)
+
+
+
+# Operations on vedo points
+def _smooth_mls_1d(
+        points: vedo.Points,
+        factor: float = 0.2,
+        radius: float = 0) -> vedo.Points:
+    with _watch_points(points):
+        return points.smooth_mls_1d(f=factor, radius=radius)
+
+
+def _smooth_mls_2d(
+        points: vedo.Points,
+        factor: float = 0.2,
+        radius: float = 0) -> vedo.Points:
+    with _watch_points(points):
+        return points.smooth_mls_2d(f=factor, radius=radius)
+
+
+@contextmanager
+def _watch_points(points: vedo.Points):
+    """
+    Report the progress of a per-point vedo operation to the active task.
+
+    The moving least squares smoothing of vedo is a Python loop that looks up
+    the neighbors of one point after the other, so the lookups count the
+    processed points and stop the loop when the task is cancelled.
+    """
+    task = current_task()
+    if task is None:
+        yield
+        return
+
+    closest_point = points.closest_point
+    n_points = max(points.npoints, 1)
+    n_done = itertools.count(1)
+
+    def _closest_point(*args, **kwargs):
+        task.check()
+        task.set_step_progress(next(n_done) / n_points)
+        return closest_point(*args, **kwargs)
+
+    points.closest_point = _closest_point
+    try:
+        yield
+    finally:
+        del points.closest_point
+
+
+def _remove_outliers(
+        points: vedo.Points,
+        radius: float = 0.1,
+        n_neighbors: int = 5) -> vedo.Points:
+    from vtkmodules.vtkFiltersPoints import vtkRadiusOutlierRemoval
+
+    removal = vtkRadiusOutlierRemoval()
+    removal.SetRadius(radius)
+    removal.SetNumberOfNeighbors(n_neighbors)
+    removal.GenerateOutliersOff()
+    # vedo adds the vertex cells that the filter does not create
+    return vedo.Points(run_filter(removal, points.dataset))
@@ -0,0 +1,268 @@
+import inspect
+import itertools
+import numpy as np
+import vedo
+from typing import Callable, Hashable, Optional
+
+from magicgui import widgets
+from magicgui.widgets import FunctionGui
+
+from napari_vedo_bridge._cache import fingerprint, mesh_cache
+from napari_vedo_bridge.utils import (
+    surface_data_to_vedo_mesh,
+    vedo_mesh_to_surface_data,
+)
+
+
+_default_max_faces = 20000
+
+# identifies the data of a layer until it changes, see `LivePreview`
+_data_versions = itertools.count()
+
+
+class LivePreview:
+    """
+    Live preview of a mesh operation on a decimated proxy of the surface.
+
+    Adds a "Live preview" checkbox to a mesh widget. While it is checked,
+    every parameter change runs the operation on a coarse proxy of the
+    selected surface in a background worker and shows the result in a
+    preview layer. Only one preview is computed at a time: requests that
+    arrive meanwhile replace each other and only the latest one is computed
+    once the worker is done, results of superseded requests are discarded.
+    The full-resolution operation only runs when the widget is called.
+
+    For 4D surfaces, the frame at the current time step is previewed.
+
+    Proxies are cached per layer and time step, and dropped when the data of
+    the layer changes, so parameter changes never hash the full-resolution
+    surface.
+
+    Parameters
+    ----------
+    widget : FunctionGui
+        Widget of a mesh operation with a `surface` parameter.
+    operation : Callable[..., vedo.Mesh]
+        vedo-level operation (see `_mesh.py`) that takes a mesh and the
+        remaining parameters of the widget.
+    max_faces : int, optional
+        Approximate number of faces of the proxy, by default 20000.
+    """
+
+    def __init__(
+            self,
+            widget: FunctionGui,
+            operation: Callable[..., vedo.Mesh],
+            max_faces: int = _default_max_faces):
+        self.widget = widget
+        self.operation = operation
+        self.max_faces = max_faces
+
+        self.checkbox = widgets.CheckBox(
+            name='live_preview', label='Live preview', value=False,
+            gui_only=True)
+        position = len(self.widget)
+        if self.widget.call_button is not None:
+            position = self.widget.index(self.widget.call_button)
+        self.widget.insert(position, self.checkbox)
+
+        self.layer = None
+        self._worker = None
+        self._pending = None
+        self._source = None
+        self._version = None
+
+        self.widget.changed.connect(self._on_change)
+        self.widget.called.connect(self._on_commit)
+
+    @property
+    def parameters(self) -> dict:
+        """Current parameters of the operation as set in the widget."""
+        names = list(inspect.signature(self.operation).parameters)[1:]
+        return {name: self.widget[name].value for name in names}
+
+    def _on_change(self, event=None):
+        surface = self.widget.surface.value
+        if not self.checkbox.value or surface is None:
+            self._remove_layer()
+            return
+
+        request = (surface, self.parameters)
+        if self._worker is not None:
+            self._pending = request
+            return
+        self._start(request)
+
+    def _start(self, request):
+        from napari.qt.threading import create_worker
+
+        surface, parameters = request
+        t = _current_time(surface)
+
+        self._worker = create_worker(
+            compute_preview, surface.data, self.operation, parameters,
+            self.max_faces, key=self._data_version(surface), t=t,
+            _start_thread=False)
+        self._worker.returned.connect(
+            lambda data: self._show(surface, data, t))
+        self._worker.finished.connect(self._on_finished)
+        self._worker.start()
+
+    def _data_version(self, surface) -> int:
+        """Key of the current data of `surface` in the proxy cache."""
+        if surface is not self._source:
+            if self._source is not None:
+                self._source.events.data.disconnect(self._on_data_change)
+            self._source = surface
+            self._version = next(_data_versions)
+            surface.events.data.connect(self._on_data_change)
+        return self._version
+
+    def _on_data_change(self, event=None):
+        self._version = next(_data_versions)
+
+    def _on_finished(self):
+        self._worker = None
+        if self._pending is not None:
+            request, self._pending = self._pending, None
+            self._start(request)
+
+    def _show(self, surface, data, t: Optional[int]):
+        # a newer request is waiting, this result is outdated
+        if self._pending is not None or not self.checkbox.value:
+            return
+
+        if t is not None:
+            data = (np.column_stack([np.full(len(data[0]), t), data[0]]),
+                    data[1])
+
+        viewer = _viewer()
+        if self.layer is not None and self.layer in viewer.layers:
+            self.layer.data = data
+        else:
+            self.layer = viewer.add_surface(
+                data, name=f'{surface.name} (preview)', opacity=0.7)
+
+    def _on_commit(self, event=None):
+        self._pending = None
+        self._remove_layer()
+
+    def _remove_layer(self):
+        if self.layer is None:
+            return
+        viewer = _viewer()
+        if viewer is not None and self.layer in viewer.layers:
+            viewer.layers.remove(self.layer)
+        self.layer = None
+
+
+def compute_preview(
+        data: "napari.types.SurfaceData",
+        operation: Callable[..., vedo.Mesh],
+        parameters: dict,
+        max_faces: int = _default_max_faces,
+        key: Optional[Hashable] = None,
+        t: Optional[int] = None) -> "napari.types.SurfaceData":
+    """
+    Apply a mesh operation to a decimated proxy of a surface.
+
+    Proxies and results are cached (see `_cache.MeshCache`), so scrubbing
+    back and forth over a parameter range does not recompute anything.
+    Target vertex counts (`n_vertices`) are scaled to the size of the proxy.
+
+    Parameters
+    ----------
+    data : napari.types.SurfaceData
+        3D surface data, or 4D surface data of which frame `t` is previewed.
+    operation : Callable[..., vedo.Mesh]
+        vedo-level operation, see `_mesh.py`.
+    parameters : dict
+        Keyword arguments of the operation.
+    max_faces : int, optional
+        Approximate number of faces of the proxy, by default 20000.
+    key : Hashable, optional
+        Identifies `data` in the proxy cache. Defaults to a content hash of
+        the data, which takes long for large surfaces.
+    t : int, optional
+        Time step of 4D data.
+    """
+    if key is None:
+        key = fingerprint(data)
+    proxy, n_vertices = mesh_cache.get(
+        ('proxy', key, t, max_faces),
+        lambda: _make_frame_proxy(data, t, max_faces))
+
+    parameters = dict(parameters)
+    if parameters.get('n_vertices'):
+        ratio = len(proxy[0]) / max(n_vertices, 1)
+        parameters['n_vertices'] = max(4, int(parameters['n_vertices'] * ratio))
+
+    return mesh_cache.result(
+        proxy, operation.__name__, parameters,
+        lambda: vedo_mesh_to_surface_data(
+            operation(surface_data_to_vedo_mesh(proxy), **parameters)))
+
+
+def _make_frame_proxy(
+        data: "napari.types.SurfaceData",
+        t: Optional[int],
+        max_faces: int) -> tuple:
+    """Proxy of the surface (frame `t` of 4D data) and its vertex count."""
+    if t is not None:
+        data = _frame_data(data, t)
+    return make_proxy(data, max_faces), len(data[0])
+
+
+def make_proxy(
+        data: "napari.types.SurfaceData",
+        max_faces: int = _default_max_faces) -> "napari.types.SurfaceData":
+    """
+    Decimate a surface to roughly `max_faces` faces for previews.
+
+    Uses vertex clustering (`decimate_binned`), which is fast on large
+    meshes. Surfaces with fewer faces are returned as they are.
+    """
+    if len(data[1]) <= max_faces:
+        return data[0], data[1]
+
+    # a closed surface in a grid with d bins per axis has about 6 d^2 faces
+    divisions = max(2, int(np.sqrt(max_faces / 6)))
+    mesh = surface_data_to_vedo_mesh(data).decimate_binned(
+        divisions=(divisions,) * 3)
+    return vedo_mesh_to_surface_data(mesh)
+
+
+def _current_time(surface) -> Optional[int]:
+    """
+    Time step of a 4D surface shown in the viewer, None for 3D surfaces.
+    """
+    from ._timelapse import current_time_step
+
+    vertices = surface.data[0]
+    if vertices.shape[1] != 4:
+        return None
+
+    viewer = _viewer()
+    t = current_time_step(viewer) if viewer is not None else None
+    return t if t is not None else int(vertices[0, 0])
+
+
+def _frame_data(
+        data: "napari.types.SurfaceData", t: int) -> "napari.types.SurfaceData":
+    """
+    Get frame `t` of 4D surface data, or the first frame if `t` is empty.
+    """
+    vertices, faces = data[0], data[1]
+    indices = np.flatnonzero(vertices[:, 0] == t)
+    if len(indices) == 0:
+        indices = np.flatnonzero(vertices[:, 0] == vertices[0, 0])
+
+    # vertices of a frame are contiguous in stacked surface data
+    first, last = indices[0], indices[-1] + 1
+    frame_faces = faces[((faces >= first) & (faces < last)).all(axis=1)]
+    return vertices[first:last, 1:], frame_faces - first
+
+
+def _viewer() -> Optional["napari.Viewer"]:
+    import napari
+    return napari.current_viewer()
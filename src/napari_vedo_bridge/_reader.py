@@ -1,197 +1,786 @@
 import numpy as np
 from napari.layers import Layer
-from typing import Union, Sequence, List, Optional
+from typing import (
+    Callable, Iterator, Union, Sequence, List, NamedTuple, Optional)
+
+from ._container import ContainerReader, is_container
+from ._formats import (
+    is_dolfin_xml,
+    load_mesh_file,
+    mesh_extension,
+    open_mesh_file,
+)
+from ._features import FrameStack, features_table, stack_frames
+from ._frame_index import FrameIndex, read_frame_index
+from ._timelapse import (
+    LazySurfaceTimelapse, _default_max_memory, _default_n_prefetch)
+from .utils import vedo_mesh_faces
 
 PathLike = str
 PathOrPaths = Union[PathLike, Sequence[PathLike]]
 
 
-_supported_extensions = ['vtp', 'ply', 'obj', 'vtk', 'stl']
+# gzip-compressed files are supported if the inner format is supported
+_supported_extensions = [
+    'vtp', 'ply', 'obj', 'vtk', 'stl', 'vtkhdf', 'off', 'xml']
 
 
 def get_reader(path: "PathOrPaths") -> Optional["ReaderFunction"]:
     import os
     from pathlib import Path
-    import vedo
 
     if isinstance(path, Path): # convert to string
         path = str(path)
 
     # in case a single file is passed
-    if isinstance(path, str) and path.split('.')[-1] in _supported_extensions:
-        thing = vedo.load(path)
-        if type(thing) is vedo.Points:
-            return points_reader
-        elif type(thing) is vedo.Mesh:
-
-            # if it's a mesh with no edges, it's probably a points layer
-            if len(thing.cells) == 0:
-                return points_reader
-            else:
-                return surfaces_reader
+    if isinstance(path, str) and _is_supported(path):
+        return _sniff_reader(path)
 
     # in case a list of files is passed
-    elif isinstance(path, list) and all(
-        p.split('.')[-1] in _supported_extensions for p in path
-    ):
-
-        thing = vedo.load(path[0])
-        if type(thing) is vedo.Points:
-            return points_reader
-        elif type(thing) is vedo.Mesh:
-
-            # if it's a mesh with no edges, it's probably a points layer
-            if len(thing.cells) == 0:
-                return points_reader
-            else:
-                return surfaces_reader
+    elif isinstance(path, list) and all(_is_supported(p) for p in path):
+        return _sniff_reader(path[0])
 
     # in case a directory is passed
     # find all files inside and pass again as list
     elif isinstance(path, (str, Path)) and os.path.isdir(path):
-        filenames = [os.path.join(path, f) for f in os.listdir(path)] 
-        return get_reader(filenames)
+        index = read_frame_index(path)
+        if index is not None:
+            return _readers[index.layer_type]
+        filenames = _list_files(path)
+        return get_reader(filenames) if filenames else None
 
     return None
 
 
-def points_reader(path: PathOrPaths) -> List["LayerData"]:
+def _is_supported(path: PathLike) -> bool:
+    """Whether the file extension (inside a `.gz` suffix) is supported."""
+    return mesh_extension(path) in _supported_extensions
+
+
+def _sniff_reader(path: PathLike) -> Optional["ReaderFunction"]:
+    """Reader for the layer type of a file, None if it cannot be read."""
+    import struct
+    import zlib
+
+    try:
+        return _readers[_guess_layer_type(path)]
+    except (OSError, ValueError, UnicodeDecodeError, EOFError, struct.error,
+            zlib.error):
+        return None
+
+
+def get_lazy_reader(path: "PathOrPaths") -> Optional["ReaderFunction"]:
+    """
+    Get a reader that loads the frames of a surface timelapse on demand.
+
+    Only directories or lists of surface files and single-file timelapse
+    containers are supported.
+    """
     import os
     from pathlib import Path
-    import tqdm
-    from napari_timelapse_processor import TimelapseConverter
 
-    # whether directory, list of files or single file is passed
-    if os.path.isdir(path):
-        path = [
-            os.path.join(path, f)
-            for f in os.listdir(path)
-            if f.split('.')[-1] in _supported_extensions]
-        path = sorted(path, key=lambda x: Path(x).stem)
-    elif isinstance(path, list):
-        path = sorted(path, key=lambda x: Path(x).stem)
-    elif isinstance(path, (str, Path)):
-        path = [str(path)]
-
-    layers = []
-    if len(path) == 1:
-        layer = _read_single_points(path[0])
-        data = layer.data
-        properties = {
-            'features': layer.features,
-            'size': 0.5
-        }
+    if isinstance(path, Path):
+        path = str(path)
+    if isinstance(path, str) and is_container(path):
+        container = ContainerReader(path)
+        if container.is_timelapse and container.layer_type == 'surface':
+            return lazy_surfaces_reader
+        return None
+    if not (isinstance(path, list) or os.path.isdir(path)):
+        return None
+
+    if get_reader(path) is surfaces_reader:
+        return lazy_surfaces_reader
+    return None
+
 
+def points_reader(
+        path: PathOrPaths,
+        n_workers: Optional[int] = None) -> List["LayerData"]:
+    """
+    Read points from a single file, a list of files or a directory.
+
+    Parameters
+    ----------
+    path : PathOrPaths
+        Path to a file, a list of files or a directory. Multiple files are
+        sorted by their name and stacked into a single 4D points layer, as
+        are the frames of a single-file timelapse container (`.vtkhdf`).
+    n_workers : int, optional
+        Number of threads used to read multiple files concurrently. Uses
+        one thread per CPU core if None, reads serially if 1.
+    """
+    # whether directory, list of files or single file is passed
+    index = _directory_index(path)
+    path = index.paths if index is not None else _list_files(path)
+
+    if len(path) == 1 and is_container(path[0]):
+        frames = _read_container(path[0])
+        if isinstance(frames, list):
+            frames = stack_frames(frames)
+    elif len(path) == 1:
+        frames = _load_points_data(path[0])
     else:
-        # read all the files, create a layer from each
-        for i, p in tqdm.tqdm(enumerate(path), total=len(path)):
-            layer = _read_single_points(p)
-            layers.append(layer)
-
-        # Stack output layer and return
-        Converter = TimelapseConverter()
-        layer_4d = Converter.stack_data(layers, layertype=Layer)
-        data = layer_4d.data
-        properties = {
-            'features': layer_4d.features,
-            'size': 0.5
-        }
-
-    # color the pointcloud by the first detected feature
-    if not properties['features'].empty:
-        properties['face_color'] = properties['features'].columns[0]
+        # read all the files and stack them into preallocated arrays
+        frames = _read_stacked(
+            path, _load_points_data, n_workers, index, 'points')
+
+    data, features = frames[0], frames[2]
+    if isinstance(features, dict):
+        features = features_table(features)
+
+    properties = {
+        'features': features,
+        'size': 0.5
+    }
+
+    # color the pointcloud by the first detected scalar feature
+    scalar_features = [
+        column for column in features.columns if not column.endswith(']')]
+    if scalar_features:
+        properties['face_color'] = scalar_features[0]
 
     return [(data, properties, 'points')]
 
 
-def surfaces_reader(path: PathOrPaths) -> List["LayerData"]:
-    import os
-    from pathlib import Path
-    import tqdm
-    from napari_timelapse_processor import TimelapseConverter
+def surfaces_reader(
+        path: PathOrPaths,
+        n_workers: Optional[int] = None) -> List["LayerData"]:
+    """
+    Read surfaces from a single file, a list of files or a directory.
+
+    Parameters
+    ----------
+    path : PathOrPaths
+        Path to a file, a list of files or a directory. Multiple files are
+        sorted by their name and stacked into a single 4D surface layer, as
+        are the frames of a single-file timelapse container (`.vtkhdf`).
+    n_workers : int, optional
+        Number of threads used to read multiple files concurrently. Uses
+        one thread per CPU core if None, reads serially if 1.
+    """
     from importlib.metadata import version
     from packaging.version import Version
 
     # whether directory, list of files or single file is passed
-    if os.path.isdir(path):
-        path = [
-            os.path.join(path, f)
-            for f in os.listdir(path)
-            if f.split('.')[-1] in _supported_extensions
-            ]
-        
-        path = sorted(path, key=lambda x: Path(x).stem)
-    elif isinstance(path, list):
-        path = sorted(path, key=lambda x: Path(x).stem)
-    elif isinstance(path, (str, Path)):
-        path = [path]
-
-    layers = []
-    if len(path) == 1:
-        layer = _read_single_surface(path[0])
-        data = layer.data
-
+    index = _directory_index(path)
+    path = index.paths if index is not None else _list_files(path)
+
+    if len(path) == 1 and is_container(path[0]):
+        frames = _read_container(path[0])
+        if isinstance(frames, list):
+            frames = stack_frames(frames)
+    elif len(path) == 1:
+        frames = _load_surface_data(path[0])
     else:
-        # read all the files, create a layer from each
-        for i, p in tqdm.tqdm(enumerate(path), total=len(path)):
-            layer = _read_single_surface(p)
-            layers.append(layer)
+        # read all the files and stack them into preallocated arrays
+        frames = _read_stacked(path, _load_surface_data, n_workers, index)
 
-        # Stack output layer and return
-        Converter = TimelapseConverter()
-        layer = Converter.stack_data(layers, layertype=Layer)
-        data = layer.data
+    data, features = frames[:2], frames[2]
+    if isinstance(features, dict):
+        features = features_table(features)
 
     # check if napari version is 0.5.0 or higher
     # surface_layer.features only available in 0.5.0 or higher
 
     properties = {}
     if Version(version('napari')) >= Version('0.5.0'):
-        properties['features'] = layer.features
+        properties['features'] = features
 
     return [(data, properties, 'surface')]
 
 
+def lazy_surfaces_reader(
+        path: PathOrPaths,
+        max_memory: int = _default_max_memory,
+        n_prefetch: int = _default_n_prefetch) -> List["LayerData"]:
+    """
+    Read a surface timelapse lazily from a list of files or a directory.
+
+    Only the file headers are read upfront. Every frame is parsed when the
+    time slider of the viewer reaches it and kept in a cache of decoded
+    frames. The returned layer holds the current frame only.
+
+    Parameters
+    ----------
+    path : PathOrPaths
+        List of files or a directory, one file per frame, or a single-file
+        timelapse container.
+    max_memory : int, optional
+        Maximal memory used for cached frames in bytes, by default 2 GB.
+    n_prefetch : int, optional
+        Number of frames decoded ahead of the time slider in background
+        threads, by default 4.
+    """
+    import napari
+    from pathlib import Path
+
+    index = _directory_index(path)
+    paths = index.paths if index is not None else _list_files(path)
+    if len(paths) == 1 and is_container(paths[0]):
+        timelapse = LazySurfaceTimelapse.from_container(
+            paths[0], max_memory=max_memory, n_prefetch=n_prefetch)
+    elif index is not None and index.n_faces is not None:
+        timelapse = LazySurfaceTimelapse.from_index(
+            index, max_memory=max_memory, n_prefetch=n_prefetch)
+    else:
+        timelapse = LazySurfaceTimelapse(
+            paths, max_memory=max_memory, n_prefetch=n_prefetch)
+
+    viewer = napari.current_viewer()
+    if viewer is not None:
+        timelapse.connect_when_added(viewer)
+
+    properties = {
+        'name': Path(paths[0]).parent.name,
+        'metadata': {'timelapse': timelapse},
+    }
+    return [(timelapse.layer_data(0), properties, 'surface')]
+
+
+def _list_files(path: PathOrPaths) -> List[PathLike]:
+    """
+    Get the supported files in a directory or list, sorted by their name.
+    """
+    import os
+    from pathlib import Path
+
+    if isinstance(path, list):
+        return sorted(path, key=lambda x: Path(x).stem)
+    elif os.path.isdir(path):
+        path = [
+            os.path.join(path, f)
+            for f in os.listdir(path)
+            if _is_supported(f)
+            ]
+        return sorted(path, key=lambda x: Path(x).stem)
+    return [str(path)]
+
+
+def _read_frames(
+        paths: Sequence[PathLike],
+        read_function: Callable,
+        n_workers: Optional[int] = None) -> list:
+    """
+    Read a list of files concurrently, keeping the order of the files.
+
+    VTK releases the GIL while parsing, so a thread pool is sufficient to
+    read several files at the same time.
+
+    Parameters
+    ----------
+    paths : Sequence[PathLike]
+        Files to read.
+    read_function : Callable
+        Function that reads a single file, e.g. `_load_surface_data`.
+    n_workers : int, optional
+        Number of threads. Uses one thread per CPU core if None.
+
+    Returns
+    -------
+    list
+        The output of `read_function` for every file, in the order of `paths`.
+    """
+    return list(_iter_frames(paths, read_function, n_workers))
+
+
+def _iter_frames(
+        paths: Sequence[PathLike],
+        read_function: Callable,
+        n_workers: Optional[int] = None) -> Iterator:
+    """
+    Same as `_read_frames`, but yield every frame as soon as it was read.
+
+    At most two frames per worker are read ahead, so that only a few frames
+    are held in memory if they are consumed one by one.
+    """
+    import os
+    import tqdm
+    from collections import deque
+    from concurrent.futures import ThreadPoolExecutor
+
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    n_workers = max(1, min(n_workers, len(paths)))
+
+    if n_workers == 1:
+        for p in tqdm.tqdm(paths):
+            yield read_function(p)
+        return
+
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        pending = deque()
+        for p in tqdm.tqdm(paths):
+            if len(pending) >= 2 * n_workers:
+                yield pending.popleft().result()
+            pending.append(executor.submit(read_function, p))
+        while pending:
+            yield pending.popleft().result()
+
+
+def _read_stacked(
+        paths: Sequence[PathLike],
+        read_function: Callable,
+        n_workers: Optional[int] = None,
+        index: Optional[FrameIndex] = None,
+        layer_type: str = 'surface') -> tuple:
+    """
+    Read a list of files and stack them into 4D vertices, faces, features.
+
+    If the vertex and face counts of all frames are known from the index of
+    the timelapse directory or from the file headers, the stacked arrays are
+    allocated upfront and every frame is copied into them as soon as it was
+    read, so that peak memory is about the size of the stacked layer.
+    Otherwise, or if the counts turn out to be wrong, all frames are read
+    first and stacked afterwards.
+    """
+    counts = _frame_counts(paths, layer_type, index)
+    if counts is not None:
+        n_vertices, n_faces, dtype, features = counts
+        stack = None
+        try:
+            for t, frame in enumerate(
+                    _iter_frames(paths, read_function, n_workers)):
+                if stack is None:
+                    stack = FrameStack(
+                        n_vertices, n_faces,
+                        dtype or np.asarray(frame[0]).dtype, features)
+                stack.add(t, frame)
+            return stack.result()
+        except ValueError:
+            pass
+
+    return stack_frames(_read_frames(paths, read_function, n_workers))
+
+
+def _frame_counts(
+        paths: Sequence[PathLike],
+        layer_type: str,
+        index: Optional[FrameIndex] = None) -> Optional[tuple]:
+    """
+    Vertex and face counts of all frames, from the index or file headers.
+
+    Returns
+    -------
+    tuple or None
+        Vertex counts, face counts (None for points), vertex dtype and
+        feature columns (None if unknown), or None if a count is unknown.
+    """
+    if index is not None:
+        return index.n_vertices, index.n_faces, index.dtype, index.features
+
+    headers = [_read_header(path) for path in paths]
+    n_vertices = [header.n_vertices for header in headers]
+    n_faces = [header.n_faces for header in headers]
+    if None in n_vertices:
+        return None
+    if layer_type == 'points':
+        return n_vertices, None, None, None
+    if None in n_faces:
+        return None
+    return n_vertices, n_faces, None, None
+
+
+def _directory_index(path: PathOrPaths) -> Optional[FrameIndex]:
+    """Index of a timelapse directory, None for files or without index."""
+    import os
+    from pathlib import Path
+
+    if isinstance(path, (str, Path)) and os.path.isdir(path):
+        return read_frame_index(str(path))
+    return None
+
+
 def _read_single_points(path) -> Layer:
     """
     Read a single points file and return a Layer object
     """
-    import vedo
-    import pandas as pd
+    return _points_layer(*_load_points_data(path))
+
+
+def _load_points_data(path) -> tuple:
+    """
+    Read a single points file and return vertices, None and point data
+    """
+    if is_container(path):
+        vertices, _, pointdata = _read_single_frame_container(path)
+        return vertices, None, pointdata
+
+    points = load_mesh_file(path)
+    return points.vertices, None, dict(points.pointdata)
+
+
+def _points_layer(vertices, faces, pointdata: dict) -> Layer:
     from napari.layers import Layer
-    points = vedo.load(str(path))
-
-    # This is done, because vedo adds an RGB (Nx3) feature
-    # to the pointdata for some formats
-    features = {
-        key: np.asarray(points.pointdata[key])
-        for key in points.pointdata.keys()
-        if len(points.pointdata[key].shape) == 1
-        }
-
-    layer = Layer.create(
-            points.vertices,
-            {'features': pd.DataFrame(features)},
-            'points'
-        )
 
-    return layer
+    # vector features, e.g. the RGB (Nx3) feature that vedo adds for some
+    # formats, are split into one column per component
+    return Layer.create(
+        vertices, {'features': features_table(pointdata)}, 'points')
 
 
 def _read_single_surface(path):
     """
     Read a single surface file and return a Layer object
     """
-    import vedo
-    import pandas as pd
+    return _surface_layer(*_load_surface_data(path))
+
+
+def _surface_layer(vertices, faces, pointdata: dict) -> Layer:
     from napari.layers import Layer
-    surface = vedo.load(path)
 
-    layer = Layer.create(
-            (surface.vertices, np.asarray(surface.cells, dtype=int)),
-            {},
-            'surface'
-        )
-    layer.features = pd.DataFrame(dict(surface.pointdata))
+    layer = Layer.create((vertices, faces), {}, 'surface')
+    layer.features = features_table(pointdata)
 
     return layer
+
+
+def _read_container(path: PathLike) -> Union[tuple, List[tuple]]:
+    """
+    Read all frames of a single-file timelapse container.
+
+    Returns a list with vertices, faces and point data of every frame for
+    timelapses and a single such tuple for containers without time
+    information.
+    """
+    import tqdm
+
+    container = ContainerReader(path)
+    if not container.is_timelapse:
+        return container[0]
+    return [container[t] for t in tqdm.tqdm(range(len(container)))]
+
+
+def _load_surface_data(path) -> tuple:
+    """
+    Read a single surface file and return vertices, faces and point data
+
+    If the disk cache is enabled (see `_disk_cache.configure_disk_cache`),
+    files that were parsed before are memory-mapped from the cache.
+    """
+    from . import _disk_cache
+
+    if is_container(path):
+        return _read_single_frame_container(path)
+
+    if _disk_cache.disk_cache is not None:
+        return _disk_cache.disk_cache.load(str(path), _parse_surface_file)
+    return _parse_surface_file(path)
+
+
+def _parse_surface_file(path) -> tuple:
+    surface = load_mesh_file(path)
+
+    return (
+        surface.vertices,
+        vedo_mesh_faces(surface),
+        dict(surface.pointdata)
+    )
+
+
+def _read_single_frame_container(path) -> tuple:
+    container = ContainerReader(path)
+    if container.is_timelapse:
+        raise ValueError(
+            f'{path} contains a timelapse, use points_reader or '
+            'surfaces_reader to read all frames')
+    return container[0]
+
+
+class _MeshHeader(NamedTuple):
+    """
+    Information about a mesh file that can be obtained without parsing it.
+
+    Any of the fields may be None if the header does not contain it.
+    """
+    layer_type: Optional[str]
+    n_vertices: Optional[int]
+    n_faces: Optional[int]
+
+
+_unknown_header = _MeshHeader(None, None, None)
+_chunk_size = 1 << 20
+
+
+def _header_from_counts(n_vertices, n_faces) -> _MeshHeader:
+    if n_faces is None:
+        return _MeshHeader(None, n_vertices, None)
+    layer_type = 'surface' if n_faces > 0 else 'points'
+    return _MeshHeader(layer_type, n_vertices, n_faces)
+
+
+def _read_header(path) -> _MeshHeader:
+    """
+    Classify a mesh file as points or surface from its header alone.
+
+    Only the first few kilobytes of a file are read for the binary formats.
+    Formats which do not announce their cell counts upfront (ASCII vtk, obj)
+    are scanned for the first face keyword without being parsed.
+
+    Parameters
+    ----------
+    path : str
+        Path to the mesh file.
+
+    Returns
+    -------
+    _MeshHeader
+        The layer type (`'points'` or `'surface'`) and the vertex and face
+        counts, if they could be determined.
+    """
+    sniffers = {
+        'vtp': _read_vtp_header,
+        'xml': _read_xml_header,
+        'ply': _read_ply_header,
+        'vtk': _read_vtk_header,
+        'obj': _read_obj_header,
+        'stl': _read_stl_header,
+        'off': _read_off_header,
+    }
+    if is_container(path):
+        return _read_container_header(path)
+
+    sniffer = sniffers.get(mesh_extension(path))
+    if sniffer is None:
+        return _unknown_header
+
+    # gzip files are decompressed while reading the header
+    try:
+        with open_mesh_file(path) as f:
+            return sniffer(f)
+    except (OSError, ValueError, EOFError):
+        return _unknown_header
+
+
+def _read_container_header(path) -> _MeshHeader:
+    """Counts of the first frame of a single-file timelapse container."""
+    try:
+        vertices, faces, _ = ContainerReader(path)[0]
+    except (OSError, ValueError, IndexError):
+        return _unknown_header
+    return _header_from_counts(len(vertices), len(faces))
+
+
+def _read_vtp_header(f) -> _MeshHeader:
+    import re
+
+    header = f.read(1 << 16)
+    pieces = re.findall(rb'<Piece\s[^>]*>', header)
+    if not pieces:
+        return _unknown_header
+
+    def _count(attribute, piece):
+        match = re.search(attribute + rb'="(\d+)"', piece)
+        return int(match.group(1)) if match else 0
+
+    n_vertices = sum(_count(rb'NumberOfPoints', p) for p in pieces)
+    n_faces = sum(
+        _count(rb'NumberOfPolys', p) + _count(rb'NumberOfStrips', p)
+        for p in pieces)
+    return _header_from_counts(n_vertices, n_faces)
+
+
+def _read_xml_header(f) -> _MeshHeader:
+    """Header of VTK XML PolyData or of a Dolfin mesh."""
+    import re
+
+    header = f.read(1 << 16)
+    if not is_dolfin_xml(header):
+        f.seek(0)
+        return _read_vtp_header(f)
+
+    cell_type = re.search(rb'<mesh\s[^>]*celltype="(\w+)"', header)
+    if cell_type is None or cell_type.group(1) not in (
+            b'triangle', b'tetrahedron'):
+        return _unknown_header
+    n_vertices = re.search(rb'<vertices\s[^>]*size="(\d+)"', header)
+    n_vertices = int(n_vertices.group(1)) if n_vertices else None
+    # the boundary of a tetrahedral mesh is only known after parsing it
+    n_faces = re.search(rb'<cells\s[^>]*size="(\d+)"', header)
+    if cell_type.group(1) == b'triangle' and n_faces:
+        return _MeshHeader('surface', n_vertices, int(n_faces.group(1)))
+    return _MeshHeader('surface', n_vertices, None)
+
+
+def _read_ply_header(f) -> _MeshHeader:
+    if f.readline().strip() != b'ply':
+        return _unknown_header
+
+    elements = {}
+    for line in f:
+        tokens = line.split()
+        if not tokens or tokens[0] == b'end_header':
+            break
+        if tokens[0] == b'element' and len(tokens) == 3:
+            elements[tokens[1]] = int(tokens[2])
+    else:
+        return _unknown_header
+
+    n_faces = elements.get(b'face', 0) + elements.get(b'tristrips', 0)
+    return _header_from_counts(elements.get(b'vertex'), n_faces)
+
+
+def _read_vtk_header(f) -> _MeshHeader:
+    import re
+
+    lines = [f.readline() for _ in range(4)]
+    version = re.match(rb'# vtk DataFile Version (\d+)', lines[0])
+    if version is None:
+        return _unknown_header
+    if lines[3].split() != [b'DATASET', b'POLYDATA']:
+        return _unknown_header
+
+    if lines[2].strip().upper() == b'BINARY':
+        return _read_vtk_binary_body(f, int(version.group(1)))
+    return _read_vtk_ascii_body(f, int(version.group(1)))
+
+
+def _read_vtk_binary_body(f, version: int) -> _MeshHeader:
+    """Walk the sections of a binary legacy vtk file, seeking over data."""
+    dtype_sizes = {
+        b'float': 4, b'double': 8, b'int': 4, b'long': 8,
+        b'vtktypeint32': 4, b'vtktypeint64': 8, b'vtkidtype': 8,
+    }
+    n_vertices = None
+    n_faces = 0
+    n_values = {}
+
+    for line in iter(f.readline, b''):
+        tokens = line.split()
+        if not tokens:
+            continue
+        keyword = tokens[0]
+
+        if keyword == b'POINTS':
+            n_vertices = int(tokens[1])
+            if tokens[2].lower() not in dtype_sizes:
+                return _unknown_header
+            f.seek(3 * n_vertices * dtype_sizes[tokens[2].lower()], 1)
+
+        elif keyword in (b'VERTICES', b'LINES', b'POLYGONS', b'TRIANGLE_STRIPS'):
+            n_cells, size = int(tokens[1]), int(tokens[2])
+            if version >= 5:
+                # offsets (n_cells + 1 entries) and connectivity follow
+                # as separate arrays with their own type line
+                n_cells -= 1
+                n_values = {b'OFFSETS': n_cells + 1, b'CONNECTIVITY': size}
+            else:
+                f.seek(4 * size, 1)
+            if keyword in (b'POLYGONS', b'TRIANGLE_STRIPS'):
+                n_faces += n_cells
+
+        elif keyword in n_values:
+            if tokens[1].lower() not in dtype_sizes:
+                return _unknown_header
+            f.seek(n_values[keyword] * dtype_sizes[tokens[1].lower()], 1)
+
+        elif keyword in (b'POINT_DATA', b'CELL_DATA', b'FIELD'):
+            break
+
+    return _header_from_counts(n_vertices, n_faces)
+
+
+def _read_vtk_ascii_body(f, version: int) -> _MeshHeader:
+    import re
+
+    n_vertices = None
+    n_faces = 0
+    keywords = re.compile(
+        rb'^(POINTS|POLYGONS|TRIANGLE_STRIPS|POINT_DATA|CELL_DATA) (\d+)',
+        re.MULTILINE)
+
+    for chunk in _iter_line_chunks(f):
+        for keyword, count in keywords.findall(chunk):
+            if keyword == b'POINTS':
+                n_vertices = int(count)
+            elif keyword in (b'POLYGONS', b'TRIANGLE_STRIPS'):
+                # vtk >= 5 writes the number of offsets (cells + 1)
+                n_faces += int(count) - (version >= 5)
+            else:
+                return _header_from_counts(n_vertices, n_faces)
+
+    return _header_from_counts(n_vertices, n_faces)
+
+
+def _read_obj_header(f) -> _MeshHeader:
+    import re
+
+    face_line = re.compile(rb'^f\s', re.MULTILINE)
+    for chunk in _iter_line_chunks(f):
+        if face_line.search(chunk):
+            return _MeshHeader('surface', None, None)
+    return _MeshHeader('points', None, 0)
+
+
+def _read_off_header(f) -> _MeshHeader:
+    tokens = []
+    for line in f:
+        line = line.split(b'#', 1)[0]
+        tokens.extend(line.split())
+        if len(tokens) >= 3:
+            break
+    if not tokens or not tokens[0].endswith(b'OFF'):
+        return _unknown_header
+    # the polygons of OFF files are split into triangles when reading
+    return _MeshHeader(
+        'surface' if int(tokens[2]) else 'points', int(tokens[1]), None)
+
+
+def _read_stl_header(f) -> _MeshHeader:
+    import os
+
+    header = f.read(84)
+    if len(header) == 84:
+        n_faces = int.from_bytes(header[80:84], 'little')
+        if n_faces == 0:
+            return _unknown_header
+        if 84 + 50 * n_faces == os.fstat(f.fileno()).st_size:
+            return _MeshHeader('surface', None, n_faces)
+
+    # ascii stl files consist of facets only
+    return _MeshHeader('surface', None, None)
+
+
+def _iter_line_chunks(f):
+    """Iterate over a file in large chunks that end on a line break."""
+    remainder = b''
+    for chunk in iter(lambda: f.read(_chunk_size), b''):
+        chunk = remainder + chunk
+        cut = chunk.rfind(b'\n') + 1
+        remainder = chunk[cut:]
+        yield chunk[:cut]
+    yield remainder
+
+
+def _guess_layer_type(path) -> str:
+    """
+    Decide whether a file should be read as points or surface layer.
+
+    The file header is inspected first. Only if that is inconclusive, the
+    file is fully loaded with vedo.
+    """
+    import vedo
+
+    layer_type = _read_header(path).layer_type
+    if layer_type is not None:
+        return layer_type
+    if mesh_extension(path) == 'xml':
+        # other xml files than meshes are common, e.g. metadata
+        raise ValueError(f'{path} is not a VTK XML PolyData or Dolfin mesh')
+
+    thing = load_mesh_file(path)
+    if thing is None or thing.npoints == 0:
+        raise ValueError(f'{path} does not contain any points')
+    if type(thing) is vedo.Points:
+        return 'points'
+
+    # if it's a mesh with no edges, it's probably a points layer
+    if thing.ncells == 0:
+        return 'points'
+    return 'surface'
+
+
+_readers = {
+    'points': points_reader,
+    'surface': surfaces_reader,
+}
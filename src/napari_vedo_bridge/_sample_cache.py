@@ -0,0 +1,231 @@
+"""
+Local cache of the sample meshes.
+
+The sample meshes are downloaded from the vedo example data only once and
+kept in a local directory. Later loads read them from there and memory-map
+their parsed vertices and faces (see `_disk_cache.DiskCache`), so samples
+work without network access once the cache was seeded, e.g. with
+
+    napari-vedo-bridge fetch-samples
+
+Fetched files are checked against the SHA-256 checksums pinned in
+`sample_checksums`. Files without a pinned checksum are only recorded if
+they can be read as a non-empty mesh, and are then checked against the
+checksum recorded in a `manifest.json` when they were first fetched. Cached
+files are hashed again if their size or modification time changed.
+
+The cache is configured with the environment variables
+
+- `NAPARI_VEDO_BRIDGE_SAMPLE_DIR`: cache directory, by default
+  `~/.cache/napari-vedo-bridge/samples`.
+- `NAPARI_VEDO_BRIDGE_SAMPLE_MIRROR`: local directory or URL from which the
+  samples are fetched instead of `vedo.dataurl`.
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+import numpy as np
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+
+samples = {
+    'beethoven': 'beethoven.ply',
+    'apple': 'apple.ply',
+    'bunny': 'bunny.obj',
+    'cow': 'cow.vtk',
+    'panther': 'panther.stl',
+    'mouse_limb1': '250.vtk',
+    'mouse_limb2': '270.vtk',
+    'mouse_limb3': '290.vtk',
+}
+
+# SHA-256 checksums of the sample files, recorded from a trusted download of
+# `vedo.dataurl` (`napari-vedo-bridge fetch-samples` prints them). Samples
+# without an entry fall back to the checksum recorded on first fetch.
+sample_checksums: Dict[str, str] = {}
+
+_manifest_name = 'manifest.json'
+_lock = threading.Lock()
+
+
+def sample_directory() -> Path:
+    """Directory in which the sample files are cached."""
+    directory = os.environ.get('NAPARI_VEDO_BRIDGE_SAMPLE_DIR')
+    if directory:
+        return Path(directory)
+    return Path.home() / '.cache' / 'napari-vedo-bridge' / 'samples'
+
+
+def sample_mirror() -> str:
+    """Local directory or URL from which missing samples are fetched."""
+    import vedo
+
+    return os.environ.get('NAPARI_VEDO_BRIDGE_SAMPLE_MIRROR') or vedo.dataurl
+
+
+def fetch_sample(
+        filename: str,
+        mirror: Optional[str] = None,
+        directory: Optional[str] = None,
+        force: bool = False) -> Path:
+    """
+    Get the local path of a sample file, fetching it if it is not cached.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the file in the vedo example data, e.g. `'bunny.obj'`.
+    mirror : str, optional
+        Local directory or URL to fetch the file from. Defaults to
+        `sample_mirror()`.
+    directory : str, optional
+        Cache directory. Defaults to `sample_directory()`.
+    force : bool, optional
+        Fetch the file even if it is cached, by default False.
+
+    Raises
+    ------
+    OSError
+        If the file is not cached and cannot be fetched.
+    ValueError
+        If the fetched file does not match the pinned or recorded checksum.
+    """
+    directory = Path(directory) if directory else sample_directory()
+    path = directory / filename
+
+    with _lock:
+        manifest = _read_manifest(directory)
+        expected = sample_checksums.get(filename)
+        record = manifest.get(filename)
+        if not force and _is_valid(path, record, expected):
+            if _refresh(path, record):
+                _write_manifest(directory, manifest)
+            return path
+
+        source = mirror or sample_mirror()
+        directory.mkdir(parents=True, exist_ok=True)
+        # keep the extension, the file is read to check it
+        temporary = path.with_name(f'.{threading.get_ident()}.{filename}')
+        try:
+            _copy(source, filename, temporary)
+        except OSError as error:
+            temporary.unlink(missing_ok=True)
+            raise OSError(
+                f'Sample {filename} is not cached in {directory} and could '
+                f'not be fetched from {source}: {error}. Seed the cache with '
+                '"napari-vedo-bridge fetch-samples" on a machine with '
+                'access to the samples, or set '
+                'NAPARI_VEDO_BRIDGE_SAMPLE_MIRROR to a local copy.'
+            ) from error
+
+        checksum = _sha256(temporary)
+        if expected is None and record is not None:
+            expected = record['sha256']
+        if expected is not None and checksum != expected:
+            temporary.unlink()
+            raise ValueError(
+                f'Checksum of {filename} from {source} does not match the '
+                f'expected checksum {expected}')
+        if expected is None and not _is_mesh(temporary):
+            temporary.unlink()
+            raise ValueError(
+                f'{filename} from {source} is not a readable mesh and has no '
+                'pinned checksum, it is not cached')
+
+        os.replace(temporary, path)
+        stat = path.stat()
+        manifest[filename] = {
+            'sha256': checksum,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+        }
+        _write_manifest(directory, manifest)
+    return path
+
+
+def load_sample(filename: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Get the vertices and faces of a sample mesh.
+
+    The file is fetched if needed and its parsed arrays are memory-mapped
+    from the `arrays` subdirectory of the cache after the first load.
+    """
+    from ._disk_cache import DiskCache
+    from ._reader import _parse_surface_file
+
+    path = fetch_sample(filename)
+    arrays = DiskCache(path.parent / 'arrays')
+    vertices, faces, _ = arrays.load(str(path), _parse_surface_file)
+    return vertices, faces
+
+
+def _is_valid(
+        path: Path, record: Optional[dict], expected: Optional[str]) -> bool:
+    """Check a cached file against its manifest record and pinned checksum."""
+    if record is None or not path.exists():
+        return False
+    if expected is not None and record['sha256'] != expected:
+        return False
+    stat = path.stat()
+    if (stat.st_size, stat.st_mtime_ns) == (record['size'], record['mtime_ns']):
+        return True
+    return _sha256(path) == record['sha256']
+
+
+def _refresh(path: Path, record: dict) -> bool:
+    """Store the size and modification time of a file that was rehashed."""
+    stat = path.stat()
+    if (stat.st_size, stat.st_mtime_ns) == (record['size'], record['mtime_ns']):
+        return False
+    record['size'] = stat.st_size
+    record['mtime_ns'] = stat.st_mtime_ns
+    return True
+
+
+def _is_mesh(path: Path) -> bool:
+    """Check that a file without pinned checksum is a non-empty mesh."""
+    from ._formats import load_mesh_file
+
+    try:
+        mesh = load_mesh_file(str(path))
+    except (OSError, ValueError):
+        return False
+    return mesh is not None and mesh.ncells > 0
+
+
+def _copy(source: str, filename: str, destination: Path):
+    if '://' not in source:
+        shutil.copyfile(Path(source) / filename, destination)
+        return
+
+    from urllib.request import urlopen
+
+    url = source.rstrip('/') + '/' + filename
+    with urlopen(url, timeout=60) as response, open(destination, 'wb') as f:
+        shutil.copyfileobj(response, f)
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _read_manifest(directory: Path) -> Dict[str, dict]:
+    try:
+        with open(directory / _manifest_name) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(directory: Path, manifest: Dict[str, dict]):
+    temporary = directory / f'.{_manifest_name}'
+    with open(temporary, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(temporary, directory / _manifest_name)
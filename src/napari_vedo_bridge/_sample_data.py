@@ -1,8 +1,9 @@
 from typing import List
-import vedo
 import numpy as np
 from napari.utils import notifications
 
+from ._sample_cache import load_sample
+
 def beethoven() -> List["LayerData"]:
     """
     Load a mesh of Beethoven's head.
@@ -19,8 +20,8 @@ def beethoven() -> List["LayerData"]:
                 "https://vedo.embl.es/examples/data/LICENSE.txt"
     )
 
-    mesh = vedo.load(vedo.dataurl + "beethoven.ply")
-    return [((mesh.vertices * 10, np.asarray(mesh.cells, dtype=int)),
+    vertices, faces = load_sample("beethoven.ply")
+    return [((vertices * 10, np.asarray(faces, dtype=int)),
              {'name': 'Beethoven'},
              "surface")]
 
@@ -41,8 +42,8 @@ def apple() -> List["LayerData"]:
                 "https://vedo.embl.es/examples/data/LICENSE.txt"
     )
 
-    mesh = vedo.load(vedo.dataurl + "apple.ply")
-    return [((mesh.vertices * 10, np.asarray(mesh.cells, dtype=int)),
+    vertices, faces = load_sample("apple.ply")
+    return [((vertices * 10, np.asarray(faces, dtype=int)),
              {'name': 'Apple'},
              "surface")]
 
@@ -62,8 +63,8 @@ def bunny() -> List["LayerData"]:
                 "https://vedo.embl.es/examples/data/LICENSE.txt"
     )
 
-    mesh = vedo.load(vedo.dataurl + "bunny.obj")
-    return [((mesh.vertices * 10, np.asarray(mesh.cells, dtype=int)),
+    vertices, faces = load_sample("bunny.obj")
+    return [((vertices * 10, np.asarray(faces, dtype=int)),
              {'name': 'Bunny'},"surface")]
 
 
@@ -82,8 +83,8 @@ def cow() -> List["LayerData"]:
                 "https://vedo.embl.es/examples/data/LICENSE.txt"
     )
 
-    mesh = vedo.load(vedo.dataurl + "cow.vtk")
-    return [((mesh.vertices * 10, np.asarray(mesh.cells, dtype=int)),
+    vertices, faces = load_sample("cow.vtk")
+    return [((vertices * 10, np.asarray(faces, dtype=int)),
              {'name': 'Cow'},
              "surface")]
 
@@ -103,8 +104,8 @@ def panther() -> List["LayerData"]:
                 "https://vedo.embl.es/examples/data/LICENSE.txt"
     )
 
-    mesh = vedo.load(vedo.dataurl + "panther.stl")
-    return [((mesh.vertices * 10, np.asarray(mesh.cells, dtype=int)),
+    vertices, faces = load_sample("panther.stl")
+    return [((vertices * 10, np.asarray(faces, dtype=int)),
              {'name': 'Panther'},
              "surface")]
 
@@ -124,8 +125,8 @@ def mouse_limb1() -> List["LayerData"]:
                 "https://vedo.embl.es/examples/data/LICENSE.txt"
     )
 
-    mesh = vedo.load(vedo.dataurl + "250.vtk")
-    return [((mesh.vertices * 10, np.asarray(mesh.cells, dtype=int)),
+    vertices, faces = load_sample("250.vtk")
+    return [((vertices * 10, np.asarray(faces, dtype=int)),
              {'name': 'Mouse limb 250'},
              "surface")]
 
@@ -145,8 +146,8 @@ def mouse_limb2() -> List["LayerData"]:
                 "https://vedo.embl.es/examples/data/LICENSE.txt"
     )
 
-    mesh = vedo.load(vedo.dataurl + "270.vtk")
-    return [((mesh.vertices * 10, np.asarray(mesh.cells, dtype=int)),
+    vertices, faces = load_sample("270.vtk")
+    return [((vertices * 10, np.asarray(faces, dtype=int)),
              {'name': 'Mouse limb 270'},
              "surface")]
 
@@ -166,7 +167,7 @@ def mouse_limb3() -> List["LayerData"]:
                 "https://vedo.embl.es/examples/data/LICENSE.txt"
     )
 
-    mesh = vedo.load(vedo.dataurl + "290.vtk")
-    return [((mesh.vertices * 10, np.asarray(mesh.cells, dtype=int)),
+    vertices, faces = load_sample("290.vtk")
+    return [((vertices * 10, np.asarray(faces, dtype=int)),
              {'name': 'Mouse limb 3'},
              "surface")]
\ No newline at end of file
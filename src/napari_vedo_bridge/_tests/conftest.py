@@ -0,0 +1,31 @@
+import os
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _headless_vtk_widgets(monkeypatch):
+    """
+    Let VTK widgets render offscreen when there is no display.
+
+    Without a display VTK renders with EGL, and `QVTKRenderWindowInteractor`
+    hands the EGL window the id of an offscreen Qt window, which is not a
+    native window. Rendering translucent actors into it (e.g. the grid of
+    `vedo.Axes`) then aborts the interpreter at random.
+    """
+    if os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY'):
+        return
+
+    from vtkmodules.qt import QVTKRenderWindowInteractor
+    from vtkmodules.vtkRenderingCore import vtkRenderWindow
+
+    if vtkRenderWindow().GetClassName() != 'vtkEGLRenderWindow':
+        return
+
+    from vtkmodules.vtkRenderingOpenGL2 import vtkEGLRenderWindow
+
+    class _OffscreenRenderWindow(vtkEGLRenderWindow):
+        def SetWindowInfo(self, info):
+            pass
+
+    monkeypatch.setattr(
+        QVTKRenderWindowInteractor, 'vtkRenderWindow', _OffscreenRenderWindow)
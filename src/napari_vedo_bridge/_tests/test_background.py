@@ -0,0 +1,93 @@
+import pytest
+
+
+@pytest.fixture
+def sphere_surface():
+    import vedo
+    import numpy as np
+    from napari.layers import Surface
+
+    sphere = vedo.IcoSphere(subdivisions=4).clean()
+    return Surface(
+        (sphere.vertices, np.asarray(sphere.cells, dtype=int)), name='sphere')
+
+
+def test_task_progress():
+    import vedo
+    from napari_vedo_bridge._background import Task
+    from napari_vedo_bridge._mesh import _subdivide
+
+    task = Task()
+    with task.activate():
+        _subdivide(vedo.IcoSphere(subdivisions=3), n_iterations=1)
+
+    # the filters are observed only while they run
+    assert task.progress == 1.0
+    assert not task._filters
+
+
+def test_task_does_not_patch_vedo():
+    import vedo
+    from vedo import vtkclasses
+    from napari_vedo_bridge._background import Task
+
+    new = vtkclasses.new
+    with Task().activate():
+        vedo.IcoSphere(subdivisions=2).smooth()
+    assert vtkclasses.new is new
+
+
+def test_task_cancel(sphere_surface):
+    from napari_vedo_bridge._background import Cancelled, Task
+    from napari_vedo_bridge._cache import mesh_cache
+    from napari_vedo_bridge._mesh import _apply, _subdivide
+
+    mesh_cache.clear()
+    task = Task()
+    task.cancel()
+    with pytest.raises(Cancelled):
+        with task.activate():
+            _apply(sphere_surface, _subdivide, n_iterations=2)
+
+    # the aborted result is not cached
+    result = _apply(sphere_surface, _subdivide, n_iterations=2)
+    assert len(result[1]) == 16 * len(sphere_surface.data[1])
+
+
+def test_task_cancel_between_frames():
+    from napari_vedo_bridge._background import Cancelled, Task
+    from napari_vedo_bridge._mesh import _map_frames_parallel
+
+    task = Task()
+    processed = []
+
+    def _process(frame):
+        processed.append(frame)
+        if frame == 2:
+            task.cancel()
+        return frame
+
+    with pytest.raises(Cancelled):
+        with task.activate():
+            _map_frames_parallel(_process, list(range(10)), n_workers=1)
+    assert processed == [0, 1, 2]
+
+
+def test_background_runner(make_napari_viewer, qtbot, sphere_surface):
+    from napari_vedo_bridge._mesh import subdivide
+
+    viewer = make_napari_viewer()
+    viewer.add_layer(sphere_surface)
+    widget = subdivide()
+    viewer.window.add_dock_widget(widget)
+    widget.surface.value = sphere_surface
+
+    runner = widget._background_runner
+    widget.call_button.changed.emit(True)
+    assert runner.running
+    assert not runner.cancel_button.native.isHidden()
+
+    qtbot.waitUntil(lambda: not runner.running, timeout=10000)
+    assert len(viewer.layers) == 2
+    assert len(viewer.layers[-1].data[1]) == 4 * len(sphere_surface.data[1])
+    assert runner.progress_bar.native.isHidden()
@@ -0,0 +1,93 @@
+import pytest
+
+
+@pytest.fixture
+def sphere_surface():
+    import vedo
+    import numpy as np
+    from napari.layers import Surface
+
+    sphere = vedo.IcoSphere(subdivisions=3).clean()
+    return Surface((sphere.vertices, np.asarray(sphere.cells, dtype=int)))
+
+
+def test_fingerprint():
+    import numpy as np
+    from napari_vedo_bridge._cache import fingerprint
+
+    vertices = np.random.random((10, 3))
+    faces = np.array([[0, 1, 2], [1, 2, 3]])
+
+    assert fingerprint((vertices, faces)) == fingerprint(
+        (vertices.copy(), faces.copy()))
+    assert fingerprint((vertices, faces)) != fingerprint(
+        (vertices, faces[::-1]))
+    assert fingerprint(vertices) != fingerprint(vertices.astype(np.float32))
+
+
+def test_cache_lru_eviction():
+    import numpy as np
+    from napari_vedo_bridge._cache import MeshCache
+
+    cache = MeshCache(max_memory=2 * 800)
+    for i in range(3):
+        cache.get(i, lambda: np.zeros(100))
+
+    assert 0 not in cache
+    assert 1 in cache and 2 in cache
+    assert cache.cache_size == 1600
+
+    # the most recent entry is kept even if it is too large
+    cache.get('large', lambda: np.zeros(1000))
+    assert len(cache) == 1
+
+
+def test_cached_operation(sphere_surface):
+    import numpy as np
+    from napari_vedo_bridge import smooth
+    from napari_vedo_bridge._cache import mesh_cache
+
+    mesh_cache.clear()
+    smooth_widget = smooth()
+
+    result = smooth_widget(sphere_surface, n_iterations=10)
+    smooth_widget(sphere_surface, n_iterations=20)
+    hits = mesh_cache.hits
+
+    # reverting to the first parameters returns the cached result
+    reverted = smooth_widget(sphere_surface, n_iterations=10)
+    assert mesh_cache.hits == hits + 1
+    assert np.array_equal(reverted.data[0], result.data[0])
+
+    # layers created from the cache do not share memory with each other,
+    # with the cached entry or with the input layer
+    assert not np.shares_memory(reverted.data[0], result.data[0])
+    assert not np.shares_memory(result.data[0], sphere_surface.data[0])
+    result.data[0][:] = 0
+    again = smooth_widget(sphere_surface, n_iterations=10)
+    assert np.array_equal(again.data[0], reverted.data[0])
+
+    # a changed layer is not served from the cache
+    sphere_surface.data = (
+        sphere_surface.data[0] * 2, sphere_surface.data[1])
+    changed = smooth_widget(sphere_surface, n_iterations=10)
+    assert not np.allclose(changed.data[0], result.data[0])
+
+
+def test_converted_mesh_is_reused(sphere_surface):
+    import numpy as np
+    from napari_vedo_bridge import decimate_pro, smooth
+    from napari_vedo_bridge._cache import mesh_cache
+
+    mesh_cache.clear()
+    smooth()(sphere_surface)
+    hits = mesh_cache.hits
+    decimated = decimate_pro()(sphere_surface, fraction=0.5)
+
+    # the vedo mesh converted for smooth is reused by decimate_pro
+    assert mesh_cache.hits == hits + 1
+    assert len(decimated.data[1]) < len(sphere_surface.data[1])
+
+    # operations do not alter the cached mesh
+    mesh = mesh_cache.vedo_mesh(sphere_surface.data)
+    assert np.allclose(mesh.vertices, sphere_surface.data[0])
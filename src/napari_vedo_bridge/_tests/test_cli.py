@@ -0,0 +1,132 @@
+import pytest
+
+
+@pytest.fixture
+def mesh_directory(tmp_path):
+    import vedo
+
+    input_dir = tmp_path / 'input'
+    input_dir.mkdir()
+    for i in range(3):
+        sphere = vedo.IcoSphere(pos=(i, i, i), r=10, subdivisions=2).clean()
+        vedo.write(sphere, str(input_dir / f'sphere_{i}.vtp'))
+    return input_dir
+
+
+def test_parse_step():
+    from napari_vedo_bridge._cli import _parse_step
+
+    assert _parse_step('fill_holes') == ('fill_holes', {})
+    assert _parse_step('smooth:n_iterations=30,pass_band=0.2') == (
+        'smooth', {'n_iterations': 30, 'pass_band': 0.2})
+    assert _parse_step('decimate_binned:divisions=(10,10,10)') == (
+        'decimate_binned', {'divisions': (10, 10, 10)})
+
+
+def test_cli_process_directory(mesh_directory, tmp_path):
+    import vedo
+    from napari_vedo_bridge._cli import main
+
+    output_dir = tmp_path / 'output'
+    exit_code = main([
+        'process', str(mesh_directory), '-o', str(output_dir),
+        '--step', 'subdivide:n_iterations=1',
+        '--format', 'ply', '--workers', '2'])
+
+    assert exit_code == 0
+    outputs = sorted(output_dir.glob('*.ply'))
+    assert len(outputs) == 3
+
+    original = vedo.load(str(mesh_directory / 'sphere_0.vtp'))
+    processed = vedo.load(str(outputs[0]))
+    assert processed.ncells == 4 * original.ncells
+
+
+def test_cli_process_glob_with_pipeline(mesh_directory, tmp_path):
+    from napari_vedo_bridge._cli import main
+    from napari_vedo_bridge._pipeline import MeshPipeline
+
+    pipeline_file = str(tmp_path / 'pipeline.json')
+    MeshPipeline().add('smooth', n_iterations=5).save(pipeline_file)
+
+    output_dir = tmp_path / 'output'
+    exit_code = main([
+        'process', str(mesh_directory / 'sphere_[01].vtp'),
+        '-o', str(output_dir), '--pipeline', pipeline_file,
+        '--workers', '1'])
+
+    assert exit_code == 0
+    assert len(list(output_dir.glob('*.vtp'))) == 2
+
+
+def test_cli_invalid_step(mesh_directory, tmp_path):
+    from napari_vedo_bridge._cli import main
+
+    with pytest.raises(ValueError):
+        main(['process', str(mesh_directory), '-o', str(tmp_path),
+              '--step', 'not_an_operation'])
+
+
+def test_cli_output_paths(tmp_path):
+    import os
+    from napari_vedo_bridge._cli import _collisions, _output_paths
+
+    files = [
+        str(tmp_path / 'a' / 'mesh.vtp'),
+        str(tmp_path / 'b' / 'mesh.vtp'),
+        str(tmp_path / 'b' / 'other.vtp.gz'),
+    ]
+    output_paths = _output_paths(files, str(tmp_path / 'out'))
+    assert output_paths == [
+        str(tmp_path / 'out' / 'a' / 'mesh.vtp'),
+        str(tmp_path / 'out' / 'b' / 'mesh.vtp'),
+        str(tmp_path / 'out' / 'b' / 'other.vtp'),
+    ]
+    assert not _collisions(files, output_paths)
+
+    files = [str(tmp_path / 'mesh.vtp'), str(tmp_path / 'mesh.ply')]
+    output_paths = _output_paths(files, str(tmp_path / 'out'), 'vtp')
+    assert _collisions(files, output_paths) == {
+        os.path.normpath(str(tmp_path / 'out' / 'mesh.vtp')): files}
+
+
+def test_cli_process_compressed_and_nested(tmp_path):
+    import gzip
+    import vedo
+    from napari_vedo_bridge._cli import main
+
+    for directory in ('a', 'b'):
+        (tmp_path / 'input' / directory).mkdir(parents=True)
+        sphere = vedo.IcoSphere(r=10, subdivisions=2).clean()
+        sphere.pointdata['height'] = sphere.vertices[:, 2]
+        vedo.write(sphere, str(tmp_path / 'input' / directory / 'sphere.vtp'))
+    with open(tmp_path / 'input' / 'b' / 'sphere.vtp', 'rb') as f_in, \
+            gzip.open(tmp_path / 'input' / 'b' / 'other.vtp.gz', 'wb') as f_out:
+        f_out.write(f_in.read())
+
+    output_dir = tmp_path / 'output'
+    exit_code = main([
+        'process', str(tmp_path / 'input' / '*' / '*'),
+        '-o', str(output_dir), '--step', 'smooth', '--workers', '1'])
+
+    assert exit_code == 0
+    assert sorted(str(p.relative_to(output_dir))
+                  for p in output_dir.rglob('*.vtp')) == [
+        'a/sphere.vtp', 'b/other.vtp', 'b/sphere.vtp']
+
+    # point data is carried through and written as feature
+    processed = vedo.load(str(output_dir / 'b' / 'other.vtp'))
+    assert 'height' in processed.pointdata.keys()
+
+
+def test_cli_process_reports_write_failures(mesh_directory, tmp_path, capsys):
+    from napari_vedo_bridge._cli import main
+
+    # vedo only logs an error for formats it cannot write
+    exit_code = main([
+        'process', str(mesh_directory), '-o', str(tmp_path / 'output'),
+        '--format', 'unknown', '--workers', '1'])
+
+    assert exit_code == 1
+    assert 'Processed 0/3 files' in capsys.readouterr().out
+    assert not list((tmp_path / 'output').glob('*'))
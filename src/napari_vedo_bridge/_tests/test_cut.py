@@ -0,0 +1,128 @@
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def sphere():
+    import vedo
+    return vedo.IcoSphere(subdivisions=3).clean()
+
+
+@pytest.mark.parametrize('cutter', ['BoxCutter', 'PlaneCutter', 'SphereCutter'])
+def test_cut_from_cutter(sphere, cutter):
+    import vedo
+    from napari_vedo_bridge._cut import Cut
+
+    cutter = getattr(vedo, cutter)(sphere.clone())
+    if isinstance(cutter, vedo.BoxCutter):
+        cutter.set_bounds((-0.5, 1, -1, 1, -1, 1))
+    elif isinstance(cutter, vedo.PlaneCutter):
+        cutter.widget.SetNormal(1, 1, 0)
+        cutter.widget.SetOrigin(0.2, 0, 0)
+        cutter._select_polygons(cutter.widget, None)
+    else:
+        cutter.center = (0.5, 0, 0)
+        cutter.radius = 1.1
+        cutter._select_polygons(cutter.widget, None)
+    cutter.invert()
+
+    cut = Cut.from_cutter(cutter)
+    assert cut.inside_out == bool(cutter.clipper.GetInsideOut())
+
+    points = np.random.default_rng(0).uniform(-1, 1, (100, 3))
+    function = cutter.clipper.GetClipFunction()
+    expected = [function.EvaluateFunction(point) for point in points]
+    np.testing.assert_allclose(cut.evaluate(points), expected)
+    np.testing.assert_allclose(
+        [cut.implicit_function().EvaluateFunction(p) for p in points],
+        expected)
+
+    # same result as the cutter, but triangulated
+    cutter.clipper.Update()
+    expected = vedo.Mesh(cutter.clipper.GetOutput()).clean()
+    result = cut.clip(sphere.clone())
+    assert np.asarray(result.cells).shape[1] == 3
+    result.clean()
+    assert 0 < result.npoints == expected.npoints
+    np.testing.assert_allclose(
+        np.sort(result.vertices, axis=0), np.sort(expected.vertices, axis=0),
+        atol=1e-6)
+
+
+def test_cut_fast_paths(sphere):
+    import vedo
+    from napari_vedo_bridge._cut import Cut
+
+    inside = Cut('sphere', {'center': [0, 0, 0], 'radius': 2.0})
+    assert inside.clip(sphere) is sphere
+    assert inside._replace(inside_out=False).clip(sphere).npoints == 0
+
+    points = vedo.Points(sphere.vertices)
+    plane = Cut('plane', {'origin': [0, 0, 0], 'normal': [0, 0, 1]})
+    assert np.all(plane.clip(points).vertices[:, 2] <= 0)
+
+
+def test_cut_record_keeps_everything(sphere):
+    from napari.layers import Surface
+    from napari_vedo_bridge._cut import Cut, CutRecord
+
+    surface = Surface((sphere.vertices, np.asarray(sphere.cells, dtype=int)))
+    record = CutRecord([Cut('sphere', {'center': [0, 0, 0], 'radius': 2.0})])
+    (vertices, faces), _, _ = record(surface)[0]
+
+    np.testing.assert_array_equal(vertices, surface.vertices)
+    np.testing.assert_array_equal(faces, surface.faces)
+    assert not np.shares_memory(vertices, surface.vertices)
+    assert not np.shares_memory(faces, surface.faces)
+
+
+def test_cut_record_timelapse(sphere, tmp_path):
+    from napari.layers import Surface
+    from napari_vedo_bridge._cut import Cut, CutRecord
+
+    frames = [sphere.clone().shift(0, 0, t) for t in range(3)]
+    vertices = np.concatenate([
+        np.column_stack([np.full(f.npoints, t), f.vertices])
+        for t, f in enumerate(frames)])
+    faces = np.concatenate([
+        np.asarray(f.cells) + t * sphere.npoints for t, f in enumerate(frames)])
+    surface = Surface((vertices, faces), name='cells')
+
+    record = CutRecord([
+        Cut('plane', {'origin': [0, 0, 1.5], 'normal': [0, 0, 1]}),
+        Cut('box', {
+            'origins': [[1, 0, 0], [-1, 0, 0], [0, 1, 0],
+                        [0, -1, 0], [0, 0, 10], [0, 0, -10]],
+            'normals': [[1, 0, 0], [-1, 0, 0], [0, 1, 0],
+                        [0, -1, 0], [0, 0, 1], [0, 0, -1]]}),
+    ])
+    record.save(tmp_path / 'cuts.json')
+    record = CutRecord.load(tmp_path / 'cuts.json')
+    assert len(record) == 2
+
+    data, attributes, layer_type = record(surface, n_workers=2)[0]
+    assert layer_type == 'surface' and attributes['name'] == 'cells (cut)'
+    vertices, faces = data
+    assert vertices.shape[1] == 4 and faces.shape[1] == 3
+    assert np.all(vertices[:, 3] <= 1.5 + 1e-5)
+    # the first frame is not cut, the last one partly
+    assert np.sum(vertices[:, 0] == 0) == sphere.npoints
+    assert 0 < np.sum(vertices[:, 0] == 2) < sphere.npoints
+
+
+def test_cli_process_cut(tmp_path, sphere):
+    import vedo
+    from napari_vedo_bridge._cli import main
+    from napari_vedo_bridge._cut import Cut, CutRecord
+
+    input_dir = tmp_path / 'input'
+    input_dir.mkdir()
+    for i in range(2):
+        vedo.write(sphere, str(input_dir / f'sphere_{i}.vtp'))
+    CutRecord([Cut('plane', {'origin': [0, 0, 0], 'normal': [0, 0, 1]})]).save(
+        tmp_path / 'cuts.json')
+
+    assert main(['process', str(input_dir), '-o', str(tmp_path / 'output'),
+                 '--cut', str(tmp_path / 'cuts.json'), '--workers', '1']) == 0
+    result = vedo.load(str(tmp_path / 'output' / 'sphere_0.vtp'))
+    assert result.vertices[:, 2].max() <= 1e-5
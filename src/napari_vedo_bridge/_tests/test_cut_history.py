@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def history():
+    import vedo
+    from napari_vedo_bridge._cut_history import CutHistory
+
+    sphere = vedo.IcoSphere(subdivisions=4).clean()
+    return CutHistory(sphere.vertices, np.asarray(sphere.cells))
+
+
+def test_cut_history_undo_redo(history):
+    from napari_vedo_bridge._cut import Cut
+
+    n_faces = len(history.faces)
+    assert history.mask().all() and not history.can_undo
+
+    upper = Cut('plane', {'origin': [0, 0, 0], 'normal': [0, 0, -1]})
+    right = Cut('plane', {'origin': [0, 0, 0], 'normal': [-1, 0, 0]})
+    first = history.cut(upper)
+    second = history.cut(right)
+    assert second.sum() < first.sum() < n_faces
+    assert not (second & ~first).any()
+
+    # the remaining faces lie on the kept side of both cuts
+    vertices, faces = history.surface_data()
+    assert np.all(vertices[faces][..., 2] >= -1e-6)
+    assert np.all(vertices[faces][..., 0] >= -1e-6)
+    # only the referenced vertices are kept
+    assert np.array_equal(np.unique(faces), np.arange(len(vertices)))
+
+    assert np.array_equal(history.undo(), first)
+    assert np.array_equal(history.undo(), np.ones(n_faces, dtype=bool))
+    assert not history.can_undo
+    assert np.array_equal(history.redo(), first)
+
+    # a new cut discards the redo states
+    history.cut(right)
+    assert not history.can_redo and len(history) == 3
+
+    # one bit per face and state
+    assert history.nbytes == 3 * int(np.ceil(n_faces / 8))
+
+
+def _sorted_triangles(vertices, faces):
+    """Triangles as sorted vertex coordinates, independent of the order."""
+    triangles = np.round(vertices[faces], 5).tolist()
+    return np.array(sorted(sorted(map(tuple, t)) for t in triangles))
+
+
+def test_cut_history_redo_reproduces_clip(history):
+    from napari_vedo_bridge._cut import Cut, CutRecord
+    from napari_vedo_bridge.utils import surface_data_to_vedo_mesh
+
+    record = CutRecord([
+        Cut('plane', {'origin': [0, 0, 0.3], 'normal': [0, 0, -1]}),
+        Cut('sphere', {'center': [0, 0, 1], 'radius': 0.8}, False),
+    ])
+    clipped = record.run(
+        surface_data_to_vedo_mesh((history.vertices, history.faces)))
+
+    for cut in record.cuts:
+        history.cut(cut)
+    history.undo()
+    history.undo()
+    history.redo()
+    history.redo()
+
+    vertices, faces = history.surface_data()
+    assert len(faces) == clipped.ncells
+    np.testing.assert_allclose(
+        _sorted_triangles(vertices, faces),
+        _sorted_triangles(clipped.vertices, np.asarray(clipped.cells)),
+        atol=1e-5)
+
+
+def test_cut_history_adjusted_cutter(history):
+    from napari_vedo_bridge._cut import Cut
+
+    base = history.state()
+    small = Cut('sphere', {'center': [0, 0, 1], 'radius': 0.5}, False)
+    large = Cut('sphere', {'center': [0, 0, 1], 'radius': 1.0}, False)
+
+    # adjusting a cutter cuts the state it was created on again, so making
+    # the sphere smaller brings faces back
+    removed_large = (~history.cut(large, base=base)).sum()
+    removed_small = (~history.cut(small, base=base)).sum()
+    assert 0 < removed_small < removed_large
+
+
+def test_cut_history_max_states(history):
+    from napari_vedo_bridge._cut import Cut
+
+    history.max_states = 3
+    for z in np.linspace(0.9, 0, 5):
+        history.cut(Cut('plane', {'origin': [0, 0, z], 'normal': [0, 0, 1]}))
+    assert len(history) == 3 and history.index == 2
@@ -0,0 +1,83 @@
+import os
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def surface_file(tmp_path):
+    import vedo
+
+    sphere = vedo.IcoSphere(subdivisions=3).clean()
+    sphere.pointdata['value'] = np.arange(sphere.npoints, dtype=float)
+    path = str(tmp_path / 'sphere.vtp')
+    vedo.write(sphere, path)
+    return path
+
+
+@pytest.fixture
+def disk_cache(tmp_path):
+    from napari_vedo_bridge._disk_cache import configure_disk_cache
+
+    yield configure_disk_cache(str(tmp_path / 'cache'))
+    configure_disk_cache(None)
+
+
+def test_disk_cache_reopen(surface_file, disk_cache):
+    from napari_vedo_bridge._reader import _load_surface_data, surfaces_reader
+
+    vertices, faces, pointdata = _load_surface_data(surface_file)
+    assert disk_cache.size > 0
+
+    cached = _load_surface_data(surface_file)
+    assert isinstance(cached[0], np.memmap)
+    assert isinstance(cached[1], np.memmap)
+    np.testing.assert_array_equal(cached[0], vertices)
+    np.testing.assert_array_equal(cached[1], faces)
+    np.testing.assert_array_equal(cached[2]['value'], pointdata['value'])
+
+    data, attributes, _ = surfaces_reader(surface_file)[0]
+    assert len(data[1]) == len(faces)
+    assert 'value' in attributes['features'].columns
+
+
+def test_disk_cache_invalidation(surface_file, disk_cache):
+    import os
+    import vedo
+    from napari_vedo_bridge._reader import _load_surface_data
+
+    _load_surface_data(surface_file)
+    vedo.write(vedo.IcoSphere(subdivisions=2).clean(), surface_file)
+    os.utime(surface_file, ns=(0, 0))
+
+    vertices, faces, _ = _load_surface_data(surface_file)
+    assert not isinstance(faces, np.memmap)
+    assert len(faces) == 320
+    assert len(disk_cache._entries()) == 2
+
+
+def test_disk_cache_eviction(tmp_path, disk_cache):
+    import vedo
+
+    paths = []
+    for i in range(3):
+        path = str(tmp_path / f'sphere_{i}.vtp')
+        vedo.write(vedo.IcoSphere(subdivisions=3).clean(), path)
+        paths.append(path)
+
+    disk_cache.load(paths[0], _parse)
+    entry_size = disk_cache.size
+    disk_cache.max_size = 2 * entry_size
+
+    disk_cache.load(paths[1], _parse)
+    os.utime(disk_cache.directory / disk_cache.key(paths[0]))  # make it recent
+    disk_cache.load(paths[2], _parse)
+
+    cached = {entry.name for entry in disk_cache._entries()}
+    assert disk_cache.key(paths[0]) in cached
+    assert disk_cache.key(paths[1]) not in cached
+    assert disk_cache.key(paths[2]) in cached
+
+
+def _parse(path):
+    from napari_vedo_bridge._reader import _parse_surface_file
+    return _parse_surface_file(path)
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def test_split_and_join_vector_features():
+    from napari_vedo_bridge._features import (
+        join_vector_features,
+        split_vector_features,
+    )
+
+    normals = np.random.rand(10, 3)
+    pointdata = {'value': np.arange(10), 'normals': normals}
+
+    columns = split_vector_features(pointdata)
+    assert list(columns) == ['value', 'normals[0]', 'normals[1]', 'normals[2]']
+
+    joined = join_vector_features(pd.DataFrame(columns))
+    assert np.array_equal(joined['value'], pointdata['value'])
+    assert np.array_equal(joined['normals'], normals)
+    assert joined['normals'].flags['C_CONTIGUOUS']
+
+
+def test_join_incomplete_vector_features():
+    from napari_vedo_bridge._features import join_vector_features
+
+    features = pd.DataFrame({'a[1]': np.arange(5), 'b': np.arange(5)})
+    assert set(join_vector_features(features)) == {'a[1]', 'b'}
+
+
+def test_stack_frames():
+    from napari_vedo_bridge._features import stack_frames
+
+    frames = [
+        (np.random.rand(4, 3), np.array([[0, 1, 2], [1, 2, 3]]),
+         {'value': np.arange(4), 'color': np.ones((4, 3))}),
+        (np.random.rand(5, 3), np.array([[0, 1, 4]]),
+         {'value': np.arange(5)}),
+    ]
+    vertices, faces, features = stack_frames(frames)
+
+    assert np.array_equal(vertices[:, 0], [0] * 4 + [1] * 5)
+    assert np.array_equal(vertices[4:, 1:], frames[1][0])
+    assert np.array_equal(faces, [[0, 1, 2], [1, 2, 3], [4, 5, 8]])
+    assert list(features.columns) == [
+        'value', 'color[0]', 'color[1]', 'color[2]']
+    assert np.array_equal(features['value'], [0, 1, 2, 3, 0, 1, 2, 3, 4])
+    assert np.isnan(features['color[0]'][4:]).all()
+
+
+def test_frame_stack_widens_dtype():
+    from napari_vedo_bridge._features import FrameStack
+
+    # preallocated from the first frame, a later frame is wider
+    frames = [
+        (np.ones((2, 3), dtype=np.float32), None,
+         {'value': np.arange(2, dtype=np.int32)}),
+        (np.full((2, 3), 1 + 1e-12), None,
+         {'value': np.array([0.5, 1.5])}),
+    ]
+    stack = FrameStack([2, 2], dtype=np.float32)
+    for t, frame in enumerate(frames):
+        stack.add(t, frame)
+    vertices, _, features = stack.result()
+
+    assert vertices.dtype == np.float64
+    assert np.array_equal(vertices[2:, 1:], frames[1][0])
+    assert np.array_equal(features['value'], [0, 1, 0.5, 1.5])
+
+
+@pytest.mark.parametrize("file_format", ['vtp', 'vtkhdf'])
+def test_vector_features_roundtrip(file_format, tmp_path):
+    import vedo
+    from napari_vedo_bridge._reader import points_reader
+    from napari_vedo_bridge._writer import write_points
+
+    frames = [vedo.Sphere(pos=(t, t, t), r=10).clean().vertices
+              for t in range(3)]
+    points = np.concatenate([
+        np.insert(frame, 0, t, axis=1) for t, frame in enumerate(frames)])
+    features = pd.DataFrame({
+        'value': np.random.rand(len(points)),
+        'normals[0]': np.random.rand(len(points)),
+        'normals[1]': np.random.rand(len(points)),
+        'normals[2]': np.random.rand(len(points)),
+    })
+
+    output = write_points(
+        str(tmp_path / f'points.{file_format}'), points,
+        {'features': features})
+    pointdata = vedo.load(output[0]).pointdata if file_format == 'vtp' \
+        else None
+    if pointdata is not None:
+        assert pointdata['normals'].shape == (len(frames[0]), 3)
+
+    source = output[0] if file_format == 'vtkhdf' else str(tmp_path / 'points')
+    data, properties, _ = points_reader(source)[0]
+    assert np.allclose(data, points)
+    pd.testing.assert_frame_equal(
+        properties['features'], features,
+        check_dtype=False, check_like=True)
+    assert properties['face_color'] == 'value'
@@ -0,0 +1,135 @@
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def surface_layer():
+    import vedo
+    from napari.layers import Surface
+
+    sphere = vedo.IcoSphere(subdivisions=2).clean()
+    return Surface((sphere.vertices.astype(float), np.asarray(sphere.cells)))
+
+
+def test_changed_ranges():
+    from napari_vedo_bridge._widgets.layer_link import changed_ranges
+
+    old = np.zeros((10, 3))
+    new = old.copy()
+    new[[0, 1, 2, 5, 9], 1] = 1
+    assert changed_ranges(old, new).tolist() == [[0, 3], [5, 6], [9, 10]]
+    assert changed_ranges(old, old).shape == (0, 2)
+
+
+def test_layer_link_shares_vertices(surface_layer):
+    from napari_vedo_bridge._widgets.layer_link import LayerLink
+
+    link = LayerLink(surface_layer)
+    assert np.shares_memory(link.mesh.vertices, surface_layer.vertices)
+
+    # vedo -> napari, only the changed rows are copied
+    vertices = link.mesh.vertices.copy()
+    vertices[5:9] += 1
+    link.mesh.vertices = vertices
+    assert link.push_from_vedo().tolist() == [[5, 9]]
+    np.testing.assert_allclose(surface_layer.vertices, vertices)
+    assert np.shares_memory(link.mesh.vertices, surface_layer.vertices)
+
+    # napari -> vedo through the data event of the layer
+    vertices = surface_layer.vertices * 2
+    surface_layer.vertices = vertices
+    np.testing.assert_allclose(link.mesh.vertices, vertices)
+    assert surface_layer.vertices is link.vertices
+
+
+def test_layer_link_keeps_layer_data(surface_layer):
+    from napari.layers import Surface
+    from napari_vedo_bridge._widgets.layer_link import LayerLink
+
+    # float64 vertices are shared as they are
+    vertices, faces = surface_layer.vertices, surface_layer.faces
+    link = LayerLink(surface_layer)
+    assert surface_layer.vertices is vertices
+    assert surface_layer.faces is faces
+    assert link.mesh.vertices.dtype == np.float64
+    assert np.shares_memory(link.mesh.vertices, vertices)
+
+    # other vertices are not replaced by a converted copy
+    layer = Surface((np.round(vertices * 10).astype(int), faces))
+    int_vertices = layer.vertices
+    link = LayerLink(layer)
+    assert layer.vertices is int_vertices
+    np.testing.assert_allclose(link.mesh.vertices, int_vertices)
+
+    layer.vertices = int_vertices + 1
+    np.testing.assert_allclose(link.mesh.vertices, int_vertices + 1)
+    assert layer.vertices.dtype == int
+
+
+def test_layer_link_read_only_vertices(surface_layer, tmp_path):
+    from napari.layers import Surface
+    from napari_vedo_bridge._widgets.layer_link import LayerLink
+
+    # e.g. the memory-mapped arrays of the disk cache
+    path = tmp_path / 'vertices.npy'
+    np.save(path, surface_layer.vertices)
+    vertices = np.load(path, mmap_mode='r')
+    layer = Surface((vertices, surface_layer.faces))
+
+    link = LayerLink(layer)
+    assert layer.vertices is vertices
+    assert not np.shares_memory(link.vertices, vertices)
+
+    moved = link.mesh.vertices + 1
+    link.mesh.vertices = moved
+    link.push_from_vedo()
+    np.testing.assert_allclose(layer.vertices, moved)
+    np.testing.assert_array_equal(np.load(path), surface_layer.vertices)
+
+
+def test_layer_link_topology_change(surface_layer):
+    from napari_vedo_bridge._widgets.layer_link import LayerLink
+
+    link = LayerLink(surface_layer)
+    link.mesh.cut_with_plane(origin=(0, 0, 0.2), normal=(0, 0, 1))
+    link.push_from_vedo()
+
+    assert len(surface_layer.vertices) == link.mesh.npoints
+    assert len(surface_layer.faces) == link.mesh.ncells
+    assert len(surface_layer.vertex_values) == link.mesh.npoints
+    assert np.shares_memory(link.mesh.vertices, surface_layer.vertices)
+
+    link.disconnect()
+    surface_layer.vertices = surface_layer.vertices + 1
+    assert not np.allclose(link.mesh.vertices, surface_layer.vertices)
+
+
+def test_widget_linked_mode(make_napari_viewer, surface_layer, monkeypatch):
+    import sys
+    from napari_vedo_bridge._widgets import VedoWidget
+
+    monkeypatch.setattr(sys, 'stdout', sys.stdout)
+    viewer = make_napari_viewer()
+    viewer.add_layer(surface_layer)
+    widget = VedoWidget(viewer)
+    widget.checkBox_link.setChecked(True)
+
+    widget.pushButton_get_from_napari.click()
+    mesh = widget.mesh
+    widget.pushButton_get_from_napari.click()
+    assert widget.mesh is mesh
+
+    # sending updates the linked layer instead of adding a new one
+    n_layers = len(viewer.layers)
+    mesh.vertices = mesh.vertices + 1
+    widget.pushButton_send_back.click()
+    assert len(viewer.layers) == n_layers
+    np.testing.assert_allclose(surface_layer.vertices, mesh.vertices)
+
+    widget.checkBox_link.setChecked(False)
+    assert widget.link is None
+    widget.pushButton_send_back.click()
+    assert len(viewer.layers) == n_layers + 1
+
+    widget.plt.close()
+    widget.vtk_widget.Finalize()
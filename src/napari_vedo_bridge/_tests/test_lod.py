@@ -0,0 +1,57 @@
+import pytest
+
+
+@pytest.fixture
+def plotter(qtbot):
+    import vedo
+    from vtkmodules.qt.QVTKRenderWindowInteractor import (
+        QVTKRenderWindowInteractor)
+
+    widget = QVTKRenderWindowInteractor()
+    qtbot.addWidget(widget)
+    plotter = vedo.Plotter(qt_widget=widget, interactive=False)
+    yield plotter
+    plotter.close()
+    widget.Finalize()
+
+
+def test_level_of_detail(plotter):
+    import vedo
+    from vtkmodules.vtkCommonCore import vtkCommand
+    from napari_vedo_bridge._lod import LevelOfDetail
+
+    mesh = vedo.IcoSphere(subdivisions=5).clean()
+    plotter.add(mesh)
+    lod = LevelOfDetail(plotter, mesh, max_faces=2000)
+    assert lod.enabled and lod.proxy is None
+
+    plotter.interactor.InvokeEvent(vtkCommand.StartInteractionEvent)
+    assert lod.proxy.ncells < mesh.ncells
+    assert lod.proxy.actor.GetVisibility() and not mesh.actor.GetVisibility()
+
+    plotter.interactor.InvokeEvent(vtkCommand.EndInteractionEvent)
+    assert mesh.actor.GetVisibility() and not lod.proxy.actor.GetVisibility()
+
+    # the proxy is only decimated again after the mesh was modified
+    proxy_dataset = lod.proxy.dataset
+    assert lod.update_proxy().dataset is proxy_dataset
+    mesh.cut_with_plane(origin=(0, 0, 0.5), normal=(0, 0, 1))
+    assert lod.update_proxy().dataset is not proxy_dataset
+
+    lod.remove()
+    plotter.interactor.InvokeEvent(vtkCommand.StartInteractionEvent)
+    assert mesh.actor.GetVisibility() and lod.proxy is None
+
+
+def test_level_of_detail_small_mesh(plotter):
+    import vedo
+    from vtkmodules.vtkCommonCore import vtkCommand
+    from napari_vedo_bridge._lod import LevelOfDetail
+
+    mesh = vedo.IcoSphere(subdivisions=2)
+    plotter.add(mesh)
+    lod = LevelOfDetail(plotter, mesh)
+
+    plotter.interactor.InvokeEvent(vtkCommand.StartInteractionEvent)
+    assert not lod.enabled and lod.proxy is None
+    assert mesh.actor.GetVisibility()
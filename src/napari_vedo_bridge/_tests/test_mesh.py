@@ -19,7 +19,7 @@ from napari.layers import Surface
 
 @pytest.fixture
 def sample_surface():
-    mesh = vedo.load(vedo.dataurl + 'bunny.obj')
+    mesh = vedo.IcoSphere(r=10, subdivisions=4).clean()
     surface = Surface((mesh.vertices, np.asarray(mesh.cells, dtype=int)))
     return surface
 
@@ -96,3 +96,51 @@ def test_binarize(sample_surface):
     binarized_surface = binarize()(surface=sample_surface)
     assert binarized_surface.data[0].shape[0] > 0
     assert binarized_surface.data[1].shape[0] > 0
+
+
+@pytest.fixture
+def sample_surface_4d():
+    from napari_timelapse_processor import TimelapseConverter
+
+    spheres = [
+        vedo.IcoSphere(pos=(i, i, i), r=10, subdivisions=3).clean()
+        for i in range(5)
+        ]
+    data = TimelapseConverter().stack_data(
+        [(s.vertices, np.asarray(s.cells, dtype=int)) for s in spheres],
+        layertype='napari.types.SurfaceData'
+        )
+    return Surface(data)
+
+
+def test_smooth_4d(sample_surface_4d):
+    smoothed_surface = smooth()(surface=sample_surface_4d)
+    assert smoothed_surface.data[0].shape == sample_surface_4d.data[0].shape
+    assert np.array_equal(
+        smoothed_surface.data[0][:, 0], sample_surface_4d.data[0][:, 0])
+    assert np.array_equal(
+        smoothed_surface.data[1], sample_surface_4d.data[1])
+
+
+def test_decimate_4d(sample_surface_4d):
+    decimated_surface = decimate()(surface=sample_surface_4d, fraction=0.5)
+    assert decimated_surface.data[0].shape[1] == 4
+    assert len(np.unique(decimated_surface.data[0][:, 0])) == 5
+    assert decimated_surface.data[1].shape[0] < sample_surface_4d.data[1].shape[0]
+
+
+def test_compute_normals_4d(sample_surface_4d):
+    normals = compute_normals()(surface=sample_surface_4d)
+    assert normals.data.shape == (sample_surface_4d.data[0].shape[0], 2, 4)
+
+
+def test_split_4d(sample_surface_4d):
+    split_surfaces = split()(surface=sample_surface_4d)
+    assert len(split_surfaces) == 1
+    assert split_surfaces[0][0][0].shape == sample_surface_4d.data[0].shape
+
+
+def test_binarize_4d(sample_surface_4d):
+    binarized = binarize()(surface=sample_surface_4d)
+    assert binarized.data.ndim == 4
+    assert binarized.data.shape[0] == 5
@@ -0,0 +1,87 @@
+import pytest
+import tempfile
+import vedo
+import numpy as np
+from napari.layers import Surface
+from napari_vedo_bridge._pipeline import MeshPipeline, MeshPipelineWidget
+
+
+@pytest.fixture
+def sample_surface():
+    mesh = vedo.IcoSphere(subdivisions=3).clean()
+    return Surface((mesh.vertices, np.asarray(mesh.cells, dtype=int)))
+
+
+@pytest.fixture
+def sample_surface_4d():
+    from napari_timelapse_processor import TimelapseConverter
+
+    spheres = [
+        vedo.IcoSphere(pos=(i, i, i), subdivisions=3).clean()
+        for i in range(3)
+        ]
+    data = TimelapseConverter().stack_data(
+        [(s.vertices, np.asarray(s.cells, dtype=int)) for s in spheres],
+        layertype='napari.types.SurfaceData'
+        )
+    return Surface(data)
+
+
+def test_pipeline(sample_surface):
+    pipeline = MeshPipeline()
+    pipeline.add('fill_holes').add('smooth', n_iterations=10)
+    pipeline.add('decimate_pro', fraction=0.5)
+    pipeline.add('compute_normals')
+
+    layers = pipeline(sample_surface)
+    assert len(layers) == 2
+    assert layers[0][2] == 'surface'
+    assert layers[1][2] == 'vectors'
+    assert len(layers[0][0][1]) < len(sample_surface.data[1])
+
+
+def test_pipeline_4d(sample_surface_4d):
+    pipeline = MeshPipeline([('smooth', {}), ('decimate', {'fraction': 0.5})])
+
+    layers = pipeline(sample_surface_4d)
+    assert len(layers) == 1
+    assert layers[0][0][0].shape[1] == 4
+    assert len(np.unique(layers[0][0][0][:, 0])) == 3
+
+
+def test_pipeline_save_load():
+    from pathlib import Path
+
+    pipeline = MeshPipeline().add('smooth', n_iterations=5).add('shrink')
+    with tempfile.TemporaryDirectory() as tmpdir:
+        pipeline.save(Path(tmpdir) / 'pipeline.json')
+        loaded = MeshPipeline.load(Path(tmpdir) / 'pipeline.json')
+
+    assert loaded.steps == pipeline.steps
+
+
+def test_pipeline_invalid_steps():
+    with pytest.raises(ValueError):
+        MeshPipeline().add('not_an_operation')
+    with pytest.raises(TypeError):
+        MeshPipeline().add('smooth', not_a_parameter=1)
+
+
+def test_pipeline_widget(make_napari_viewer, qtbot, sample_surface):
+    viewer = make_napari_viewer()
+    viewer.add_layer(sample_surface)
+
+    widget = MeshPipelineWidget(viewer)
+    viewer.window.add_dock_widget(widget)
+
+    widget._operation.value = 'smooth'
+    widget._add_step.clicked.emit()
+    widget._operation.value = 'decimate'
+    widget._add_step.clicked.emit()
+    assert len(widget.pipeline) == 2
+
+    # the pipeline runs in a background worker
+    widget._run.clicked.emit()
+    assert widget._runner.running
+    qtbot.waitUntil(lambda: not widget._runner.running, timeout=10000)
+    assert len(viewer.layers) == 2
@@ -23,3 +23,22 @@ def test_remove_outliers(sample_points):
 
     filtered_points = remove_outliers()(sample_points, radius=2.5, n_neighbors=1)
     assert filtered_points.data.shape[0] == sample_points.data.shape[0] - 1
+
+
+def test_smooth_mls_progress_and_cancel():
+    import vedo
+    from napari_vedo_bridge._background import Cancelled, Task
+    from napari_vedo_bridge._points import _smooth_mls_1d, _smooth_mls_2d
+
+    cloud = np.random.randn(300, 3)
+    for smooth in (_smooth_mls_1d, _smooth_mls_2d):
+        task = Task()
+        with task.activate():
+            smooth(vedo.Points(cloud), factor=0.5)
+        assert task.progress == 1.0
+
+        task.cancel()
+        points = vedo.Points(cloud)
+        with task.activate(), pytest.raises(Cancelled):
+            smooth(points, factor=0.5)
+        np.testing.assert_allclose(points.vertices, cloud, rtol=1e-6)
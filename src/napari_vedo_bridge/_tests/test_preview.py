@@ -0,0 +1,110 @@
+import pytest
+
+
+@pytest.fixture
+def large_sphere():
+    import vedo
+    import numpy as np
+
+    sphere = vedo.IcoSphere(subdivisions=6).clean()
+    return (sphere.vertices, np.asarray(sphere.cells, dtype=int))
+
+
+def test_make_proxy(large_sphere):
+    from napari_vedo_bridge._preview import make_proxy
+
+    proxy = make_proxy(large_sphere, max_faces=5000)
+    assert len(proxy[1]) < len(large_sphere[1])
+    assert len(proxy[1]) < 2 * 5000
+
+    # small surfaces are not decimated
+    small = make_proxy(proxy, max_faces=len(proxy[1]))
+    assert small[0] is proxy[0]
+
+
+def test_compute_preview(large_sphere):
+    from napari_vedo_bridge._mesh import _decimate
+    from napari_vedo_bridge._preview import compute_preview
+
+    preview = compute_preview(
+        large_sphere, _decimate, {'fraction': 0.5, 'n_vertices': 10000},
+        max_faces=5000)
+    assert len(preview[0]) < 10000
+
+
+def test_compute_preview_key(large_sphere):
+    from napari_vedo_bridge._cache import mesh_cache
+    from napari_vedo_bridge._mesh import _smooth
+    from napari_vedo_bridge._preview import compute_preview
+
+    mesh_cache.clear()
+    compute_preview(
+        large_sphere, _smooth, {'n_iterations': 5}, max_faces=5000,
+        key='sphere')
+    assert ('proxy', 'sphere', None, 5000) in mesh_cache
+
+    # the proxy is looked up by key, the data is not hashed again
+    misses = mesh_cache.misses
+    compute_preview(
+        large_sphere, _smooth, {'n_iterations': 10}, max_faces=5000,
+        key='sphere')
+    assert mesh_cache.misses == misses + 1
+
+
+def test_preview_time_axis(large_sphere):
+    import numpy as np
+    from napari.components import ViewerModel
+    from napari_vedo_bridge._preview import _frame_data
+    from napari_vedo_bridge._timelapse import current_time_step
+
+    vertices, faces = large_sphere
+    vertices_4d = np.concatenate([
+        np.column_stack([np.full(len(vertices), t), vertices * (t + 1)])
+        for t in range(3)])
+    faces_4d = np.concatenate([faces + t * len(vertices) for t in range(3)])
+
+    viewer = ViewerModel()
+    # an image with an extra leading dimension
+    viewer.add_image(np.zeros((2, 3, 4, 4, 4)))
+    surface = viewer.add_surface((vertices_4d, faces_4d))
+    viewer.dims.set_current_step(1, 2)
+
+    t = current_time_step(viewer)
+    assert t == 2
+    frame_vertices, frame_faces = _frame_data(surface.data, t)
+    assert np.allclose(frame_vertices, vertices * 3)
+    assert np.array_equal(frame_faces, faces)
+
+
+def test_live_preview(make_napari_viewer, qtbot, large_sphere):
+    from napari_vedo_bridge._mesh import smooth
+
+    viewer = make_napari_viewer()
+    surface = viewer.add_surface(large_sphere, name='sphere')
+    widget = smooth()
+    viewer.window.add_dock_widget(widget)
+    widget.surface.value = surface
+
+    widget.live_preview.value = True
+    qtbot.waitUntil(lambda: len(viewer.layers) == 2, timeout=10000)
+    preview = viewer.layers['sphere (preview)']
+    assert len(preview.data[1]) < len(large_sphere[1])
+
+    # several changes in a row only update the one preview layer
+    for n_iterations in range(5, 10):
+        widget.n_iterations.value = n_iterations
+    qtbot.waitUntil(lambda: widget._live_preview._worker is None, timeout=10000)
+    assert len(viewer.layers) == 2
+
+    # the proxy is computed again only after the data of the layer changed
+    version = widget._live_preview._version
+    widget.n_iterations.value = 11
+    qtbot.waitUntil(lambda: widget._live_preview._worker is None, timeout=10000)
+    assert widget._live_preview._version == version
+    surface.data = (large_sphere[0] * 2, large_sphere[1])
+    assert widget._live_preview._version != version
+
+    # committing runs at full resolution and removes the preview
+    result = widget()
+    assert len(result.data[1]) == len(large_sphere[1])
+    assert 'sphere (preview)' not in viewer.layers
@@ -190,4 +190,647 @@ def test_writer_reader_points_3d(create_3d_points, file_format):
         assert len(layers) == 1
 
         # check that point coordinates are the same
-        assert np.allclose(layers[0][0], layer_input.data, atol=1e-7)
\ No newline at end of file
+        assert np.allclose(layers[0][0], layer_input.data, atol=1e-7)
+
+@pytest.mark.parametrize("file_format", ['vtp', 'vtk', 'obj', 'stl', 'ply'])
+def test_read_header(create_3d_mesh, file_format):
+    import vedo
+    from pathlib import Path
+    from napari_vedo_bridge._reader import _read_header
+
+    mesh = vedo.Mesh(create_3d_mesh)
+    points = vedo.Points(create_3d_mesh[0])
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        vedo.write(mesh, str(Path(tmpdir) / f'mesh.{file_format}'))
+        header = _read_header(str(Path(tmpdir) / f'mesh.{file_format}'))
+        assert header.layer_type == 'surface'
+        if header.n_faces is not None:
+            assert header.n_faces == len(create_3d_mesh[1])
+
+        if file_format == 'stl':
+            return
+
+        vedo.write(points, str(Path(tmpdir) / f'points.{file_format}'))
+        header = _read_header(str(Path(tmpdir) / f'points.{file_format}'))
+        assert header.layer_type == 'points'
+        if header.n_vertices is not None:
+            assert header.n_vertices == len(create_3d_mesh[0])
+
+
+def test_reader_mesh_4d_parallel(create_4d_mesh):
+    from pathlib import Path
+    import numpy as np
+
+    from napari_vedo_bridge._writer import write_surfaces
+    from napari_vedo_bridge._reader import surfaces_reader
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output_paths = write_surfaces(
+            str(Path(tmpdir) / 'test.vtp'), create_4d_mesh, {})
+
+        serial = surfaces_reader(Path(output_paths[0]).parent, n_workers=1)
+        parallel = surfaces_reader(Path(output_paths[0]).parent, n_workers=4)
+
+        assert np.array_equal(serial[0][0][0], parallel[0][0][0])
+        assert np.array_equal(serial[0][0][1], parallel[0][0][1])
+
+
+def test_lazy_reader_mesh_4d(make_napari_viewer, create_4d_mesh):
+    from pathlib import Path
+    import numpy as np
+
+    from napari_vedo_bridge._writer import write_surfaces
+    from napari_vedo_bridge._reader import get_lazy_reader, surfaces_reader
+
+    viewer = make_napari_viewer()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output_paths = write_surfaces(
+            str(Path(tmpdir) / 'test.vtp'), create_4d_mesh, {})
+        directory = str(Path(output_paths[0]).parent)
+        expected = surfaces_reader(directory)[0][0]
+
+        reader = get_lazy_reader(directory)
+        assert reader is not None
+        assert get_lazy_reader(output_paths[0]) is None
+
+        layer_data = reader(directory)
+        layer = viewer._add_layer_from_data(*layer_data[0])[0]
+        timelapse = layer.metadata['timelapse']
+        assert len(timelapse) == 10
+        assert len(timelapse._cache) < len(timelapse)
+
+        viewer.dims.set_current_step(0, 3)
+        frame = expected[0][expected[0][:, 0] == 3]
+        assert np.allclose(layer.data[0], frame[:, 1:])
+        assert 3 in timelapse._cache
+        assert layer.ndim == 4
+        assert viewer.dims.nsteps[0] == 10
+
+        # saving the layer writes the current frame and nothing else
+        saved = write_surfaces(
+            str(Path(tmpdir) / 'frame.vtp'),
+            layer.data, {'name': layer.name})
+        vertices, faces = surfaces_reader(saved[0])[0][0][:2]
+        assert np.allclose(vertices, frame[:, 1:])
+        assert np.array_equal(faces, layer.data[1])
+
+        # a tiny memory budget keeps only the current frame
+        timelapse.max_memory = 1
+        viewer.dims.set_current_step(0, 5)
+        assert list(timelapse._cache.keys()) == [5]
+
+
+def test_lazy_reader_directories_only(tmp_path):
+    from npe2 import PluginManager
+
+    pm = PluginManager.instance()
+    pm.discover()
+
+    def _readers(path):
+        return [reader.command for reader in pm.iter_compatible_readers([path])
+                if reader.command.startswith('napari-vedo-bridge.')]
+
+    assert 'napari-vedo-bridge.load_surfaces_lazy' not in _readers('mesh.vtp')
+    assert 'napari-vedo-bridge.load_surfaces' in _readers('mesh.vtp')
+    assert 'napari-vedo-bridge.load_surfaces_lazy' in _readers(str(tmp_path))
+
+
+def test_writer_surface_frames_parallel(create_4d_mesh):
+    import numpy as np
+    import pandas as pd
+    import vedo
+    from napari_timelapse_processor import TimelapseConverter
+    from napari_vedo_bridge._writer import write_surfaces
+
+    features = pd.DataFrame({'value': np.arange(len(create_4d_mesh[0]))})
+    frames = TimelapseConverter().unstack_data(
+        create_4d_mesh, 'napari.types.SurfaceData')
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output_paths = write_surfaces(
+            tmpdir + '/test.vtp', create_4d_mesh, {'features': features},
+            n_workers=3)
+        assert len(output_paths) == len(frames)
+
+        offset = 0
+        for output_path, (vertices, faces, _) in zip(output_paths, frames):
+            mesh = vedo.load(output_path)
+            assert np.allclose(mesh.vertices, vertices)
+            assert np.array_equal(np.asarray(mesh.cells), faces)
+            assert np.array_equal(
+                mesh.pointdata['value'],
+                np.arange(offset, offset + len(vertices)))
+            offset += len(vertices)
+
+
+def test_writer_unsorted_points():
+    import numpy as np
+    import vedo
+    from napari_vedo_bridge._writer import write_points
+
+    points = np.random.random((30, 4))
+    points[:, 0] = np.tile([2, 0, 1], 10)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output_paths = write_points(tmpdir + '/test.vtp', points, {})
+        assert len(output_paths) == 3
+        for t, output_path in enumerate(output_paths):
+            assert np.allclose(
+                vedo.load(output_path).vertices,
+                points[points[:, 0] == t, 1:])
+
+
+@pytest.mark.parametrize("encoding", [
+    dict(),
+    dict(compression=None),
+    dict(compression='lz4'),
+    dict(compression='lzma', compression_level=9),
+    dict(data_mode='binary'),
+    dict(data_mode='ascii'),
+    dict(float32=True),
+])
+@pytest.mark.parametrize("file_format", ['vtp', 'vtk', 'ply', 'vtkhdf'])
+def test_writer_encoding(create_3d_mesh, file_format, encoding):
+    import os
+    import numpy as np
+    import pandas as pd
+    from napari_vedo_bridge._reader import _load_surface_data
+    from napari_vedo_bridge._writer import Encoding, write_surfaces
+
+    vertices, faces = create_3d_mesh
+    features = pd.DataFrame({'feature1': np.random.rand(len(vertices))})
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'test.' + file_format)
+        write_surfaces(
+            path, (vertices, faces), {'features': features},
+            encoding=Encoding(**encoding))
+        read_vertices, read_faces, pointdata = _load_surface_data(path)
+
+    assert np.allclose(read_vertices, vertices, atol=1e-5)
+    assert np.array_equal(read_faces, faces)
+    if file_format != 'ply':
+        assert np.allclose(pointdata['feature1'], features['feature1'])
+
+
+def test_writer_encoding_file_size(create_3d_mesh):
+    import os
+    import numpy as np
+    from napari_vedo_bridge._writer import Encoding, write_surfaces
+
+    vertices, faces = create_3d_mesh
+    data = (vertices.astype(np.float64), faces)
+    sizes = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for name, encoding in [
+                ('ascii', Encoding(data_mode='ascii', compression=None)),
+                ('raw', Encoding(compression=None)),
+                ('zlib', Encoding()),
+                ('float32', Encoding(float32=True))]:
+            path = os.path.join(tmpdir, name + '.vtp')
+            write_surfaces(path, data, {}, encoding=encoding)
+            sizes[name] = os.path.getsize(path)
+
+    assert sizes['ascii'] > sizes['raw'] > sizes['zlib'] > sizes['float32']
+
+
+def test_writer_invalid_encoding(create_3d_mesh):
+    from napari_vedo_bridge._writer import Encoding, write_surfaces
+
+    with pytest.raises(ValueError):
+        write_surfaces(
+            'test.vtp', create_3d_mesh, {}, encoding=Encoding(compression='7z'))
+
+
+def test_container_mesh_4d(create_4d_mesh):
+    import numpy as np
+    import pandas as pd
+    from napari_vedo_bridge._container import ContainerReader
+    from napari_vedo_bridge._reader import get_reader
+    from napari_vedo_bridge._writer import write_surfaces
+
+    features = pd.DataFrame({'value': np.arange(len(create_4d_mesh[0]))})
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = tmpdir + '/timelapse.vtkhdf'
+        output_paths = write_surfaces(
+            path, create_4d_mesh, {'features': features})
+        assert output_paths == [path]
+
+        # random access to single frames
+        container = ContainerReader(path)
+        assert container.is_timelapse
+        assert len(container) == 10
+        vertices, faces, pointdata = container[7]
+        frame = create_4d_mesh[0][:, 0] == 7
+        assert np.allclose(vertices, create_4d_mesh[0][frame, 1:])
+        assert np.array_equal(
+            pointdata['value'], features['value'].to_numpy()[frame])
+
+        reader = get_reader(path)
+        layers = reader(path)
+        assert len(layers) == 1
+        assert np.allclose(layers[0][0][0], create_4d_mesh[0])
+        assert np.array_equal(layers[0][0][1], create_4d_mesh[1])
+
+
+def test_container_points(create_4d_points, create_3d_points):
+    import numpy as np
+    from napari.layers import Layer
+    from napari_vedo_bridge._reader import get_reader
+    from napari_vedo_bridge._writer import write_points
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for i, layer_input in enumerate([create_4d_points, create_3d_points]):
+            path = tmpdir + f'/points_{i}.vtkhdf'
+            ldtuple = Layer.as_layer_data_tuple(layer_input)
+            write_points(path, ldtuple[0], ldtuple[1])
+
+            reader = get_reader(path)
+            layers = reader(path)
+            assert layers[0][2] == 'points'
+            assert np.allclose(layers[0][0], layer_input.data)
+
+            if 'feature1' in layer_input.features:
+                assert np.allclose(
+                    layers[0][1]['features']['feature1'],
+                    layer_input.features['feature1'])
+
+
+def test_lazy_reader_container(make_napari_viewer, create_4d_mesh):
+    import numpy as np
+    from napari.layers import Layer
+    from napari_vedo_bridge._reader import get_lazy_reader
+    from napari_vedo_bridge._writer import write_surfaces
+
+    viewer = make_napari_viewer()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = tmpdir + '/timelapse.vtkhdf'
+        write_surfaces(path, create_4d_mesh, {})
+
+        reader = get_lazy_reader(path)
+        assert reader is not None
+        layer = viewer.add_layer(Layer.create(*reader(path)[0]))
+        viewer.dims.set_current_step(0, 4)
+        frame = create_4d_mesh[0][:, 0] == 4
+        assert np.allclose(layer.data[0], create_4d_mesh[0][frame, 1:])
+
+
+def test_frame_index(create_4d_mesh):
+    import json
+    import os
+    import numpy as np
+    import pandas as pd
+    from pathlib import Path
+    from napari_vedo_bridge._frame_index import read_frame_index
+    from napari_vedo_bridge._reader import get_reader, surfaces_reader
+    from napari_vedo_bridge._writer import write_surfaces
+
+    vertices, faces = create_4d_mesh
+    features = pd.DataFrame({'value': np.arange(len(vertices))})
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output_paths = write_surfaces(
+            tmpdir + '/test.vtp', create_4d_mesh, {'features': features})
+        directory = str(Path(output_paths[0]).parent)
+
+        index = read_frame_index(directory)
+        assert index.paths == output_paths
+        assert sum(index.n_vertices) == len(vertices)
+        assert sum(index.n_faces) == len(faces)
+        assert index.features == {'value': features['value'].dtype.str}
+        assert get_reader(directory) is surfaces_reader
+
+        data, properties, _ = surfaces_reader(directory)[0]
+        assert np.allclose(data[0], vertices)
+        assert np.array_equal(data[1], faces)
+        assert np.array_equal(properties['features']['value'], np.arange(
+            len(vertices)))
+
+        # wrong counts: fall back to reading and stacking afterwards
+        index_path = os.path.join(directory, 'index.json')
+        with open(index_path) as f:
+            content = json.load(f)
+        content['frames'][0]['n_vertices'] += 1
+        with open(index_path, 'w') as f:
+            json.dump(content, f)
+        data, _, _ = surfaces_reader(directory)[0]
+        assert np.array_equal(data[1], faces)
+
+        # modified frame file: the index is stale
+        os.utime(output_paths[0], ns=(0, 0))
+        assert read_frame_index(directory) is None
+        data, _, _ = surfaces_reader(directory)[0]
+        assert np.array_equal(data[1], faces)
+
+
+def test_frame_index_new_frame(create_4d_mesh):
+    import os
+    import shutil
+    from unittest import mock
+    import numpy as np
+    from pathlib import Path
+    from napari_vedo_bridge._frame_index import read_frame_index
+    from napari_vedo_bridge._reader import get_reader, surfaces_reader
+    from napari_vedo_bridge._writer import write_surfaces
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output_paths = write_surfaces(tmpdir + '/test.vtp', create_4d_mesh, {})
+        directory = Path(output_paths[0]).parent
+        assert read_frame_index(str(directory)) is not None
+
+        # reading the index does not list the directory
+        with mock.patch('os.listdir', side_effect=AssertionError):
+            assert read_frame_index(str(directory)) is not None
+            assert get_reader(str(directory)) is surfaces_reader
+            data, _, _ = surfaces_reader(str(directory))[0]
+            assert np.array_equal(data[1], create_4d_mesh[1])
+
+        # a frame added after writing makes the index stale
+        shutil.copy(output_paths[-1], directory / 'test_zz.vtp')
+        assert read_frame_index(str(directory)) is None
+        data, _, _ = surfaces_reader(str(directory))[0]
+        n_frames = len(np.unique(create_4d_mesh[0][:, 0]))
+        assert len(np.unique(data[0][:, 0])) == n_frames + 1
+
+        # as does a removed frame
+        (directory / 'test_zz.vtp').unlink()
+        write_surfaces(str(directory) + '.vtp', create_4d_mesh, {})
+        assert read_frame_index(str(directory)) is not None
+        os.remove(output_paths[1])
+        assert read_frame_index(str(directory)) is None
+
+
+def test_frame_index_points(create_4d_points):
+    import numpy as np
+    from pathlib import Path
+    from napari_vedo_bridge._frame_index import read_frame_index
+    from napari_vedo_bridge._reader import points_reader
+    from napari_vedo_bridge._writer import write_points
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output_paths = write_points(
+            tmpdir + '/test.vtp', create_4d_points.data,
+            {'features': create_4d_points.features})
+        directory = str(Path(output_paths[0]).parent)
+
+        index = read_frame_index(directory)
+        assert index.layer_type == 'points'
+        assert index.n_faces is None
+
+        data, properties, _ = points_reader(directory)[0]
+        assert np.allclose(data, create_4d_points.data)
+        assert np.allclose(
+            properties['features']['feature1'],
+            create_4d_points.features['feature1'])
+
+
+@pytest.mark.parametrize("file_format", ['vtp', 'vtk', 'ply', 'obj'])
+def test_read_stacked_from_headers(create_4d_mesh, file_format):
+    import os
+    import numpy as np
+    from pathlib import Path
+    from napari_vedo_bridge._reader import (
+        _frame_counts,
+        _load_surface_data,
+        _read_stacked,
+    )
+    from napari_vedo_bridge._writer import write_surfaces
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output_paths = write_surfaces(
+            tmpdir + '/test.' + file_format, create_4d_mesh, {})
+        os.remove(Path(output_paths[0]).parent / 'index.json')
+
+        calls = []
+
+        def _read(path):
+            calls.append(path)
+            return _load_surface_data(path)
+
+        vertices, faces, _ = _read_stacked(output_paths, _read, n_workers=2)
+        assert np.allclose(vertices, create_4d_mesh[0])
+        assert np.array_equal(faces, create_4d_mesh[1])
+
+        # counts from the headers are used to preallocate if available, so
+        # that every file is read exactly once
+        if _frame_counts(output_paths, 'surface') is not None:
+            assert len(calls) == len(output_paths)
+
+
+@pytest.mark.parametrize("file_format", ['vtp', 'vtk', 'obj', 'stl', 'ply'])
+def test_reader_gzip(create_3d_mesh, file_format):
+    import gzip
+    import shutil
+    import numpy as np
+    from napari_vedo_bridge._reader import (
+        _read_header,
+        get_reader,
+        surfaces_reader,
+    )
+    from napari_vedo_bridge._writer import write_surfaces
+
+    vertices, faces = create_3d_mesh
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = tmpdir + '/test.' + file_format
+        write_surfaces(path, create_3d_mesh, {})
+        with open(path, 'rb') as f_in, gzip.open(path + '.gz', 'wb') as f_out:
+            shutil.copyfileobj(f_in, f_out)
+
+        assert get_reader(path + '.gz') is surfaces_reader
+        assert _read_header(path + '.gz').layer_type == 'surface'
+        if file_format != 'stl':
+            # binary stl files are validated with the file size
+            assert _read_header(path + '.gz') == _read_header(path)
+
+        data, _, _ = surfaces_reader(path + '.gz')[0]
+        expected, _, _ = surfaces_reader(path)[0]
+        assert np.allclose(data[0], expected[0])
+        assert np.array_equal(data[1], expected[1])
+
+
+def test_reader_points_gzip(create_3d_points):
+    import gzip
+    import numpy as np
+    import pandas as pd
+    from napari_vedo_bridge._reader import get_reader, points_reader
+    from napari_vedo_bridge._writer import write_points
+
+    features = pd.DataFrame(
+        {'feature1': np.random.rand(len(create_3d_points.data))})
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = tmpdir + '/test.vtp'
+        write_points(path, create_3d_points.data, {'features': features})
+        with open(path, 'rb') as f_in, gzip.open(path + '.gz', 'wb') as f_out:
+            f_out.write(f_in.read())
+
+        assert get_reader(path + '.gz') is points_reader
+        data, properties, _ = points_reader(path + '.gz')[0]
+        assert np.allclose(data, create_3d_points.data)
+        assert np.allclose(
+            properties['features']['feature1'], features['feature1'])
+
+
+def test_reader_off_and_xml(create_3d_mesh):
+    import shutil
+    import numpy as np
+    from napari_vedo_bridge._reader import (
+        _read_header,
+        get_reader,
+        surfaces_reader,
+    )
+    from napari_vedo_bridge._writer import write_surfaces
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # a unit cube with quad faces
+        with open(tmpdir + '/cube.off', 'w') as f:
+            f.write('OFF\n# cube\n8 6 12\n')
+            for x in (0, 1):
+                for y in (0, 1):
+                    for z in (0, 1):
+                        f.write(f'{x} {y} {z}\n')
+            for quad in ([0, 1, 3, 2], [4, 6, 7, 5], [0, 4, 5, 1],
+                         [2, 3, 7, 6], [0, 2, 6, 4], [1, 5, 7, 3]):
+                f.write('4 ' + ' '.join(map(str, quad)) + '\n')
+
+        assert get_reader(tmpdir + '/cube.off') is surfaces_reader
+        assert _read_header(tmpdir + '/cube.off').n_vertices == 8
+        data, _, _ = surfaces_reader(tmpdir + '/cube.off')[0]
+        assert data[0].shape == (8, 3)
+        assert data[1].shape == (12, 3)
+
+        write_surfaces(tmpdir + '/test.vtp', create_3d_mesh, {})
+        shutil.copy(tmpdir + '/test.vtp', tmpdir + '/test.xml')
+        assert get_reader(tmpdir + '/test.xml') is surfaces_reader
+        data, _, _ = surfaces_reader(tmpdir + '/test.xml')[0]
+        assert np.array_equal(data[1], create_3d_mesh[1])
+
+        # Dolfin meshes, of tetrahedra only the boundary is read
+        def _write_dolfin(path, cell_type, vertices, cells):
+            with open(path, 'w') as f:
+                f.write('<?xml version="1.0"?>\n<dolfin>\n')
+                f.write(f'<mesh celltype="{cell_type}" dim="3">\n')
+                f.write(f'<vertices size="{len(vertices)}">\n')
+                for i, (x, y, z) in enumerate(vertices):
+                    f.write(f'<vertex index="{i}" x="{x}" y="{y}" z="{z}"/>\n')
+                f.write(f'</vertices>\n<cells size="{len(cells)}">\n')
+                for i, cell in enumerate(cells):
+                    corners = ' '.join(f'v{j}="{v}"' for j, v in enumerate(cell))
+                    f.write(f'<{cell_type} index="{i}" {corners}/>\n')
+                f.write('</cells>\n</mesh>\n</dolfin>\n')
+
+        corners = [[0, 0, 0], [1, 0, 0], [0, 1, 0], [0, 0, 1], [1, 1, 1]]
+        _write_dolfin(
+            tmpdir + '/triangles.xml', 'triangle', corners[:4],
+            [[0, 1, 2], [0, 1, 3]])
+        _write_dolfin(
+            tmpdir + '/tetrahedra.xml', 'tetrahedron', corners,
+            [[0, 1, 2, 3], [1, 2, 3, 4]])
+
+        assert get_reader(tmpdir + '/triangles.xml') is surfaces_reader
+        assert _read_header(tmpdir + '/triangles.xml').n_faces == 2
+        data, _, _ = surfaces_reader(tmpdir + '/triangles.xml')[0]
+        assert np.allclose(data[0], corners[:4])
+        assert np.array_equal(data[1], [[0, 1, 2], [0, 1, 3]])
+
+        assert get_reader(tmpdir + '/tetrahedra.xml') is surfaces_reader
+        data, _, _ = surfaces_reader(tmpdir + '/tetrahedra.xml')[0]
+        # the face shared by both tetrahedra is inside
+        assert len(data[1]) == 6
+        assert [1, 2, 3] not in np.sort(data[1], axis=1).tolist()
+
+
+def test_reader_ignores_unsupported_files():
+    import gzip
+    from napari_vedo_bridge._reader import get_reader
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with gzip.open(tmpdir + '/table.csv.gz', 'wt') as f:
+            f.write('a,b\n1,2\n')
+        with open(tmpdir + '/meta.xml', 'w') as f:
+            f.write('<?xml version="1.0"?><OME><Image ID="0"/></OME>')
+
+        assert get_reader(tmpdir + '/table.csv.gz') is None
+        assert get_reader(tmpdir + '/meta.xml') is None
+
+        # a binary stl without facets
+        with open(tmpdir + '/empty.stl', 'wb') as f:
+            f.write(bytes(84))
+        assert get_reader(tmpdir + '/empty.stl') is None
+
+        # a truncated gzip file
+        with gzip.open(tmpdir + '/mesh.vtk.gz', 'wt') as f:
+            f.write('# vtk DataFile Version 3.0\n' * 1000)
+        with open(tmpdir + '/mesh.vtk.gz', 'r+b') as f:
+            f.truncate(100)
+        assert get_reader(tmpdir + '/mesh.vtk.gz') is None
+
+
+def test_reader_off_polygons():
+    import gzip
+    import numpy as np
+    from napari_vedo_bridge._reader import surfaces_reader
+
+    # mixed polygon sizes, colors, comments and blank lines
+    content = (
+        'OFF 5 3 0\n'
+        '0 0 0\n1 0 0 # comment\n\n1 1 0\n0 1 0\n0.5 0.5 1 255 0 0\n'
+        '4 0 1 2 3\n3 0 1 4 1.0 0.0 0.0\n# comment\n3 1 2 4\n')
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with open(tmpdir + '/mixed.off', 'w') as f:
+            f.write(content)
+        with gzip.open(tmpdir + '/mixed.off.gz', 'wt') as f:
+            f.write(content)
+
+        for path in (tmpdir + '/mixed.off', tmpdir + '/mixed.off.gz'):
+            (vertices, faces), _, _ = surfaces_reader(path)[0]
+            assert vertices.shape == (5, 3)
+            assert np.allclose(vertices[4], [0.5, 0.5, 1])
+            assert np.array_equal(
+                faces, [[0, 1, 2], [0, 2, 3], [0, 1, 4], [1, 2, 4]])
+
+
+def test_lazy_timelapse_prefetch(create_4d_mesh):
+    import time
+    import numpy as np
+    from napari_vedo_bridge._timelapse import LazySurfaceTimelapse
+    from napari_vedo_bridge._writer import write_surfaces
+
+    def _wait_for(timelapse):
+        deadline = time.time() + 10
+        while timelapse._pending and time.time() < deadline:
+            time.sleep(0.01)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        paths = write_surfaces(tmpdir + '/test.vtp', create_4d_mesh, {})
+        timelapse = LazySurfaceTimelapse(paths, n_prefetch=3)
+        reads = []
+        read_frame = timelapse._read_frame
+        timelapse._read_frame = lambda t: reads.append(t) or read_frame(t)
+
+        # forward playback decodes the next frames in the background
+        timelapse[4]
+        _wait_for(timelapse)
+        assert set(timelapse._cache) == {4, 5, 6, 7}
+
+        for t in (5, 6, 7):
+            vertices, faces = timelapse[t]
+            frame = create_4d_mesh[0][:, 0] == t
+            assert np.allclose(vertices, create_4d_mesh[0][frame, 1:])
+        _wait_for(timelapse)
+        assert sorted(reads) == list(range(4, 10))
+
+        # backward playback prefetches the previous frames
+        timelapse[3]
+        _wait_for(timelapse)
+        assert {0, 1, 2, 3} <= set(timelapse._cache)
+
+        timelapse.close()
+        assert timelapse.cache_size == 0
+
+        # prefetching can be disabled
+        timelapse = LazySurfaceTimelapse(paths, n_prefetch=0)
+        timelapse[0]
+        assert list(timelapse._cache) == [0]
@@ -0,0 +1,125 @@
+import json
+import pytest
+
+
+@pytest.fixture
+def mirror(tmp_path):
+    import vedo
+
+    directory = tmp_path / 'mirror'
+    directory.mkdir()
+    sphere = vedo.IcoSphere(subdivisions=2).clean()
+    vedo.write(sphere, str(directory / 'bunny.obj'))
+    return directory
+
+
+def test_fetch_sample(mirror, tmp_path, monkeypatch):
+    from napari_vedo_bridge._sample_cache import fetch_sample, load_sample
+
+    cache_dir = tmp_path / 'cache'
+    monkeypatch.setenv('NAPARI_VEDO_BRIDGE_SAMPLE_DIR', str(cache_dir))
+    monkeypatch.setenv('NAPARI_VEDO_BRIDGE_SAMPLE_MIRROR', str(mirror))
+
+    path = fetch_sample('bunny.obj')
+    assert path == cache_dir / 'bunny.obj'
+    with open(cache_dir / 'manifest.json') as f:
+        assert 'sha256' in json.load(f)['bunny.obj']
+
+    # the cached file is used when the mirror is gone
+    (mirror / 'bunny.obj').unlink()
+    vertices, faces = load_sample('bunny.obj')
+    assert faces.shape[1] == 3 and len(vertices) == faces.max() + 1
+
+    # the second load memory-maps the parsed arrays
+    vertices_cached, _ = load_sample('bunny.obj')
+    assert vertices_cached.base is not None
+    assert (vertices_cached == vertices).all()
+
+    with pytest.raises(OSError, match='fetch-samples'):
+        fetch_sample('cow.vtk')
+
+
+def test_fetch_sample_checksum(mirror, tmp_path):
+    from napari_vedo_bridge._sample_cache import fetch_sample
+
+    cache_dir = tmp_path / 'cache'
+    fetch_sample('bunny.obj', mirror=str(mirror), directory=str(cache_dir))
+
+    # a modified cached file is fetched again
+    (cache_dir / 'bunny.obj').write_text('corrupted')
+    path = fetch_sample(
+        'bunny.obj', mirror=str(mirror), directory=str(cache_dir))
+    assert path.read_bytes() == (mirror / 'bunny.obj').read_bytes()
+
+    # a source that does not match the recorded checksum is rejected
+    (mirror / 'bunny.obj').write_text('tampered')
+    with pytest.raises(ValueError, match='Checksum'):
+        fetch_sample('bunny.obj', mirror=str(mirror),
+                     directory=str(cache_dir), force=True)
+    assert path.read_bytes() != b'tampered'
+
+
+def test_cli_fetch_samples(mirror, tmp_path):
+    from napari_vedo_bridge._cli import main
+
+    cache_dir = tmp_path / 'cache'
+    assert main(['fetch-samples', 'bunny', '--mirror', str(mirror),
+                 '--cache-dir', str(cache_dir)]) == 0
+    assert (cache_dir / 'bunny.obj').exists()
+
+    assert main(['fetch-samples', 'cow', '--mirror', str(mirror),
+                 '--cache-dir', str(cache_dir)]) == 1
+    assert main(['fetch-samples', 'unicorn']) == 1
+
+
+def test_fetch_sample_pinned_checksum(mirror, tmp_path, monkeypatch):
+    from napari_vedo_bridge import _sample_cache
+    from napari_vedo_bridge._sample_cache import _sha256, fetch_sample
+
+    cache_dir = tmp_path / 'cache'
+    monkeypatch.setattr(
+        _sample_cache, 'sample_checksums', {'bunny.obj': 'not the hash'})
+    with pytest.raises(ValueError, match='Checksum'):
+        fetch_sample('bunny.obj', mirror=str(mirror), directory=str(cache_dir))
+    assert not (cache_dir / 'bunny.obj').exists()
+
+    checksum = _sha256(mirror / 'bunny.obj')
+    monkeypatch.setattr(
+        _sample_cache, 'sample_checksums', {'bunny.obj': checksum})
+    path = fetch_sample(
+        'bunny.obj', mirror=str(mirror), directory=str(cache_dir))
+    assert _sha256(path) == checksum
+
+
+def test_fetch_sample_refreshes_manifest(mirror, tmp_path, monkeypatch):
+    import os
+    from napari_vedo_bridge import _sample_cache
+    from napari_vedo_bridge._sample_cache import fetch_sample
+
+    cache_dir = tmp_path / 'cache'
+    path = fetch_sample(
+        'bunny.obj', mirror=str(mirror), directory=str(cache_dir))
+
+    # a touched but unchanged file is hashed once and its new mtime stored
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    fetch_sample('bunny.obj', mirror=str(mirror), directory=str(cache_dir))
+    with open(cache_dir / 'manifest.json') as f:
+        assert json.load(f)['bunny.obj']['mtime_ns'] == path.stat().st_mtime_ns
+
+    def fail(path):
+        raise AssertionError('file was hashed again')
+
+    monkeypatch.setattr(_sample_cache, '_sha256', fail)
+    fetch_sample('bunny.obj', mirror=str(mirror), directory=str(cache_dir))
+
+
+def test_fetch_sample_rejects_unreadable_first_download(mirror, tmp_path):
+    from napari_vedo_bridge._sample_cache import fetch_sample
+
+    cache_dir = tmp_path / 'cache'
+    (mirror / 'bunny.obj').write_text('<html>Not Found</html>')
+    with pytest.raises(ValueError, match='not a readable mesh'):
+        fetch_sample('bunny.obj', mirror=str(mirror), directory=str(cache_dir))
+    assert not (cache_dir / 'bunny.obj').exists()
+    assert not (cache_dir / 'manifest.json').exists()
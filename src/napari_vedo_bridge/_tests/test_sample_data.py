@@ -1,4 +1,26 @@
-def test_sample_data():
+import pytest
+
+
+@pytest.fixture
+def sample_mirror(tmp_path, monkeypatch):
+    """Serve the samples from a local directory instead of the network."""
+    import vedo
+    from .._sample_cache import samples
+
+    mirror = tmp_path / 'mirror'
+    mirror.mkdir()
+    sphere = vedo.IcoSphere(subdivisions=2).clean()
+    for filename in samples.values():
+        vedo.write(sphere, str(mirror / filename))
+
+    monkeypatch.setenv('NAPARI_VEDO_BRIDGE_SAMPLE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setenv('NAPARI_VEDO_BRIDGE_SAMPLE_MIRROR', str(mirror))
+    monkeypatch.setattr(
+        'napari_vedo_bridge._sample_cache.sample_checksums', {})
+    return mirror
+
+
+def test_sample_data(sample_mirror):
     from .._sample_data import (
         beethoven,
         apple,
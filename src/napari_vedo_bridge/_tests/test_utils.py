@@ -0,0 +1,66 @@
+import pytest
+import vedo
+import numpy as np
+from napari.layers import Surface, Points
+from napari_vedo_bridge.utils import (
+    napari_to_vedo_mesh,
+    vedo_mesh_to_napari,
+    napari_to_vedo_points,
+    vedo_points_to_napari,
+    vedo_mesh_faces,
+    is_triangle_mesh,
+)
+
+
+@pytest.fixture
+def sample_surface():
+    mesh = vedo.IcoSphere(subdivisions=3).clean()
+    return Surface((mesh.vertices, np.asarray(mesh.cells, dtype=int)))
+
+
+def test_mesh_round_trip(sample_surface):
+    mesh = napari_to_vedo_mesh(sample_surface)
+    assert np.shares_memory(mesh.vertices, sample_surface.data[0])
+
+    surface = vedo_mesh_to_napari(mesh)
+    assert np.array_equal(surface.data[0], sample_surface.data[0])
+    assert np.array_equal(surface.data[1], sample_surface.data[1])
+
+
+def test_mesh_filter_keeps_input(sample_surface):
+    vertices = sample_surface.data[0].copy()
+    mesh = napari_to_vedo_mesh(sample_surface)
+    mesh.smooth()
+
+    assert np.array_equal(sample_surface.data[0], vertices)
+
+
+def test_mesh_faces_triangulation():
+    triangles = vedo.IcoSphere(subdivisions=2)
+    assert is_triangle_mesh(triangles)
+    faces = vedo_mesh_faces(triangles)
+    assert np.array_equal(faces, np.asarray(triangles.cells))
+    assert np.shares_memory(faces, vedo_mesh_faces(triangles))
+
+    mixed = vedo.Mesh([
+        np.random.rand(6, 3),
+        [[0, 1, 2, 3], [1, 2, 3], [2, 3, 4, 5, 0]]])
+    assert not is_triangle_mesh(mixed)
+    assert vedo_mesh_faces(mixed).tolist() == [
+        [0, 1, 2], [0, 2, 3], [1, 2, 3], [2, 3, 4], [2, 4, 5], [2, 5, 0]]
+
+    box = vedo.Box().clean()
+    faces = vedo_mesh_faces(box)
+    assert faces.shape == (12, 3)
+    assert np.isclose(
+        vedo.Mesh([box.vertices, faces]).area(),
+        box.clone().triangulate().area())
+
+
+def test_points_round_trip():
+    points = Points(np.random.randn(100, 3))
+    vedo_points = napari_to_vedo_points(points)
+    assert vedo_points.dataset.GetNumberOfVerts() == 100
+
+    new_points = vedo_points_to_napari(vedo_points)
+    assert np.array_equal(new_points.data, points.data)
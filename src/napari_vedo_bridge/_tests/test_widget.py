@@ -1,28 +1,47 @@
 import numpy as np
+import pytest
 import vedo
 from .._cutter_widget import VedoCutter
 
 
+@pytest.fixture
+def make_vedo_cutter():
+    """Create cutter widgets and close their VTK render windows afterwards."""
+    cutters = []
+
+    def make(viewer):
+        cutters.append(VedoCutter(viewer))
+        return cutters[-1]
+
+    yield make
+    for cutter in cutters:
+        cutter.plt.close()
+        cutter.vtkWidget.Finalize()
+
+
 # make_napari_viewer is a pytest fixture that returns a napari viewer object
-def test_cutter_widget(make_napari_viewer):
+def test_cutter_widget(make_napari_viewer, make_vedo_cutter):
 
     # make viewer and add an image layer using our fixture
     viewer = make_napari_viewer()
 
     # create our widget, passing in the viewer
-    my_widget = VedoCutter(viewer)
+    my_widget = make_vedo_cutter(viewer)
     viewer.window.add_dock_widget(my_widget, area='right')
 
 
-def test_get_from_napari(make_napari_viewer):
+@pytest.fixture
+def sample_surface():
+    sphere = vedo.IcoSphere(r=10, subdivisions=3).clean()
+    return sphere.vertices, np.asarray(sphere.cells, dtype=int)
+
+
+def test_get_from_napari(make_napari_viewer, make_vedo_cutter, sample_surface):
     # Load the test mesh into the napari viewer
-    from .._sample_data import beethoven
     viewer = make_napari_viewer()
+    viewer.add_surface(sample_surface)
 
-    surface = beethoven()[0]
-    viewer.add_surface(surface[0])
-
-    vedo_cutter = VedoCutter(viewer)
+    vedo_cutter = make_vedo_cutter(viewer)
     vedo_cutter.get_from_napari()
 
     # Assert that the mesh is loaded and displayed correctly in vedo
@@ -32,15 +51,16 @@ def test_get_from_napari(make_napari_viewer):
     vedo_cutter.send_to_napari()
     assert len(viewer.layers) == n_layers + 1
 
+    # the sent layer does not share memory with the mesh in the plotter
+    layer = viewer.layers[-1]
+    assert not np.shares_memory(layer.vertices, vedo_cutter.mesh.vertices)
+
 
-def test_cutters(make_napari_viewer):
-    from .._sample_data import beethoven
+def test_cutters(make_napari_viewer, make_vedo_cutter, sample_surface):
     viewer = make_napari_viewer()
-    
-    surface = beethoven()[0]
-    viewer.add_surface(surface[0])
+    viewer.add_surface(sample_surface)
 
-    vedo_cutter = VedoCutter(viewer)
+    vedo_cutter = make_vedo_cutter(viewer)
     vedo_cutter.get_from_napari()
 
     vedo_cutter.buttonGroup.buttons()[0].click()
@@ -62,7 +82,7 @@ def base_widget(make_napari_viewer):
 
     n_widgets = len(viewer.window._dock_widgets)
 
-    mesh = vedo.load("https://vedo.embl.es/examples/data/270.vtk")
+    mesh = vedo.IcoSphere(r=10, subdivisions=3).clean()
     viewer.add_surface((mesh.vertices, np.asarray(mesh.cells)), name="test_mesh")
     n_layers = len(viewer.layers)
 
@@ -85,3 +105,32 @@ def base_widget(make_napari_viewer):
 
 
 
+
+
+def test_undo_redo_cut(make_napari_viewer, make_vedo_cutter, sample_surface):
+    from .._cut import Cut
+
+    viewer = make_napari_viewer()
+    viewer.add_surface(sample_surface)
+    vedo_cutter = make_vedo_cutter(viewer)
+    vedo_cutter.get_from_napari()
+
+    vedo_cutter.history.cut(
+        Cut('plane', {'origin': [0, 0, 0], 'normal': [0, 0, -1]}))
+    vedo_cutter._show_history_state()
+    vedo_cutter.send_to_napari()
+    cut_vertices, cut_faces = viewer.layers[-1].data[:2]
+
+    # only the vertices of the remaining faces are sent
+    assert len(cut_vertices) < len(sample_surface[0])
+    assert len(cut_vertices) == len(np.unique(cut_faces))
+
+    vedo_cutter.undo_cut()
+    vedo_cutter.send_to_napari()
+    assert len(viewer.layers[-1].data[1]) == len(sample_surface[1])
+
+    vedo_cutter.redo_cut()
+    vedo_cutter.send_to_napari()
+    vertices, faces = viewer.layers[-1].data[:2]
+    np.testing.assert_array_equal(vertices, cut_vertices)
+    np.testing.assert_array_equal(faces, cut_faces)
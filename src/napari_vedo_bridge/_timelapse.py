@@ -0,0 +1,316 @@
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import NamedTuple, Optional, Sequence, Tuple
+
+
+_default_max_memory = 2 * 1024 ** 3  # 2 GB
+_default_n_prefetch = 4
+
+
+class Frame(NamedTuple):
+    """
+    Entry of the frame index of a lazily loaded timelapse.
+
+    The vertex and face counts are taken from the file header and are None
+    if the header does not contain them. `step` is the index of the frame in
+    a single-file timelapse container and None for one file per frame.
+    """
+    path: str
+    n_vertices: Optional[int]
+    n_faces: Optional[int]
+    step: Optional[int] = None
+
+
+class LazySurfaceTimelapse:
+    """
+    A surface timelapse stored as one file per frame, read on demand.
+
+    Only the frame index (file path, vertex and face count) is built when the
+    timelapse is created. The geometry of a frame is parsed when it is
+    requested and kept in an LRU cache of decoded frames, the size of which
+    is limited by `max_memory`.
+
+    Whenever a frame is requested, the next `n_prefetch` frames in the
+    current playback direction are decoded in background threads, so that
+    playing or scrubbing forward and backward does not wait for the disk.
+
+    Parameters
+    ----------
+    paths : Sequence[str]
+        Files of the timelapse, one per frame, in temporal order.
+    max_memory : int, optional
+        Maximal size of the decoded frames kept in memory in bytes, by
+        default 2 GB. The most recently used frame is always kept.
+    n_prefetch : int, optional
+        Number of frames to decode ahead, by default 4. Fewer frames are
+        prefetched if they would not fit into `max_memory`; 0 disables
+        prefetching.
+    n_workers : int, optional
+        Number of background threads for prefetching, by default 2.
+    """
+
+    def __init__(
+            self,
+            paths: Sequence[str],
+            max_memory: int = _default_max_memory,
+            n_prefetch: int = _default_n_prefetch,
+            n_workers: int = 2):
+        from ._reader import _read_header
+
+        self.frames = [
+            Frame(str(path), *_read_header(path)[1:]) for path in paths
+        ]
+        self.max_memory = max_memory
+        self.n_prefetch = n_prefetch
+        self.n_workers = n_workers
+
+        self._cache = OrderedDict()
+        self._cache_size = 0
+        self._container = None
+
+        # prefetching state, shared with the background threads
+        self._lock = threading.RLock()
+        self._pending = {}
+        self._executor = None
+        self._current = None
+        self._direction = 1
+
+    @classmethod
+    def from_container(
+            cls,
+            path: str,
+            max_memory: int = _default_max_memory,
+            n_prefetch: int = _default_n_prefetch) -> "LazySurfaceTimelapse":
+        """
+        Create a timelapse from a single-file container (`.vtkhdf`).
+        """
+        from ._container import ContainerReader
+
+        timelapse = cls([], max_memory=max_memory, n_prefetch=n_prefetch)
+        timelapse._container = ContainerReader(path)
+        timelapse.frames = [
+            Frame(str(path), None, None, step)
+            for step in range(len(timelapse._container))
+        ]
+        return timelapse
+
+    @classmethod
+    def from_index(
+            cls,
+            index: "FrameIndex",
+            max_memory: int = _default_max_memory,
+            n_prefetch: int = _default_n_prefetch) -> "LazySurfaceTimelapse":
+        """
+        Create a timelapse from the index of a timelapse directory.
+
+        The vertex and face counts are taken from the index, so no file
+        header needs to be read.
+        """
+        timelapse = cls([], max_memory=max_memory, n_prefetch=n_prefetch)
+        timelapse.frames = [
+            Frame(path, n_vertices, n_faces)
+            for path, n_vertices, n_faces
+            in zip(index.paths, index.n_vertices, index.n_faces)
+        ]
+        return timelapse
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def __getitem__(self, t: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get vertices and faces of frame `t`, reading the file if necessary.
+
+        Afterwards, the following frames in the playback direction are
+        prefetched.
+        """
+        t = int(t)
+        with self._lock:
+            if self._current is not None and t != self._current:
+                self._direction = 1 if t > self._current else -1
+            self._current = t
+            data = self._cache.get(t)
+            if data is not None:
+                self._cache.move_to_end(t)
+                self._evict()
+            future = self._pending.get(t)
+
+        if data is None and future is not None:
+            try:
+                data = future.result()
+            except Exception:  # noqa: BLE001 - read again below to raise
+                data = None
+        if data is None:
+            data = self._read_frame(t)
+            self._add_to_cache(t, data)
+
+        self.prefetch(t)
+        return data
+
+    def prefetch(self, t: int, direction: Optional[int] = None):
+        """
+        Decode the frames after `t` in `direction` in background threads.
+
+        Pending reads of frames that are no longer ahead of `t` are
+        cancelled if they have not started yet.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        if direction is None:
+            direction = self._direction
+        ahead = [
+            frame for frame in (
+                t + direction * i for i in range(1, self._n_ahead(t) + 1))
+            if 0 <= frame < len(self)
+        ]
+
+        with self._lock:
+            for frame, future in list(self._pending.items()):
+                if frame not in ahead and future.cancel():
+                    del self._pending[frame]
+            if not ahead:
+                return
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.n_workers,
+                    thread_name_prefix='timelapse-prefetch')
+            for frame in ahead:
+                if frame not in self._cache and frame not in self._pending:
+                    self._pending[frame] = self._executor.submit(
+                        self._prefetch_frame, frame)
+
+    def close(self):
+        """Stop prefetching and release all cached frames."""
+        with self._lock:
+            for future in self._pending.values():
+                future.cancel()
+            self._pending.clear()
+            executor, self._executor = self._executor, None
+            self._cache.clear()
+            self._cache_size = 0
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    @property
+    def cache_size(self) -> int:
+        """Size of the currently cached frames in bytes."""
+        return self._cache_size
+
+    def _n_ahead(self, t: int) -> int:
+        """Number of frames to prefetch that fit into the memory budget."""
+        with self._lock:
+            data = self._cache.get(t)
+        if data is None or self.n_prefetch <= 0:
+            return 0
+        frame_size = max(1, sum(array.nbytes for array in data))
+        return int(min(self.n_prefetch, self.max_memory // frame_size - 1))
+
+    def _prefetch_frame(self, t: int) -> Tuple[np.ndarray, np.ndarray]:
+        try:
+            data = self._read_frame(t)
+            self._add_to_cache(t, data)
+            return data
+        finally:
+            with self._lock:
+                self._pending.pop(t, None)
+
+    def _add_to_cache(self, t: int, data: tuple):
+        with self._lock:
+            if t in self._cache:
+                return
+            self._cache[t] = data
+            self._cache_size += sum(array.nbytes for array in data)
+            self._evict()
+
+    def _read_frame(self, t: int) -> Tuple[np.ndarray, np.ndarray]:
+        from ._reader import _load_surface_data
+
+        if self.frames[t].step is not None:
+            vertices, faces, _ = self._container[self.frames[t].step]
+        else:
+            vertices, faces, _ = _load_surface_data(self.frames[t].path)
+        return np.asarray(vertices), np.asarray(faces)
+
+    def _evict(self):
+        # the current frame is kept even if it is not the most recent one,
+        # e.g. after frames ahead of it were prefetched
+        with self._lock:
+            while self._cache_size > self.max_memory and len(self._cache) > 1:
+                t = next(iter(self._cache))
+                if t == self._current:
+                    self._cache.move_to_end(t)
+                    t = next(iter(self._cache))
+                data = self._cache.pop(t)
+                self._cache_size -= sum(array.nbytes for array in data)
+
+    def layer_data(
+            self, t: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Get frame `t` as surface data for a napari Surface layer.
+
+        The vertices of the frame are returned unchanged. The time axis of
+        the layer comes from the vertex values instead, which have a leading
+        dimension of the length of the timelapse, so that napari shows a time
+        slider for the layer. The values are a read-only broadcast of ones
+        and take no memory per frame.
+        """
+        vertices, faces = self[t]
+        values = np.broadcast_to(
+            np.ones(1), (len(self), len(vertices)))
+        return vertices, faces, values
+
+    def connect(self, viewer: "napari.Viewer", layer: "napari.layers.Surface"):
+        """
+        Update `layer` with the current frame whenever the time slider moves.
+        """
+        current_frame = [None]
+
+        def _on_step_change(event=None):
+            t = current_time_step(viewer)
+            if t is None:
+                return
+            t = int(np.clip(t, 0, len(self) - 1))
+            if t == current_frame[0]:
+                return
+            current_frame[0] = t
+            layer.data = self.layer_data(t)
+
+        def _on_layer_removed(event):
+            if event.value is layer:
+                viewer.dims.events.current_step.disconnect(_on_step_change)
+                viewer.layers.events.removed.disconnect(_on_layer_removed)
+                self.close()
+
+        viewer.dims.events.current_step.connect(_on_step_change)
+        viewer.layers.events.removed.connect(_on_layer_removed)
+        _on_step_change()
+
+    def connect_when_added(self, viewer: "napari.Viewer"):
+        """
+        Connect to the layer that shows this timelapse once it is added.
+
+        Reader functions only return layer data, the layer itself is created
+        by napari afterwards. The layer is recognized by the reference to
+        this timelapse in its metadata.
+        """
+        def _on_inserted(event):
+            layer = event.value
+            if layer.metadata.get('timelapse') is self:
+                viewer.layers.events.inserted.disconnect(_on_inserted)
+                self.connect(viewer, layer)
+
+        viewer.layers.events.inserted.connect(_on_inserted)
+
+
+def current_time_step(viewer: "napari.Viewer") -> Optional[int]:
+    """
+    Time step shown in the viewer, None if it has less than 4 dimensions.
+
+    Layers are aligned to the last dimensions of the viewer, so the time
+    axis of 4D surfaces is the fourth last, even if other layers add
+    leading dimensions.
+    """
+    if viewer.dims.ndim < 4:
+        return None
+    return int(viewer.dims.current_step[-4])
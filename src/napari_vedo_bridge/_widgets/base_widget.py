@@ -12,6 +12,10 @@ from pathlib import Path
 from vedo import Plotter, Mesh, settings, Text2D
 from vedo import __version__ as _vedo_version
 
+from .layer_link import LayerLink
+from ..utils import vedo_mesh_faces
+from .._lod import LevelOfDetail
+
 settings.default_backend = 'vtk'
 
 
@@ -37,6 +41,9 @@ class VedoWidget(QtWidgets.QWidget):
         self._show_relevant_text()
         self.plt.show()
         self.mesh = None
+        self.link = None
+        self._link_text = None
+        self._lods = []
 
     def _setup_ui(self):
 
@@ -54,6 +61,7 @@ class VedoWidget(QtWidgets.QWidget):
         self.pushButton_send_back.clicked.connect(self._to_napari)
         self.pushButton_clear.clicked.connect(self._clear)
         self.pushButton_show_hotkeys.clicked.connect(self._show_hotkey_reference)
+        self.checkBox_link.toggled.connect(self._on_link_toggled)
 
         # connect stdout to text edit
         sys.stdout = EmittingStream(textWritten=self._collect_stdout)
@@ -70,6 +78,10 @@ class VedoWidget(QtWidgets.QWidget):
             ).send()
             return
 
+        if self.checkBox_link.isChecked():
+            self._link_layer(selected_layers)
+            return
+
         self.mesh = Mesh(selected_layers.data[:2])  # only vertices and faces
         text = Text2D(
             "Layer: " + selected_layers.name,
@@ -79,6 +91,7 @@ class VedoWidget(QtWidgets.QWidget):
             s=0.5,
         )
         self.plt += [text, self.mesh]
+        self._lods.append(LevelOfDetail(self.plt, self.mesh))
         self.plt.render()
 
         self.status_text_edit.appendPlainText(f"Mesh: {selected_layers.name}")
@@ -90,13 +103,81 @@ class VedoWidget(QtWidgets.QWidget):
         if self.mesh is None:
             return
 
-        # get vertices and faces
-        vertices, faces = self.mesh.vertices, self.mesh.cells
-        layer = napari.layers.Surface((vertices, np.asarray(faces)))
+        if self.link is not None and self.link.layer in self.napari_viewer.layers:
+            ranges = self.link.push_from_vedo()
+            n_vertices = int(np.sum(np.diff(ranges, axis=1)))
+            self.status_text_edit.appendPlainText(
+                f"Updated {self.link.layer.name}: {n_vertices} vertices "
+                f"in {len(ranges)} ranges")
+            return
+
+        # get vertices and faces, copied as the plotter mesh keeps changing
+        vertices, faces = self.mesh.vertices, vedo_mesh_faces(self.mesh)
+        layer = napari.layers.Surface((np.array(vertices), np.array(faces)))
         self.napari_viewer.add_layer(layer)
 
         self.status_text_edit.appendPlainText(f"Sent to Napari: {layer.name}")
 
+    def _link_layer(self, layer: napari.layers.Surface):
+        """
+        Show a layer linked to the plotter mesh (see `LayerLink`).
+
+        Getting the linked layer again updates the mesh in place.
+        """
+        if self.link is not None and self.link.layer is layer:
+            ranges = self.link.pull_from_napari()
+            self.plt.render()
+            self.status_text_edit.appendPlainText(
+                f"Updated mesh from {layer.name}: {len(ranges)} ranges")
+            return
+
+        try:
+            link = LayerLink(layer)
+        except ValueError as error:
+            napari.utils.notifications.show_warning(str(error))
+            return
+
+        self._unlink()
+        self._remove_lods(self.mesh)
+        self.plt.remove(self.mesh, self._link_text)
+        self.link = link
+        self.mesh = link.mesh
+        layer.events.data.connect(self._on_linked_layer_changed)
+
+        self._link_text = Text2D(
+            "Linked: " + layer.name,
+            pos='top-left',
+            font='Calco',
+            c='k5',
+            s=0.5,
+        )
+        self.plt += [self._link_text, self.mesh]
+        self._lods.append(LevelOfDetail(self.plt, self.mesh))
+        self.plt.render()
+
+        self.status_text_edit.appendPlainText(f"Linked: {layer.name}")
+
+    def _unlink(self):
+        if self.link is None:
+            return
+        self.link.disconnect()
+        self.link.layer.events.data.disconnect(self._on_linked_layer_changed)
+        self.link = None
+
+    def _remove_lods(self, mesh=None):
+        """Remove the level of detail proxies of `mesh`, or of all meshes."""
+        for lod in list(self._lods):
+            if mesh is None or lod.mesh is mesh:
+                lod.remove()
+                self._lods.remove(lod)
+
+    def _on_linked_layer_changed(self, event=None):
+        self.plt.render()
+
+    def _on_link_toggled(self, checked: bool):
+        if not checked:
+            self._unlink()
+
     def _show_relevant_text(self):
         self.plt += Text2D(
             "vedo " + _vedo_version,
@@ -111,6 +192,9 @@ class VedoWidget(QtWidgets.QWidget):
         self.napari_viewer.window.add_dock_widget(hotkey_reference, area='right')
 
     def _clear(self):
+        self._unlink()
+        self._remove_lods()
+        self._link_text = None
         self.plt.clear()
         [self.plt.remove(actor) for actor in self.plt.actors]
         self._show_relevant_text()
@@ -0,0 +1,191 @@
+"""
+Two-way link between a napari Surface layer and a vedo Mesh.
+
+The linked layer and mesh share one vertex buffer: napari holds it as
+`layer.vertices` and VTK wraps it without copying as the points of the mesh.
+Writeable float32 and float64 vertices of the layer are used as they are;
+other vertex arrays are shared as a float64 copy held by the link, which is only given to
+the layer once the mesh is edited. Edits of the mesh are compared against the
+buffer, and only the rows that changed are copied into it. Changes of the
+topology (vertex or face count, connectivity) update the layer and the mesh in
+place.
+"""
+import numpy as np
+from typing import Optional
+
+import napari
+from vedo import Mesh
+from vtkmodules.util.numpy_support import numpy_to_vtk, vtk_to_numpy
+
+from ..utils import is_triangle_mesh, vedo_mesh_faces
+
+
+def changed_ranges(old: np.ndarray, new: np.ndarray) -> np.ndarray:
+    """
+    Get the row ranges in which two vertex arrays of equal shape differ.
+
+    Returns
+    -------
+    np.ndarray
+        (k, 2) array of `[start, end)` ranges of changed rows.
+    """
+    changed = np.any(old != new, axis=1).view(np.int8)
+    edges = np.flatnonzero(np.diff(changed, prepend=0, append=0))
+    return edges.reshape(-1, 2)
+
+
+class LayerLink:
+    """
+    Keep a napari Surface layer and a vedo Mesh in sync.
+
+    Parameters
+    ----------
+    layer : napari.layers.Surface
+        Layer with 3D vertices. Its data is not replaced until the mesh is
+        edited.
+    mesh : vedo.Mesh, optional
+        Mesh to link. Defaults to a new mesh created from the layer.
+    """
+
+    def __init__(self, layer: "napari.layers.Surface", mesh: Optional[Mesh] = None):
+        if np.shape(layer.vertices)[1] != 3:
+            raise ValueError('Only surfaces with 3D vertices can be linked')
+
+        self.layer = layer
+        self.mesh = mesh if mesh is not None else Mesh(
+            [np.asarray(layer.vertices), np.asarray(layer.faces)])
+        self._updating = False
+        self._share(_buffer(layer.vertices), np.asarray(layer.faces))
+        self.layer.events.data.connect(self.pull_from_napari)
+
+    def disconnect(self):
+        """Stop syncing; the layer and mesh keep the current vertices."""
+        self.layer.events.data.disconnect(self.pull_from_napari)
+
+    def push_from_vedo(self) -> np.ndarray:
+        """
+        Update the layer with the current geometry of the mesh.
+
+        Returns
+        -------
+        np.ndarray
+            (k, 2) ranges of the vertices that were updated, all vertices if
+            the topology changed.
+        """
+        vertices = self.mesh.vertices
+        faces = vedo_mesh_faces(self.mesh)
+        if not self._same_topology(vertices, faces):
+            # copied as both are views on the arrays of the mesh
+            self._share(np.array(vertices), np.array(faces))
+            self._set_layer_data(reset_values=True)
+            return np.array([[0, len(self.vertices)]])
+
+        ranges = self._copy_changes(vertices)
+        if len(ranges):
+            self._set_layer_data()
+        return ranges
+
+    def pull_from_napari(self, event=None) -> np.ndarray:
+        """
+        Update the mesh with the current data of the layer.
+
+        Connected to the data event of the layer, so edits of the layer data
+        are forwarded to the mesh automatically.
+
+        Returns
+        -------
+        np.ndarray
+            (k, 2) ranges of the vertices that were updated.
+        """
+        if self._updating:
+            return np.empty((0, 2), dtype=int)
+
+        vertices = np.asarray(self.layer.vertices)
+        faces = np.asarray(self.layer.faces)
+        if vertices is self.vertices:
+            # the buffer was edited in place, the changes are unknown
+            self._points_modified()
+            return np.array([[0, len(self.vertices)]])
+
+        if not self._same_topology(vertices, faces):
+            self._share(_buffer(vertices), faces)
+            return np.array([[0, len(self.vertices)]])
+
+        buffer = _buffer(vertices)
+        if buffer is not vertices:
+            return self._copy_changes(buffer)
+
+        # share the new vertices of the layer instead of copying them
+        ranges = changed_ranges(self.vertices, vertices)
+        self.vertices = vertices
+        self._attach_points()
+        self._points_modified()
+        return ranges
+
+    def _same_topology(self, vertices: np.ndarray, faces: np.ndarray) -> bool:
+        return (vertices.shape == self.vertices.shape
+                and faces.shape == self.faces.shape
+                and (faces is self.faces or np.array_equal(faces, self.faces)))
+
+    def _copy_changes(self, vertices: np.ndarray) -> np.ndarray:
+        if np.shares_memory(vertices, self.vertices):
+            return np.empty((0, 2), dtype=int)
+        ranges = changed_ranges(self.vertices, vertices)
+        for start, end in ranges:
+            self.vertices[start:end] = vertices[start:end]
+        # the mesh may have replaced its points array, point it back to the
+        # shared buffer
+        self._attach_points()
+        self._points_modified()
+        return ranges
+
+    def _share(self, vertices: np.ndarray, faces: np.ndarray):
+        """Share a vertex buffer and rebuild the mesh topology if needed."""
+        self.vertices = vertices
+        self.faces = faces
+
+        if (not is_triangle_mesh(self.mesh)
+                or not np.array_equal(vedo_mesh_faces(self.mesh), faces)):
+            polydata = Mesh([self.vertices, self.faces]).dataset
+            self.mesh._update(polydata)
+        self._attach_points()
+        self._points_modified()
+
+    def _attach_points(self):
+        points = self.mesh.dataset.GetPoints()
+        data = points.GetData()
+        if vtk_to_numpy(data).ctypes.data != self.vertices.ctypes.data:
+            # no copy, VTK keeps a reference to the buffer
+            points.SetData(numpy_to_vtk(self.vertices, deep=False))
+
+    def _points_modified(self):
+        self.mesh.dataset.GetPoints().Modified()
+        self.mesh.point_locator = None
+        self.mesh.cell_locator = None
+
+    def _set_layer_data(self, reset_values: bool = False):
+        self._updating = True
+        try:
+            if reset_values or len(self.layer.vertex_values) != len(self.vertices):
+                self.layer.data = (self.vertices, self.faces)
+            elif self.faces is not self.layer.faces:
+                self.layer.data = (
+                    self.vertices, self.faces, self.layer.vertex_values)
+            else:
+                self.layer.vertices = self.vertices
+        finally:
+            self._updating = False
+
+
+def _buffer(vertices: np.ndarray) -> np.ndarray:
+    """
+    Get vertices that VTK can wrap without copying.
+
+    Writeable C-contiguous float32 and float64 arrays are returned as they
+    are, other arrays (e.g. read-only memory maps) are copied to float64.
+    """
+    if (vertices.dtype in (np.float32, np.float64)
+            and vertices.flags.c_contiguous
+            and vertices.flags.writeable):
+        return vertices
+    return np.array(vertices, dtype=np.float64, order='C')
@@ -1,102 +1,337 @@
-from typing import Any, List
-from napari_timelapse_processor import TimelapseConverter
-from napari.layers import Points, Layer, Surface
+import numpy as np
+from functools import partial
+from typing import Any, Callable, Iterator, List, NamedTuple, Optional, Tuple
+from napari.layers import Layer
+
+from ._container import is_container, write_container
+from ._features import join_vector_features, slice_features
+from ._frame_index import write_frame_index
+
+
+class Encoding(NamedTuple):
+    """
+    How the writers encode the data in a file.
+
+    Parameters
+    ----------
+    data_mode : str
+        `'appended'` (raw binary block at the end of the file), `'binary'`
+        (base64 inline) or `'ascii'`. Only `.vtp` supports all three; for
+        `.vtk`, `.ply` and `.stl`, everything but `'ascii'` writes binary
+        files.
+    compression : str, optional
+        `'zlib'`, `'lz4'`, `'lzma'` or None. Applies to `.vtp` and, as gzip,
+        to `.vtkhdf`.
+    compression_level : int
+        Compression level from 1 (fastest) to 9 (smallest).
+    float32 : bool
+        Store coordinates and float features in single precision.
+    """
+    data_mode: str = 'appended'
+    compression: Optional[str] = 'zlib'
+    compression_level: int = 5
+    float32: bool = False
+
+
+_data_modes = ('appended', 'binary', 'ascii')
+_compressors = (None, 'zlib', 'lz4', 'lzma')
 
 
 def write_points(
         path: str,
         layer_data: Any,
-        attributes: dict
+        attributes: dict,
+        n_workers: Optional[int] = None,
+        encoding: Optional[Encoding] = None
 ) -> List[str]:
-    import vedo
-    import os
-    from pathlib import Path
-    import tqdm
-
-    format = Path(path).suffix[1:]
+    import pandas as pd
 
+    encoding = _check_encoding(encoding)
     layer = Layer.create(layer_data, attributes, 'points')
-    Converter = TimelapseConverter()
+    features = join_vector_features(
+        layer.features if layer.features is not None else pd.DataFrame())
+
+    # single-file container for all timepoints
+    if is_container(path):
+        if layer.data.shape[1] != 4:
+            frames, n_frames = iter([(layer.data, None, features)]), None
+        else:
+            frames = (
+                (points, None, frame_features) for points, frame_features
+                in _iter_point_frames(layer.data, features))
+            n_frames = len(np.unique(layer.data[:, 0]))
+        write_container(
+            path, frames, n_frames, _container_compression(encoding),
+            encoding.float32)
+        return [str(path)]
 
     # is it 4D?
-    if layer.data.shape[1] == 4:
-        list_of_layers = Converter.unstack_data(layer, layertype=Points)
-    else:
-        list_of_layers = [layer]
+    if layer.data.shape[1] != 4:
+        _write_points(str(path), layer.data, features, encoding)
+        return [str(path)]
 
-    # if there is only one timepoint, just write it
-    if len(list_of_layers) == 1:
-        points = vedo.Points(list_of_layers[0].data)
+    frames = _iter_point_frames(layer.data, features)
+    n_frames = len(np.unique(layer.data[:, 0]))
 
-        for key in dict(list_of_layers[0].features).keys():
-            points.pointdata[key] = list_of_layers[0].features[key]
-        vedo.write(points, str(path))
+    # if there is only one timepoint, just write it
+    if n_frames == 1:
+        _write_points(str(path), *next(frames), encoding)
         return [str(path)]
 
     # if there are multiple timepoints, write each one separately
-    else:
-        os.makedirs(Path(path).parent / Path(path).stem, exist_ok=True)
-        output_paths = []
-        for i, layer in tqdm.tqdm(enumerate(list_of_layers), total=len(list_of_layers)):
-            points = vedo.Points(layer.data[:, :3])
-            for key in dict(list_of_layers[0].features).keys():
-                points.pointdata[key] = list_of_layers[i].features[key]
-
-            output_path = str(Path(path).parent / Path(path).stem / "{:03d}.{:s}".format(i, format))
-            output_paths.append(output_path)
-
-            vedo.write(points, str(output_path))
-
-        return output_paths
+    return _write_frames(
+        path, frames, n_frames, partial(_write_points, encoding=encoding),
+        n_workers, 'points', features)
 
 
 def write_surfaces(
         path: str,
         layer_data: Any,
-        attributes: dict
+        attributes: dict,
+        n_workers: Optional[int] = None,
+        encoding: Optional[Encoding] = None
 ) -> List[str]:
-    import vedo
-    import os
-    from pathlib import Path
-    import tqdm
     import pandas as pd
 
-    file_format = Path(path).suffix[1:]
-
+    encoding = _check_encoding(encoding)
     layer = Layer.create(layer_data, attributes, 'surface')
-    if not hasattr(layer, 'features'):
-        layer.features = pd.DataFrame()
+    features = getattr(layer, 'features', None)
+    features = join_vector_features(
+        features if features is not None else pd.DataFrame())
+    vertices, faces = layer.data[0], np.asarray(layer.data[1])
+
+    # single-file container for all timepoints
+    if is_container(path):
+        if vertices.shape[1] != 4:
+            frames, n_frames = iter([(vertices, faces, features)]), None
+        else:
+            frames = _iter_surface_frames(vertices, faces, features)
+            n_frames = len(_frame_bounds(vertices[:, 0]))
+        write_container(
+            path, frames, n_frames, _container_compression(encoding),
+            encoding.float32)
+        return [str(path)]
 
     # is it 4D?
-    if layer.data[0].shape[1] == 4:
-        Converter = TimelapseConverter()
-        list_of_layers = Converter.unstack_data(layer, layertype=Surface)
-    else:
-        list_of_layers = [layer]
+    if vertices.shape[1] != 4:
+        _write_surface(str(path), vertices, faces, features, encoding)
+        return [str(path)]
+
+    frames = _iter_surface_frames(vertices, faces, features)
+    n_frames = len(_frame_bounds(vertices[:, 0]))
 
     # if there is only one timepoint, just write it
-    if len(list_of_layers) == 1:
-        mesh = vedo.Mesh((
-            list_of_layers[0].data[0],
-            list_of_layers[0].data[1].astype(int)
-            ))
-        for key in dict(list_of_layers[0].features).keys():
-            mesh.pointdata[key] = list_of_layers[0].features[key]
-        vedo.write(mesh, str(path))
+    if n_frames == 1:
+        _write_surface(str(path), *next(frames), encoding)
         return [str(path)]
 
     # if there are multiple timepoints, write each one separately
+    return _write_frames(
+        path, frames, n_frames, partial(_write_surface, encoding=encoding),
+        n_workers, 'surface', features)
+
+
+def _write_points(
+        path: str,
+        points: np.ndarray,
+        features: dict,
+        encoding: Encoding = Encoding()):
+    import vedo
+    from .utils import _numpy_to_vtk_points
+
+    vedo_points = vedo.Points(points)
+    if encoding.float32:
+        # vedo stores points in double precision
+        vedo_points.dataset.SetPoints(
+            _numpy_to_vtk_points(np.asarray(points, dtype=np.float32)))
+    _add_features(vedo_points, features, encoding)
+    _write_dataset(path, vedo_points, encoding)
+
+
+def _write_surface(
+        path: str,
+        vertices: np.ndarray,
+        faces: np.ndarray,
+        features: dict,
+        encoding: Encoding = Encoding()):
+    from .utils import surface_data_to_vedo_mesh
+
+    if encoding.float32:
+        vertices = np.asarray(vertices, dtype=np.float32)
+    mesh = surface_data_to_vedo_mesh((vertices, faces))
+    _add_features(mesh, features, encoding)
+    _write_dataset(path, mesh, encoding)
+
+
+def _add_features(mesh, features: dict, encoding: Encoding):
+    for key, values in features.items():
+        if encoding.float32 and values.dtype == np.float64:
+            values = values.astype(np.float32)
+        mesh.pointdata[key] = values
+
+
+def _write_dataset(path: str, mesh, encoding: Encoding):
+    """
+    Write a vedo object with the given encoding.
+
+    `.vtp` (and `.xml`) files are written with VTK's XML writer to control
+    data mode and compression; all other formats are written by vedo.
+    Raises an OSError if the file could not be written.
+    """
+    import os
+    import vedo
+
+    if not path.lower().endswith(('.vtp', '.xml')):
+        # vedo only logs formats it cannot write, so check for the file
+        if os.path.exists(path):
+            os.remove(path)
+        vedo.write(mesh, path, binary=encoding.data_mode != 'ascii')
+        if not os.path.isfile(path):
+            raise OSError(f'Could not write {path}')
+        return
+
+    from vtkmodules.vtkIOXML import vtkXMLPolyDataWriter
+
+    writer = vtkXMLPolyDataWriter()
+    writer.SetFileName(path)
+    writer.SetInputData(mesh.dataset)
+    if encoding.data_mode == 'appended':
+        writer.SetDataModeToAppended()
+        writer.EncodeAppendedDataOff()
+    elif encoding.data_mode == 'binary':
+        writer.SetDataModeToBinary()
     else:
-        os.makedirs(Path(path).parent / Path(path).stem, exist_ok=True)
-        output_paths = []
-        for i, layer in tqdm.tqdm(enumerate(list_of_layers), total=len(list_of_layers)):
-            mesh = vedo.Mesh((layer.data[0], layer.data[1].astype(int)))
-            for key in dict(list_of_layers[0].features).keys():
-                mesh.pointdata[key] = list_of_layers[i].features[key]
+        writer.SetDataModeToAscii()
+
+    if encoding.compression is None:
+        writer.SetCompressorTypeToNone()
+    else:
+        writer.SetCompressorType({
+            'zlib': writer.ZLIB, 'lz4': writer.LZ4, 'lzma': writer.LZMA,
+        }[encoding.compression])
+        writer.SetCompressionLevel(encoding.compression_level)
+
+    if not writer.Write():
+        raise OSError(f'Could not write {path}')
+
+
+def _check_encoding(encoding: Optional[Encoding]) -> Encoding:
+    if encoding is None:
+        return Encoding()
+    if encoding.data_mode not in _data_modes:
+        raise ValueError(
+            f'Unknown data mode {encoding.data_mode!r}, '
+            f'choose one of {_data_modes}')
+    if encoding.compression not in _compressors:
+        raise ValueError(
+            f'Unknown compression {encoding.compression!r}, '
+            f'choose one of {_compressors}')
+    if not 1 <= encoding.compression_level <= 9:
+        raise ValueError('compression_level must be between 1 and 9')
+    return encoding
+
+
+def _container_compression(encoding: Encoding) -> int:
+    # HDF5 only supports gzip, whose level is used for any compression
+    return 0 if encoding.compression is None else encoding.compression_level
+
+
+def _write_frames(
+        path: str,
+        frames: Iterator[tuple],
+        n_frames: int,
+        write_function: Callable,
+        n_workers: Optional[int] = None,
+        layer_type: str = 'surface',
+        features: Optional[dict] = None) -> List[str]:
+    """
+    Write frames to `<parent>/<stem>/000.<format>`, ... with a thread pool.
+
+    Frames are taken from the generator only when a worker is free, so that
+    at most `n_workers` frames are held in memory at any time. Afterwards,
+    the frame index (see `_frame_index`) is written to the directory.
+    """
+    import os
+    import tqdm
+    from collections import deque
+    from concurrent.futures import ThreadPoolExecutor
+    from pathlib import Path
+
+    file_format = Path(path).suffix[1:]
+    directory = Path(path).parent / Path(path).stem
+    os.makedirs(directory, exist_ok=True)
+
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    n_workers = max(1, min(n_workers, n_frames))
+
+    output_paths = [
+        str(directory / "{:03d}.{:s}".format(i, file_format))
+        for i in range(n_frames)
+    ]
+
+    counts, dtype = [], None
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        pending = deque()
+        for output_path, frame in tqdm.tqdm(
+                zip(output_paths, frames), total=n_frames):
+            dtype = frame[0].dtype
+            counts.append((
+                len(frame[0]),
+                len(frame[1]) if layer_type == 'surface' else None))
+            if len(pending) >= n_workers:
+                pending.popleft().result()
+            pending.append(executor.submit(write_function, output_path, *frame))
+        for future in pending:
+            future.result()
+
+    write_frame_index(
+        directory, output_paths, counts, layer_type, dtype, features or {})
+    return output_paths
+
+
+def _frame_bounds(time: np.ndarray) -> List[Tuple[int, int]]:
+    """
+    Start and end index of every frame in a sorted time column.
+    """
+    starts = np.concatenate([[0], np.flatnonzero(np.diff(time)) + 1])
+    ends = np.append(starts[1:], len(time))
+    return list(zip(starts, ends))
+
+
+def _iter_point_frames(
+        points: np.ndarray,
+        features: dict) -> Iterator[tuple]:
+    """
+    Yield the points and point data of every frame of 4D points data.
+
+    Frames are sliced from the stacked arrays without creating layers.
+    """
+    time, order = points[:, 0], None
+    if np.any(np.diff(time) < 0):
+        order = np.argsort(time, kind='stable')
+        points, time = points[order], time[order]
+
+    for start, end in _frame_bounds(time):
+        yield points[start:end, 1:], slice_features(features, start, end, order)
+
 
-            output_path = str(Path(path).parent / Path(path).stem / "{:03d}.{:s}".format(i, file_format))
-            output_paths.append(output_path)
+def _iter_surface_frames(
+        vertices: np.ndarray,
+        faces: np.ndarray,
+        features: dict) -> Iterator[tuple]:
+    """
+    Yield vertices, faces and point data of every frame of 4D surface data.
 
-            vedo.write(mesh, str(output_path))
+    As for `TimelapseConverter`, the vertices and faces of a frame must be
+    contiguous in the stacked arrays.
+    """
+    time = vertices[:, 0]
+    face_time = time[faces[:, 0]]
 
-        return output_paths
+    for start, end in _frame_bounds(time):
+        face_start = np.searchsorted(face_time, time[start], side='left')
+        face_end = np.searchsorted(face_time, time[start], side='right')
+        yield (vertices[start:end, 1:],
+               faces[face_start:face_end] - start,
+               slice_features(features, start, end))
@@ -2,11 +2,22 @@ import vedo
 import numpy as np
 from napari.layers import Surface, Points, Vectors
 import vedo.pointcloud
+from vtkmodules.util import numpy_support, vtkConstants
+from vtkmodules.vtkCommonCore import vtkPoints
+from vtkmodules.vtkCommonDataModel import vtkCellArray, vtkPolyData
+
+_id_dtype = numpy_support.get_numpy_array_type(vtkConstants.VTK_ID_TYPE)
+
 
 def napari_to_vedo_mesh(surface: Surface) -> vedo.Mesh:
     """
     Convert a napari mesh to a vedo mesh.
 
+    The vertex and face buffers of the napari layer are shared with the
+    vedo mesh whenever their dtype allows it (float32/float64 vertices,
+    int64 faces). vedo filters write their results into new arrays, but
+    writing into `mesh.vertices` directly also changes the napari layer.
+
     Parameters
     ----------
     surface : Surface
@@ -17,8 +28,27 @@ def napari_to_vedo_mesh(surface: Surface) -> vedo.Mesh:
     vedo.Mesh
         The converted vedo mesh.
     """
-    vertices, faces = surface.data[0], surface.data[1]
-    return vedo.Mesh([vertices, faces])
+    return surface_data_to_vedo_mesh(surface.data)
+
+
+def surface_data_to_vedo_mesh(data: "napari.types.SurfaceData") -> vedo.Mesh:
+    """
+    Convert napari surface data (vertices, faces[, values]) to a vedo mesh.
+
+    Buffers are shared as in `napari_to_vedo_mesh`.
+    """
+    vertices, faces = data[0], data[1]
+    polydata = vtkPolyData()
+    polydata.SetPoints(_numpy_to_vtk_points(vertices))
+    polydata.SetPolys(_faces_to_vtk_cells(faces))
+    return vedo.Mesh(polydata)
+
+
+def vedo_mesh_to_surface_data(mesh: vedo.Mesh) -> "napari.types.SurfaceData":
+    """
+    Convert a vedo mesh to napari surface data (vertices, faces).
+    """
+    return (mesh.vertices, vedo_mesh_faces(mesh))
 
 def vedo_mesh_to_napari(mesh: vedo.Mesh) -> Surface:
     """
@@ -34,12 +64,88 @@ def vedo_mesh_to_napari(mesh: vedo.Mesh) -> Surface:
     Surface
         The converted napari mesh.
     """
-    return Surface((mesh.vertices, np.asarray(mesh.cells, dtype=int)))
+    return Surface(vedo_mesh_to_surface_data(mesh))
+
+
+def vedo_mesh_faces(mesh: vedo.Mesh) -> np.ndarray:
+    """
+    Get the faces of a vedo mesh as (N, 3) array of triangles.
+
+    For triangle meshes, the returned array is a view on the connectivity
+    array of the mesh's polygons. Other polygons are split into triangle
+    fans, which is exact for convex polygons such as the quads created by
+    clipping.
+
+    Parameters
+    ----------
+    mesh : vedo.Mesh
+        The input vedo mesh.
+
+    Returns
+    -------
+    np.ndarray
+        The face indices.
+    """
+    offsets, connectivity = _polygon_arrays(mesh)
+    if _all_triangles(offsets, connectivity):
+        return connectivity.reshape(-1, 3)
+    return _fan_triangulate(offsets, connectivity)
+
+
+def is_triangle_mesh(mesh: vedo.Mesh) -> bool:
+    """
+    Check whether all polygons of a vedo mesh are triangles.
+    """
+    return _all_triangles(*_polygon_arrays(mesh))
+
+
+def _polygon_arrays(mesh: vedo.Mesh) -> tuple:
+    """Offsets and connectivity array of the polygons of a mesh."""
+    polys = mesh.dataset.GetPolys()
+    offsets = numpy_support.vtk_to_numpy(polys.GetOffsetsArray())
+    connectivity = numpy_support.vtk_to_numpy(polys.GetConnectivityArray())
+    return offsets, connectivity
+
+
+def _all_triangles(offsets: np.ndarray, connectivity: np.ndarray) -> bool:
+    n_cells = max(len(offsets) - 1, 0)
+    if len(connectivity) != 3 * n_cells:
+        return False
+    # the sizes add up to 3 per cell, so either all cells are triangles or
+    # some have less than 3 vertices
+    return bool(np.all(np.diff(offsets) == 3))
+
+
+def _fan_triangulate(
+        offsets: np.ndarray, connectivity: np.ndarray) -> np.ndarray:
+    """
+    Split polygons into triangle fans around their first vertex.
+
+    Polygons with less than 3 vertices are dropped.
+    """
+    offsets = offsets.astype(np.int64)
+    sizes = np.diff(offsets)
+    n_triangles = np.maximum(sizes - 2, 0)
+    total = int(n_triangles.sum())
+
+    # start of the polygon and index of the fan vertex of every triangle
+    starts = np.repeat(offsets[:-1], n_triangles)
+    first = np.repeat(np.cumsum(n_triangles) - n_triangles, n_triangles)
+    fan = starts + np.arange(total) - first + 1
+
+    faces = np.empty((total, 3), dtype=connectivity.dtype)
+    faces[:, 0] = connectivity[starts]
+    faces[:, 1] = connectivity[fan]
+    faces[:, 2] = connectivity[fan + 1]
+    return faces
 
 def napari_to_vedo_points(points: Points) -> vedo.Points:
     """
     Convert napari points to vedo points.
 
+    The coordinates are shared with the napari layer if they are stored as
+    float32 or float64.
+
     Parameters
     ----------
     points : Points
@@ -50,7 +156,15 @@ def napari_to_vedo_points(points: Points) -> vedo.Points:
     vedo.Points
         The converted vedo points.
     """
-    return vedo.pointcloud.Points(points.data)
+    vertices = points.data
+    verts = _faces_to_vtk_cells(
+        np.arange(len(vertices), dtype=_id_dtype)[:, np.newaxis])
+
+    polydata = vtkPolyData()
+    polydata.SetPoints(_numpy_to_vtk_points(vertices))
+    polydata.SetVerts(verts)
+    return vedo.pointcloud.Points(polydata)
+
 
 def vedo_points_to_napari(points: vedo.Points) -> Points:
     """
@@ -99,3 +213,37 @@ def vedo_vectors_to_napari(vectors: vedo.Lines) -> Vectors:
         The converted napari vectors.
     """
     return Vectors(np.stack([vectors.points(0), vectors.points(1)], axis=1))
+
+
+def _numpy_to_vtk_points(vertices: np.ndarray) -> vtkPoints:
+    """
+    Wrap a (N, 3) array as vtkPoints, without copying if possible.
+    """
+    vertices = np.asarray(vertices)
+    if vertices.dtype not in (np.float32, np.float64):
+        vertices = vertices.astype(np.float64)
+    vertices = np.ascontiguousarray(vertices)
+
+    points = vtkPoints()
+    points.SetData(numpy_support.numpy_to_vtk(vertices, deep=False))
+    return points
+
+
+def _faces_to_vtk_cells(faces: np.ndarray) -> vtkCellArray:
+    """
+    Wrap a (N, k) array of cells with k vertices each as vtkCellArray.
+
+    The connectivity array is a flattened view on `faces` if it is a
+    contiguous int64 array. The offsets are generated in one step.
+    """
+    faces = np.ascontiguousarray(faces, dtype=_id_dtype)
+    connectivity = faces.reshape(-1)
+    offsets = np.arange(
+        0, connectivity.size + 1, faces.shape[1], dtype=_id_dtype)
+
+    cells = vtkCellArray()
+    cells.SetData(
+        numpy_support.numpy_to_vtkIdTypeArray(offsets),
+        numpy_support.numpy_to_vtkIdTypeArray(connectivity))
+    return cells
+